@@ -0,0 +1,226 @@
+#!/usr/bin/env python3
+#
+# Convert large batches of (UTC epoch seconds, timezone) pairs into UTC offsets
+# and local times, using the compiled transitions of transitions.py. The
+# transitions of each timezone are prepared once per batch, instead of one
+# lookup() call per pair.
+#
+# If NumPy is installed, the inputs may be NumPy arrays, and each group is
+# resolved by numpy.searchsorted() over a zero-copy view of the transition
+# arrays. Otherwise, the transitions of each timezone in the batch are
+# unpacked once into lists of times and offsets, each pair is resolved by a
+# bare bisect_right() over them, and the results are returned as array('q').
+#
+# Usage:
+# $ batch_convert.py
+#   [--size {n}]
+#   [--no_numpy]
+#   tzdb_dir country_timezones.txt
+#
+# benchmarks the conversion of 'n' random pairs over the timezones of
+# country_timezones.txt, against one TransitionTables.lookup() per pair.
+
+from array import array
+from bisect import bisect_right
+from typing import Any
+from typing import Dict
+from typing import List
+from typing import NamedTuple
+from typing import Sequence
+from typing import Tuple
+
+import argparse
+import importlib
+import operator
+import random
+import time
+
+from transitions import TransitionTables
+from transitions import compile_tables
+from transitions import epoch_seconds
+from tzplus.data_parser import parse_region_country_timezones
+from tzplus.extract_tzdb import load_tzdb
+
+# NumPy is optional.
+try:
+    np: Any = importlib.import_module('numpy')
+except ImportError:
+    np = None
+
+
+class BatchResult(NamedTuple):
+    offsets: Any  # UTC offsets in seconds, numpy.ndarray or array('q')
+    local_times: Any  # local epoch seconds, numpy.ndarray or array('q')
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description='Benchmark the batch conversion of timestamps.')
+    parser.add_argument(
+        '--size', help='Number of timestamps (default: 1000000)', type=int,
+        default=1000000)
+    parser.add_argument(
+        '--no_numpy', help='Do not use NumPy, even if installed',
+        action='store_true')
+    parser.add_argument('tzdb', help='Directory of raw TZDB files')
+    parser.add_argument('timezones', help='country_timezones.txt file')
+    args = parser.parse_args()
+
+    tables = compile_tables(load_tzdb(args.tzdb), 1970, 2050)
+    names = sorted(set(
+        row.timezone for row in parse_region_country_timezones(args.timezones)
+    ))
+    timestamps, timezones = random_pairs(names, args.size)
+    print(f"{args.size} timestamps, {len(names)} timezones")
+
+    start = time.perf_counter()
+    expected = [
+        tables.lookup(z, t).offset for t, z in zip(timestamps, timezones)
+    ]
+    print_rate('lookup() per element', args.size, start)
+
+    start = time.perf_counter()
+    result = convert_batch_python(tables, timestamps, timezones)
+    print_rate('convert_batch() array', args.size, start)
+    assert list(result.offsets) == expected
+
+    if np is not None and not args.no_numpy:
+        timestamps_np = np.array(timestamps, dtype=np.int64)
+        timezones_np = np.array(timezones)
+        start = time.perf_counter()
+        result = convert_batch_numpy(tables, timestamps_np, timezones_np)
+        print_rate('convert_batch() numpy', args.size, start)
+        assert result.offsets.tolist() == expected
+
+        ids = zone_ids(tables, timezones)
+        start = time.perf_counter()
+        result = convert_batch_numpy(tables, timestamps_np, ids)
+        print_rate('convert_batch() ids', args.size, start)
+        assert result.offsets.tolist() == expected
+
+
+def random_pairs(
+    names: List[str],
+    size: int,
+) -> Tuple[List[int], List[str]]:
+    """Return 'size' random (timestamps, timezones) from 1970 to 2050."""
+    rnd = random.Random(size)
+    until = epoch_seconds(2050, 1, 1, 0)
+    timestamps = [rnd.randrange(0, until) for _ in range(size)]
+    timezones = [rnd.choice(names) for _ in range(size)]
+    return timestamps, timezones
+
+
+def print_rate(label: str, size: int, start: float) -> None:
+    elapsed = time.perf_counter() - start
+    print(
+        f"  {label:<24} {elapsed * 1000:>10.1f} ms "
+        f"{size / elapsed / 1e6:>8.2f} M/s")
+
+# -----------------------------------------------------------------------------
+
+
+def convert_batch(
+    tables: TransitionTables,
+    timestamps: Any,
+    timezones: Any,
+) -> BatchResult:
+    """Return the UTC offsets and local times of each pair of 'timestamps'
+    (UTC epoch seconds) and 'timezones'. Uses NumPy if it is installed.
+    Raises KeyError for an unknown timezone.
+    """
+    if np is not None:
+        return convert_batch_numpy(tables, timestamps, timezones)
+    return convert_batch_python(tables, timestamps, timezones)
+
+
+def convert_batch_python(
+    tables: TransitionTables,
+    timestamps: Sequence[int],
+    timezones: Sequence[str],
+) -> BatchResult:
+    """Resolve each pair by bisect_right() over the (times, offsets) lists of
+    its zone, which are unpacked once per batch.
+    """
+    zones: Dict[str, Tuple[List[int], List[int]]] = {}
+    for timezone in set(timezones):
+        zone = tables.names.get(timezone)
+        if zone is None:
+            raise KeyError(timezone)
+        start = tables.zone_starts[zone]
+        end = tables.zone_starts[zone + 1]
+        zones[timezone] = (
+            tables.times[start:end].tolist(),
+            [tables.offsets[t] for t in tables.types[start:end]],
+        )
+
+    offsets = array('q', [
+        zone_offsets[bisect_right(zone_times, t) - 1]
+        for t, (zone_times, zone_offsets)
+        in zip(timestamps, map(zones.__getitem__, timezones))
+    ])
+    local_times = array('q', map(operator.add, timestamps, offsets))
+    return BatchResult(offsets, local_times)
+
+
+def convert_batch_numpy(
+    tables: TransitionTables,
+    timestamps: Any,
+    timezones: Any,
+) -> BatchResult:
+    """Group the pairs by zone using numpy.argsort(), then resolve each group
+    using numpy.searchsorted() over the transitions of its zone. The
+    'timezones' may be names, or the zone indexes of zone_ids(), which
+    avoids mapping the names on every batch.
+    """
+    timestamps = np.asarray(timestamps, dtype=np.int64)
+    timezones = np.asarray(timezones)
+    if timezones.dtype.kind in 'iu':
+        ids = timezones.astype(np.int64, copy=False)
+        num_zones = len(tables.zone_starts) - 1
+        if len(ids) and (ids.min() < 0 or ids.max() >= num_zones):
+            raise KeyError('Invalid zone index')
+    else:
+        ids = zone_ids(tables, timezones.tolist())
+
+    # Zero-copy views of the transition arrays.
+    times = np.frombuffer(tables.times, dtype=np.int64)
+    types = np.frombuffer(tables.types, dtype=np.uint16)
+    type_offsets = np.frombuffer(tables.offsets, dtype=np.int32)
+    zone_starts = tables.zone_starts
+
+    # Indexes of the pairs, grouped by zone.
+    order = np.argsort(ids, kind='stable')
+    bounds = np.searchsorted(
+        ids[order], np.arange(len(zone_starts))).tolist()
+    sorted_timestamps = timestamps[order]
+
+    offsets = np.empty(len(timestamps), dtype=np.int64)
+    for zone in range(len(zone_starts) - 1):
+        first, last = bounds[zone], bounds[zone + 1]
+        if first == last:
+            continue
+        start = zone_starts[zone]
+        end = zone_starts[zone + 1]
+        positions = np.searchsorted(
+            times[start:end], sorted_timestamps[first:last], side='right')
+        positions += start - 1
+        np.maximum(positions, start, out=positions)
+        offsets[order[first:last]] = type_offsets[types[positions]]
+
+    return BatchResult(offsets, timestamps + offsets)
+
+
+def zone_ids(tables: TransitionTables, timezones: Sequence[str]) -> Any:
+    """Return the zone index of each of 'timezones', as a numpy.ndarray.
+    Raises KeyError for an unknown timezone.
+    """
+    return np.fromiter(
+        map(tables.names.__getitem__, timezones), dtype=np.int64,
+        count=len(timezones))
+
+# -----------------------------------------------------------------------------
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,311 @@
+#!/usr/bin/env python3
+#
+# Benchmark the parse and verify pipeline of verify_data.py against synthetic
+# data files which are 1x, 10x, 100x and 1000x the size of the real data
+# files. Each read_*() and check_*() function, get_poly_timezones(),
+# check_cycle(), and has_cycle() over every link, is timed separately. The
+# results are printed, and optionally written as JSON, which can be compared
+# against the JSON of an earlier run to detect regressions.
+#
+# The number of ISO countries is capped at 676 (all 2-letter codes), since the
+# country code is always 2 characters. Larger scales add more timezones per
+# country instead.
+#
+# Usage:
+# $ benchmark.py
+#   [--scales 1,10,100,1000]
+#   [--output {file}]
+#   [--baseline {file}]
+
+from typing import Any
+from typing import Callable
+from typing import Dict
+from typing import List
+from typing import Tuple
+
+import argparse
+import itertools
+import json
+import os
+import platform
+import string
+import tempfile
+import time
+
+from tzplus.verify_data import LinkResolver
+from tzplus.verify_data import check_countries
+from tzplus.verify_data import check_cycle
+from tzplus.verify_data import check_iso_names
+from tzplus.verify_data import check_link_targets
+from tzplus.verify_data import check_links
+from tzplus.verify_data import check_regions
+from tzplus.verify_data import check_timezones
+from tzplus.verify_data import check_zones
+from tzplus.verify_data import get_poly_timezones
+from tzplus.verify_data import has_cycle
+from tzplus.verify_data import read_countries
+from tzplus.verify_data import read_country_timezones
+from tzplus.verify_data import read_links
+from tzplus.verify_data import read_region_country_timezones
+from tzplus.verify_data import read_regions
+from tzplus.verify_data import read_zones
+
+# Sizes of the real data files at scale 1.
+NUM_ZONES = 350
+NUM_LINKS = 246
+NUM_REGIONS = 12
+MAX_COUNTRIES = 26 * 26
+
+# Maximum length of a synthetic chain of links.
+MAX_CHAIN = 4
+
+# Total time spent repeating each benchmark, to find its best time.
+MIN_TOTAL_TIME = 0.2
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description='Benchmark the verify_data.py pipeline.')
+    parser.add_argument(
+        '--scales',
+        help='Comma-separated scale factors (default: 1,10,100,1000)',
+        default='1,10,100,1000')
+    parser.add_argument('--output', help='JSON file of the results')
+    parser.add_argument(
+        '--baseline',
+        help='JSON file of an earlier run, to compare against')
+    args = parser.parse_args()
+
+    scales = [int(s) for s in args.scales.split(',')]
+    results: Dict[str, Any] = {
+        'python': platform.python_version(),
+        'scales': {},
+    }
+    with tempfile.TemporaryDirectory() as tmpdir:
+        for scale in scales:
+            data_dir = os.path.join(tmpdir, str(scale))
+            os.mkdir(data_dir)
+            files = generate_data(data_dir, scale)
+            timings = run_benchmarks(files)
+            results['scales'][str(scale)] = timings
+
+    baseline = None
+    if args.baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+    print_results(results, baseline)
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+            f.write('\n')
+
+# -----------------------------------------------------------------------------
+
+
+def generate_data(data_dir: str, scale: int) -> Dict[str, str]:
+    """Generate a consistent set of data files which pass all checks, and
+    return the {name -> path} of the files.
+    """
+    num_zones = NUM_ZONES * scale
+    num_links = NUM_LINKS * scale
+    num_regions = NUM_REGIONS * scale
+    codes = [
+        a + b for a, b in itertools.product(string.ascii_uppercase, repeat=2)
+        if a + b not in ['BV', 'HM']
+    ][:min(MAX_COUNTRIES, 250 * scale)]
+
+    # Zones, with every 10th zone obsolete.
+    zones = [f'Region{i % num_regions}/Zone_{i}' for i in range(num_zones)]
+    zone_tags = [
+        'ZoneObsolete' if i % 10 == 9 else 'Zone' for i in range(num_zones)
+    ]
+
+    # Links, with chains of up to MAX_CHAIN links.
+    links: List[Tuple[str, str]] = []  # (link, target)
+    for i in range(num_links):
+        if i % MAX_CHAIN == 0:
+            target = zones[i % num_zones]
+        else:
+            target = links[-1][0]
+        links.append((f'Link{i % num_regions}/Link_{i}', target))
+    link_tags = ['Similar', 'Alternate', 'Alias', 'Obsolete']
+
+    # Significant timezones, assigned round-robin to countries and regions.
+    # Every 50th timezone also belongs to a second country.
+    timezones = [z for z, tag in zip(zones, zone_tags) if tag == 'Zone']
+    timezones += [
+        link for i, (link, _) in enumerate(links)
+        if link_tags[i % len(link_tags)] in ['Similar', 'Alternate']
+    ]
+    triplets: List[Tuple[str, str, str]] = []
+    for i, timezone in enumerate(timezones):
+        triplets.append((
+            f'R{i % num_regions}', codes[i % len(codes)], timezone))
+        if i % 50 == 0:
+            triplets.append((
+                f'R{i % num_regions}', codes[(i + 1) % len(codes)], timezone))
+    for i, code in enumerate(codes):
+        if i >= len(timezones):
+            triplets.append((f'R{i % num_regions}', code, timezones[0]))
+
+    files = {
+        'zones': os.path.join(data_dir, 'zones.txt'),
+        'classified_zones': os.path.join(data_dir, 'classified_zones.txt'),
+        'links': os.path.join(data_dir, 'links.txt'),
+        'classified_links': os.path.join(data_dir, 'classified_links.txt'),
+        'iso_orig': os.path.join(data_dir, 'iso3166.tab'),
+        'iso_long': os.path.join(data_dir, 'iso3166_long.txt'),
+        'iso_short': os.path.join(data_dir, 'iso3166_short.txt'),
+        'regions': os.path.join(data_dir, 'regions.txt'),
+        'region_country_timezones':
+            os.path.join(data_dir, 'country_timezones.txt'),
+        'country_timezones': os.path.join(data_dir, 'geonames.txt'),
+    }
+    write_lines(files['zones'], [f'Zone {z}' for z in zones])
+    write_lines(files['classified_zones'], [
+        f'{tag} {z}' for z, tag in zip(zones, zone_tags)
+    ])
+    write_lines(files['links'], [f'Link {t} {k}' for k, t in links])
+    write_lines(files['classified_links'], [
+        f'{link_tags[i % len(link_tags)]} {t} {k}'
+        for i, (k, t) in enumerate(links)
+    ])
+    write_lines(files['iso_long'], ['00 Nowhere'] + [
+        f'{c} Long Country Name {c}' for c in codes + ['BV', 'HM']
+    ])
+    write_lines(files['iso_short'], ['00 Nowhere'] + [
+        f'{c} Country {c}' for c in codes + ['BV', 'HM']
+    ])
+    write_lines(files['iso_orig'], [
+        f'{c}\tCountry {c}' for c in codes + ['BV', 'HM']
+    ])
+    write_lines(files['regions'], [
+        f'R{i} Region {i}' for i in range(num_regions)
+    ])
+    write_lines(files['region_country_timezones'], [
+        f'{r} {c} {z}' for r, c, z in triplets
+    ])
+    write_lines(files['country_timezones'], [
+        f'{c}\t{z}' for _, c, z in triplets
+    ])
+    return files
+
+
+def write_lines(filename: str, lines: List[str]) -> None:
+    with open(filename, 'w', encoding='utf-8') as f:
+        f.write('# Synthetic data file generated by benchmark.py\n')
+        for line in lines:
+            f.write(line)
+            f.write('\n')
+
+# -----------------------------------------------------------------------------
+
+
+def run_benchmarks(files: Dict[str, str]) -> Dict[str, Any]:
+    """Time each stage of the pipeline on the given data files. Return
+    {stage -> seconds}, plus the number of records in 'sizes'.
+    """
+    timings: Dict[str, Any] = {}
+
+    def bench(name: str, func: Callable[[], Any]) -> Any:
+        seconds, result = best_time(func)
+        timings[name] = seconds
+        return result
+
+    # Readers.
+    zones = bench('read_zones', lambda: read_zones(files['zones']))
+    classified_zones = read_zones(files['classified_zones'])
+    links = bench('read_links', lambda: read_links(files['links']))
+    classified_links = read_links(files['classified_links'])
+    iso_orig = read_countries(files['iso_orig'])
+    iso_long = read_countries(files['iso_long'])
+    iso_short = bench(
+        'read_countries', lambda: read_countries(files['iso_short']))
+    regions = bench('read_regions', lambda: read_regions(files['regions']))
+    country_timezones, region_timezones = bench(
+        'read_region_country_timezones',
+        lambda: read_region_country_timezones(
+            files['region_country_timezones']))
+    bench(
+        'read_country_timezones',
+        lambda: read_country_timezones(files['country_timezones']))
+
+    # Checks.
+    bench('check_zones', lambda: check_zones(
+        'zones', zones, classified_zones))
+    bench('check_links', lambda: check_links(
+        'links', links, classified_links))
+    bench('check_link_targets', lambda: check_link_targets(
+        classified_links, links, zones))
+    bench('check_iso_names', lambda: check_iso_names(
+        'orig', 'long', 'short', iso_orig, iso_long, iso_short))
+    bench('check_countries', lambda: check_countries(
+        'country_timezones', country_timezones, iso_short))
+    bench('check_regions', lambda: check_regions(
+        'country_timezones', region_timezones, regions))
+    bench('check_timezones', lambda: check_timezones(
+        'country_timezones', country_timezones, classified_zones,
+        classified_links))
+    bench('get_poly_timezones', lambda: get_poly_timezones(
+        country_timezones))
+
+    # Link graph.
+    bench('check_cycle', lambda: check_cycle('links', classified_links))
+    bench('has_cycle', lambda: [
+        has_cycle(name, classified_links) for name in classified_links
+    ])
+    bench('resolve_all', lambda: LinkResolver(classified_links).resolve_all())
+
+    timings['sizes'] = {
+        'zones': len(zones),
+        'links': len(links),
+        'countries': len(iso_short),
+        'regions': len(regions),
+        'timezones': sum(len(z) for z in country_timezones.values()),
+    }
+    return timings
+
+
+def best_time(func: Callable[[], Any]) -> Tuple[float, Any]:
+    """Return the best time of repeated calls of 'func', and its result."""
+    best = float('inf')
+    total = 0.0
+    result = None
+    while total < MIN_TOTAL_TIME or best == float('inf'):
+        start = time.perf_counter()
+        result = func()
+        elapsed = time.perf_counter() - start
+        best = min(best, elapsed)
+        total += elapsed
+    return best, result
+
+
+def print_results(
+    results: Dict[str, Any],
+    baseline: Any = None,
+) -> None:
+    """Print the time of each stage in milliseconds, with the ratio to the
+    baseline if given.
+    """
+    for scale, timings in results['scales'].items():
+        sizes = timings['sizes']
+        print(
+            f"Scale {scale}x: "
+            + ', '.join(f"{k}={v}" for k, v in sizes.items()))
+        base = None
+        if baseline:
+            base = baseline['scales'].get(scale)
+        for stage, seconds in timings.items():
+            if stage == 'sizes':
+                continue
+            line = f"  {stage:<30} {seconds * 1000:>10.3f} ms"
+            if base and base.get(stage):
+                line += f"  ({seconds / base[stage]:.2f}x baseline)"
+            print(line)
+
+# -----------------------------------------------------------------------------
+
+
+if __name__ == '__main__':
+    main()
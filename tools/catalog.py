@@ -0,0 +1,11 @@
+#!/usr/bin/env python3
+#
+# Look up regions, countries and timezones in the catalog of the data files.
+#
+# Runs main() of tzplus/catalog.py, which documents its usage.
+# The code is in the tzplus package so that it is installed under that name.
+
+from tzplus.catalog import main
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,279 @@
+#!/usr/bin/env python3
+#
+# Propose the classification of every Link of the raw TZDB files, by
+# comparing the transition histories of the Links and their Zones, and print
+# the differences with the hand-maintained classified_links.txt file.
+#
+# The full history of every Zone, including the pre-1970 Zones of 'backzone'
+# which replace some of the Links, is computed with transitions.py and hashed
+# in two parts: the transitions before 1970, and the state at 1970 followed by
+# the transitions after it. A Link is proposed as:
+#
+#   * 'Similar' if 'backzone' gives it a history which differs from the
+#     history of its Zone, or if zone.tab places it in a different country
+#     than its Zone;
+#   * otherwise, its current tag if it is 'Alias', 'Alternate' or 'Obsolete',
+#     or 'Alias' for a new Link.
+#
+# The histories cannot tell 'Alias', 'Alternate' and 'Obsolete' apart, since
+# they all name the same timezone. That choice is left to the maintainer.
+#
+# Usage:
+# $ classify_links.py
+#   [--until_year {year}]
+#   [--groups]
+#   [--output {file}]
+#   tzdb_dir classified_links.txt
+#
+# If --groups is given, the Zones with identical histories before 1970, and
+# since 1970, are also printed. If --output is given, the proposed
+# classified_links.txt entries are written to the file.
+
+from typing import Dict
+from typing import List
+from typing import NamedTuple
+from typing import Optional
+from typing import TextIO
+
+import argparse
+import hashlib
+import os
+import struct
+import sys
+
+from transitions import Transition
+from transitions import zone_transitions
+from tzplus.extract_tzdb import ALL_FILES
+from tzplus.extract_tzdb import Tzdb
+from tzplus.extract_tzdb import load_tzdb
+from tzplus.extract_tzdb import read_version
+from tzplus.extract_tzdb import read_zone_tab
+from tzplus.verify_data import Entry
+from tzplus.verify_data import link_resolver
+from tzplus.verify_data import read_links
+
+# Tags of the Links which name the same timezone as their Zone.
+SAME_ZONE_TAGS = ['Alias', 'Alternate', 'Obsolete']
+
+PROPOSED_HEADER = """\
+# Classification of the Links proposed by tools/classify_links.py, from the
+# transition histories of TZDB {version}. See classified_links.txt.
+#
+# tag target link # reason
+
+"""
+
+
+class ZoneHistory(NamedTuple):
+    before_1970: str  # sha256 of the transitions before 1970
+    since_1970: str  # sha256 of the state at 1970 and the later transitions
+
+
+class Proposal(NamedTuple):
+    tag: str
+    target: str
+    reason: str
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description='Propose the classification of Links from their history.')
+    parser.add_argument(
+        '--until_year',
+        help='End of the compared histories (default: 2040)',
+        type=int,
+        default=2040)
+    parser.add_argument(
+        '--groups',
+        help='Print the Zones with identical histories',
+        action='store_true')
+    parser.add_argument('--output', help='Output file of proposed entries')
+    parser.add_argument('tzdb', help='Directory of raw TZDB files')
+    parser.add_argument('classified_links', help='classified_links.txt file')
+    args = parser.parse_args()
+
+    main_tzdb = load_tzdb(args.tzdb)
+    full_tzdb = load_tzdb(args.tzdb, ALL_FILES)
+    histories = compute_histories(full_tzdb, args.until_year)
+    countries = zone_countries(os.path.join(args.tzdb, 'zone.tab'))
+    current = read_links(args.classified_links)
+    proposals = propose_links(main_tzdb, histories, countries, current)
+
+    if args.groups:
+        print('Identical histories before 1970:')
+        for group in group_histories(histories, 'before_1970'):
+            print(f"  {' '.join(group)}")
+        print('Identical histories since 1970:')
+        for group in group_histories(histories, 'since_1970'):
+            print(f"  {' '.join(group)}")
+
+    differences = diff_links(current, proposals)
+    for line in differences:
+        print(line)
+    print(
+        f"{len(proposals)} links, {len(differences)} differences with "
+        f"{args.classified_links}",
+        file=sys.stderr)
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            write_proposals(f, read_version(args.tzdb), proposals)
+
+# -----------------------------------------------------------------------------
+
+
+def compute_histories(tzdb: Tzdb, until_year: int) -> Dict[str, ZoneHistory]:
+    """Return the {zone -> ZoneHistory} of every Zone of 'tzdb'."""
+    return {
+        name: hash_history(zone_transitions(tzdb, zone, until_year))
+        for name, zone in tzdb.zones.items()
+    }
+
+
+def hash_history(transitions: List[Transition]) -> ZoneHistory:
+    """Hash the transitions before 1970, and the state at 1970 followed by
+    the transitions after it, so that two Zones which differ only before
+    1970 have the same 'since_1970' hash.
+    """
+    before = hashlib.sha256()
+    since = hashlib.sha256()
+    state: Optional[Transition] = None
+    for t in transitions:
+        if t.time <= 0:
+            state = t
+        if t.time < 0:
+            before.update(pack_transition(t.time, t))
+    if state is not None:
+        since.update(pack_transition(0, state))
+    for t in transitions:
+        if t.time > 0:
+            since.update(pack_transition(t.time, t))
+    return ZoneHistory(before.hexdigest(), since.hexdigest())
+
+
+def pack_transition(time: int, t: Transition) -> bytes:
+    return (
+        struct.pack('<qi?', time, t.offset, t.is_dst)
+        + t.abbreviation.encode('utf-8') + b'\0'
+    )
+
+
+def group_histories(
+    histories: Dict[str, ZoneHistory],
+    field: str,
+) -> List[List[str]]:
+    """Return the groups of 2 or more zones whose 'field' hash of
+    ZoneHistory is identical, sorted by name.
+    """
+    groups: Dict[str, List[str]] = {}
+    for name, history in histories.items():
+        groups.setdefault(getattr(history, field), []).append(name)
+    return sorted(
+        sorted(names) for names in groups.values() if len(names) > 1
+    )
+
+
+def zone_countries(filename: str) -> Dict[str, str]:
+    """Return the {timezone -> country code} of zone.tab."""
+    return {
+        record.timezone: record.codes[0]
+        for record in read_zone_tab(filename)
+    }
+
+# -----------------------------------------------------------------------------
+
+
+def propose_links(
+    tzdb: Tzdb,
+    histories: Dict[str, ZoneHistory],
+    countries: Dict[str, str],
+    current: Dict[str, Entry],
+) -> Dict[str, Proposal]:
+    """Return the {link -> Proposal} of each Link of 'tzdb', using the
+    'histories' of the Zones including 'backzone', and the 'countries' of
+    zone.tab. The target of 'current' is kept if it resolves to the same
+    Zone (e.g. 'Alias Africa/Asmara Africa/Asmera'), and so is the tag of a
+    Link which names the same timezone as its Zone.
+    """
+    resolver = link_resolver(tzdb.links)
+    proposals: Dict[str, Proposal] = {}
+    for name, target in sorted(tzdb.links.items()):
+        zone = resolver.resolve(name)
+        assert zone is not None
+        entry = current.get(name)
+        if (
+            entry is not None and entry.target is not None
+            and resolver.resolve(entry.target) == zone
+        ):
+            target = entry.target
+        link_history = histories.get(name)
+        zone_history = histories.get(zone)
+        country = countries.get(name)
+        zone_country = countries.get(zone)
+
+        if link_history is not None and link_history != zone_history:
+            assert zone_history is not None
+            period = (
+                'before 1970'
+                if link_history.since_1970 == zone_history.since_1970
+                else 'since 1970'
+            )
+            proposals[name] = Proposal(
+                'Similar', target, f"backzone history differs {period}")
+        elif (
+            country is not None and zone_country is not None
+            and country != zone_country
+        ):
+            proposals[name] = Proposal(
+                'Similar', target,
+                f"country {country} differs from {zone_country}")
+        else:
+            tag = (
+                entry.tag if entry is not None and entry.tag in SAME_ZONE_TAGS
+                else 'Alias'
+            )
+            proposals[name] = Proposal(tag, target, f"same history as {zone}")
+    return proposals
+
+
+def diff_links(
+    current: Dict[str, Entry],
+    proposals: Dict[str, Proposal],
+) -> List[str]:
+    """Return the differences between the 'current' classified links and the
+    'proposals', one line per link, sorted by link name.
+    """
+    differences: List[str] = []
+    for name in sorted(set(current) | set(proposals)):
+        entry = current.get(name)
+        proposal = proposals.get(name)
+        if proposal is None:
+            assert entry is not None
+            differences.append(f"{name}: {entry.tag} -> removed")
+        elif entry is None:
+            differences.append(
+                f"{name}: new -> {proposal.tag} ({proposal.reason})")
+        elif entry.target != proposal.target:
+            differences.append(
+                f"{name}: target {entry.target} -> {proposal.target}")
+        elif entry.tag != proposal.tag:
+            differences.append(
+                f"{name}: {entry.tag} -> {proposal.tag} ({proposal.reason})")
+    return differences
+
+
+def write_proposals(
+    output: TextIO,
+    version: str,
+    proposals: Dict[str, Proposal],
+) -> None:
+    output.write(PROPOSED_HEADER.format(version=version))
+    for name, proposal in sorted(proposals.items()):
+        output.write(
+            f"{proposal.tag} {proposal.target} {name} # {proposal.reason}\n")
+
+# -----------------------------------------------------------------------------
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,11 @@
+#!/usr/bin/env python3
+#
+# Export the catalog as dictionary-encoded columns for analytics engines.
+#
+# Runs main() of tzplus/columnar_export.py, which documents its usage.
+# The code is in the tzplus package so that it is installed under that name.
+
+from tzplus.columnar_export import main
+
+if __name__ == '__main__':
+    main()
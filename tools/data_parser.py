@@ -0,0 +1,11 @@
+#!/usr/bin/env python3
+#
+# Count the lines of the data/*.txt files with the streaming parser.
+#
+# Runs main() of tzplus/data_parser.py, which documents its usage.
+# The code is in the tzplus package so that it is installed under that name.
+
+from tzplus.data_parser import main
+
+if __name__ == '__main__':
+    main()
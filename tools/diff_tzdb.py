@@ -0,0 +1,508 @@
+#!/usr/bin/env python3
+#
+# Compare two TZDB releases block by block, report the Zones, Links and Rules
+# which were added, removed, renamed or changed, and suggest the patch of the
+# manually maintained data files (classified_zones.txt, classified_links.txt
+# and country_timezones.txt) needed to upgrade to the new release.
+#
+# Each raw file is split into blocks: a Zone with its continuation lines, all
+# the Rule lines of a name, or a single Link. The comments and the spacing are
+# removed, and each block is identified by the sha256 of its normalized
+# tokens. Files whose content is identical in both releases are skipped
+# without being split, and only the blocks whose hashes differ are
+# classified, so that a release bump is processed in a fraction of a second.
+#
+# Usage:
+# $ diff_tzdb.py
+#   [--git {tz_repo}]
+#   [--data_dir {dir}]
+#   [--patch {file}]
+#   [--update]
+#   old new
+#
+# where 'old' and 'new' are tags in the tz_repo if --git is given, otherwise
+# they are directories of raw TZDB files or tzdata*.tar.gz files.
+#
+# The report is printed on stdout. If --data_dir is given, the suggested
+# patch of its data files is printed in unified diff format after the report,
+# or written to the --patch file, which can be applied with 'patch -p1'. New
+# Links are proposed as 'Alias', or 'Similar' for a Zone merged into another
+# one, and should be reviewed with classify_links.py. New timezones are added
+# to country_timezones.txt using the country of zone.tab, and the region of
+# the other timezones of that country.
+#
+# If --update is given, the derived zones.txt and links.txt files in the
+# --data_dir are updated in place from the changed blocks, instead of
+# extracting them again from all the raw files.
+#
+# Example:
+# $ diff_tzdb.py --git ../tz --data_dir data 2023c 2024a
+
+from typing import Callable
+from typing import Dict
+from typing import Iterable
+from typing import List
+from typing import NamedTuple
+from typing import Optional
+from typing import Set
+from typing import Tuple
+
+import argparse
+import difflib
+import hashlib
+import os
+import sys
+
+from tzplus.errors import error
+from tzplus.extract_tzdb import MAIN_FILES
+from tzplus.extract_tzdb import parse_zone_tab
+from verify_releases import read_git_files
+from verify_releases import read_tarball_files
+
+# File which gives the country of new timezones.
+ZONE_TAB_FILE = 'zone.tab'
+
+# Unknown region or country of a new timezone in country_timezones.txt.
+UNKNOWN_CODE = '??'
+
+BlockKey = Tuple[str, str]  # (kind, name), where kind is Zone, Rule or Link
+
+
+class Block(NamedTuple):
+    """The normalized tokens of a Zone with its continuation lines, of all
+    the Rule lines of a name, or of a Link, in a raw TZDB file.
+    """
+    kind: str
+    name: str
+    lines: List[List[str]]
+    digest: str  # sha256 of the lines
+    filename: str
+
+
+class TzdbDiff(NamedTuple):
+    """Differences between two TZDB releases, sorted by name."""
+    added_zones: List[str]
+    removed_zones: List[str]
+    renamed_zones: List[Tuple[str, str]]  # (old name, new name)
+    merged_zones: List[Tuple[str, str]]  # (zone, target of its new Link)
+    split_zones: List[Tuple[str, str]]  # (zone, target of its old Link)
+    changed_zones: List[str]
+    added_links: List[Tuple[str, str]]  # (link, target)
+    removed_links: List[Tuple[str, str]]  # (link, target)
+    changed_links: List[Tuple[str, str, str]]  # (link, old, new target)
+    added_rules: List[str]
+    removed_rules: List[str]
+    changed_rules: List[str]
+    changed_files: List[str]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description='Compare two TZDB releases and suggest data file patches.')
+    parser.add_argument(
+        '--git',
+        help='Local git repo of the TZDB; releases are tags')
+    parser.add_argument(
+        '--data_dir',
+        help='Directory of data files to patch')
+    parser.add_argument(
+        '--patch',
+        help='Output file of the suggested patch (default: stdout)')
+    parser.add_argument(
+        '--update',
+        help='Update zones.txt and links.txt in the --data_dir',
+        action='store_true')
+    parser.add_argument('old', help='Old release')
+    parser.add_argument('new', help='New release')
+    args = parser.parse_args()
+    if (args.patch or args.update) and not args.data_dir:
+        error("--patch and --update require --data_dir")
+
+    old_files = read_tree(args.old, args.git)
+    new_files = read_tree(args.new, args.git)
+    diff = diff_trees(old_files, new_files)
+    print_diff(diff)
+
+    if not args.data_dir:
+        return
+
+    countries = {
+        record.timezone: record.codes[0]
+        for record in parse_zone_tab(
+            new_files.get(ZONE_TAB_FILE, '').splitlines())
+    }
+    patchers: List[Tuple[str, Callable[[List[str]], List[str]]]] = [
+        ('classified_zones.txt',
+            lambda lines: patch_classified_zones(lines, diff)),
+        ('classified_links.txt',
+            lambda lines: patch_classified_links(lines, diff)),
+        ('country_timezones.txt',
+            lambda lines: patch_country_timezones(lines, diff, countries)),
+    ]
+    patch: List[str] = []
+    for filename, patcher in patchers:
+        path = os.path.join(args.data_dir, filename)
+        lines = read_data_lines(path)
+        patch.extend(difflib.unified_diff(
+            lines, patcher(lines), f"a/{filename}", f"b/{filename}"))
+    if args.patch:
+        with open(args.patch, 'w', encoding='utf-8') as f:
+            f.writelines(patch)
+    else:
+        sys.stdout.writelines(patch)
+
+    if args.update:
+        update_derived_files(args.data_dir, diff)
+
+
+def read_tree(release: str, repo: Optional[str]) -> Dict[str, str]:
+    """Return the {filename -> content} of the raw TZDB files of 'release',
+    which is a tag of 'repo', a tzdata*.tar.gz file, or a directory.
+    """
+    names = MAIN_FILES + [ZONE_TAB_FILE]
+    if repo:
+        files = read_git_files(repo, release, names)
+    elif release.endswith('.tar.gz'):
+        files = read_tarball_files(release, names)
+    else:
+        files = read_directory_files(release, names)
+    if not files:
+        error(f"No TZDB files in '{release}'")
+    return files
+
+
+def read_directory_files(directory: str, names: List[str]) -> Dict[str, str]:
+    files: Dict[str, str] = {}
+    for name in names:
+        path = os.path.join(directory, name)
+        if os.path.exists(path):
+            with open(path, 'r', encoding='utf-8') as f:
+                files[name] = f.read()
+    return files
+
+
+def read_data_lines(path: str) -> List[str]:
+    with open(path, 'r', encoding='utf-8') as f:
+        return f.readlines()
+
+
+def print_diff(diff: TzdbDiff) -> None:
+    print(f"Changed files: {' '.join(diff.changed_files) or '(none)'}")
+    for zone in diff.added_zones:
+        print(f"Zone added: {zone}")
+    for zone in diff.removed_zones:
+        print(f"Zone removed: {zone}")
+    for old, new in diff.renamed_zones:
+        print(f"Zone renamed: {old} -> {new}")
+    for zone, target in diff.merged_zones:
+        print(f"Zone merged: {zone} -> Link to {target}")
+    for zone, target in diff.split_zones:
+        print(f"Zone split: {zone} (was Link to {target})")
+    for zone in diff.changed_zones:
+        print(f"Zone changed: {zone}")
+    for link, target in diff.added_links:
+        print(f"Link added: {link} -> {target}")
+    for link, target in diff.removed_links:
+        print(f"Link removed: {link} -> {target}")
+    for link, old, new in diff.changed_links:
+        print(f"Link changed: {link} -> {new} (was {old})")
+    for rule in diff.added_rules:
+        print(f"Rule added: {rule}")
+    for rule in diff.removed_rules:
+        print(f"Rule removed: {rule}")
+    for rule in diff.changed_rules:
+        print(f"Rule changed: {rule}")
+
+# -----------------------------------------------------------------------------
+
+
+def split_blocks(content: str, filename: str) -> Dict[BlockKey, Block]:
+    """Split a raw TZDB file into its Zone, Rule and Link blocks, without
+    parsing their fields.
+    """
+    groups: Dict[BlockKey, List[List[str]]] = {}
+    zone: Optional[List[List[str]]] = None
+    for lineno, line in enumerate(content.splitlines(), start=1):
+        code = line.partition('#')[0]
+        tokens = code.split()
+        if not tokens:
+            continue
+        if code[0].isspace():
+            if zone is None:
+                error(f"{filename}:{lineno}: Unexpected continuation line")
+            assert zone is not None
+            zone.append(tokens)
+            continue
+
+        zone = None
+        tag = tokens[0]
+        if tag == 'Zone' and len(tokens) >= 5:
+            zone = groups.setdefault((tag, tokens[1]), [])
+            zone.append(tokens)
+        elif tag == 'Rule' and len(tokens) == 10:
+            groups.setdefault((tag, tokens[1]), []).append(tokens)
+        elif tag == 'Link' and len(tokens) == 3:
+            groups.setdefault((tag, tokens[2]), []).append(tokens)
+        else:
+            error(f"{filename}:{lineno}: Invalid line")
+
+    return {
+        (kind, name): Block(kind, name, lines, hash_lines(lines), filename)
+        for (kind, name), lines in groups.items()
+    }
+
+
+def hash_lines(lines: List[List[str]]) -> str:
+    text = '\n'.join(' '.join(tokens) for tokens in lines)
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+
+def changed_blocks(
+    old_files: Dict[str, str],
+    new_files: Dict[str, str],
+) -> Tuple[List[str], Dict[BlockKey, Block], Dict[BlockKey, Block]]:
+    """Return the names of the changed main files, and the blocks of those
+    files which were added, removed or changed, in the (old, new) releases.
+    """
+    changed_files = [
+        name for name in MAIN_FILES
+        if old_files.get(name) != new_files.get(name)
+    ]
+    old_blocks: Dict[BlockKey, Block] = {}
+    new_blocks: Dict[BlockKey, Block] = {}
+    for name in changed_files:
+        old_blocks.update(split_blocks(old_files.get(name, ''), name))
+        new_blocks.update(split_blocks(new_files.get(name, ''), name))
+
+    # Blocks which only moved between files, or whose comments changed.
+    for key in old_blocks.keys() & new_blocks.keys():
+        if old_blocks[key].digest == new_blocks[key].digest:
+            del old_blocks[key]
+            del new_blocks[key]
+    return changed_files, old_blocks, new_blocks
+
+
+def diff_trees(
+    old_files: Dict[str, str],
+    new_files: Dict[str, str],
+) -> TzdbDiff:
+    """Compare the {filename -> content} of two TZDB releases."""
+    changed_files, old_blocks, new_blocks = changed_blocks(
+        old_files, new_files)
+
+    def names(blocks: Dict[BlockKey, Block], kind: str) -> Set[str]:
+        return {name for k, name in blocks if k == kind}
+
+    old_zones = names(old_blocks, 'Zone')
+    new_zones = names(new_blocks, 'Zone')
+    old_links = {
+        name: old_blocks[('Link', name)].lines[0][1]
+        for name in names(old_blocks, 'Link')
+    }
+    new_links = {
+        name: new_blocks[('Link', name)].lines[0][1]
+        for name in names(new_blocks, 'Link')
+    }
+    added_zones = new_zones - old_zones
+    removed_zones = old_zones - new_zones
+
+    # A removed Zone which is kept as a Link (in 'backward') was either
+    # renamed to a new Zone, or merged into an existing Zone.
+    renamed: List[Tuple[str, str]] = []
+    merged: List[Tuple[str, str]] = []
+    for zone in sorted(removed_zones):
+        target = new_links.get(zone)
+        if target is None:
+            continue
+        if target in added_zones:
+            renamed.append((zone, target))
+        else:
+            merged.append((zone, target))
+    for zone, target in renamed + merged:
+        removed_zones.discard(zone)
+        added_zones.discard(target)
+        new_links.pop(zone, None)
+
+    # An added Zone which was a Link.
+    split = [
+        (zone, old_links.pop(zone))
+        for zone in sorted(added_zones) if zone in old_links
+    ]
+    for zone, _ in split:
+        added_zones.discard(zone)
+
+    changed_links = [
+        (name, old_links.pop(name), new_links.pop(name))
+        for name in sorted(old_links.keys() & new_links.keys())
+    ]
+
+    return TzdbDiff(
+        added_zones=sorted(added_zones),
+        removed_zones=sorted(removed_zones),
+        renamed_zones=renamed,
+        merged_zones=merged,
+        split_zones=split,
+        changed_zones=sorted(old_zones & new_zones),
+        added_links=sorted(new_links.items()),
+        removed_links=sorted(old_links.items()),
+        changed_links=changed_links,
+        added_rules=sorted(
+            names(new_blocks, 'Rule') - names(old_blocks, 'Rule')),
+        removed_rules=sorted(
+            names(old_blocks, 'Rule') - names(new_blocks, 'Rule')),
+        changed_rules=sorted(
+            names(old_blocks, 'Rule') & names(new_blocks, 'Rule')),
+        changed_files=changed_files,
+    )
+
+# -----------------------------------------------------------------------------
+
+
+def line_key(line: str, index: int) -> Optional[str]:
+    """Return the token at 'index' of a data line, or None for a comment or
+    blank line.
+    """
+    tokens = line.partition('#')[0].split()
+    return tokens[index] if len(tokens) > index else None
+
+
+def remove_lines(lines: List[str], index: int, names: Set[str]) -> List[str]:
+    """Remove the data lines whose key at 'index' is one of 'names'."""
+    return [line for line in lines if line_key(line, index) not in names]
+
+
+def insert_line(lines: List[str], index: int, line: str) -> List[str]:
+    """Insert 'line' before the first data line whose key at 'index' sorts
+    after it, or after the last data line.
+    """
+    key = line_key(line, index)
+    assert key is not None
+    position = len(lines)
+    for i, existing in enumerate(lines):
+        existing_key = line_key(existing, index)
+        if existing_key is None:
+            continue
+        if existing_key > key:
+            position = i
+            break
+        position = i + 1
+    return lines[:position] + [line] + lines[position:]
+
+
+def insert_lines(
+    lines: List[str],
+    index: int,
+    new_lines: Iterable[str],
+) -> List[str]:
+    for line in new_lines:
+        lines = insert_line(lines, index, line)
+    return lines
+
+
+def patch_classified_zones(lines: List[str], diff: TzdbDiff) -> List[str]:
+    removed = set(diff.removed_zones)
+    removed.update(zone for zone, _ in diff.renamed_zones)
+    removed.update(zone for zone, _ in diff.merged_zones)
+    added = list(diff.added_zones)
+    added.extend(new for _, new in diff.renamed_zones)
+    added.extend(zone for zone, _ in diff.split_zones)
+    return insert_lines(
+        remove_lines(lines, 1, removed), 1,
+        (f"Zone {zone}\n" for zone in added))
+
+
+def patch_classified_links(lines: List[str], diff: TzdbDiff) -> List[str]:
+    removed = {link for link, _ in diff.removed_links}
+    removed.update(zone for zone, _ in diff.split_zones)
+    lines = remove_lines(lines, 2, removed)  # copy, modified below
+
+    # Retarget the links whose target was not redirected by hand.
+    changed = {link: (old, new) for link, old, new in diff.changed_links}
+    for i, line in enumerate(lines):
+        link = line_key(line, 2)
+        if link in changed and line_key(line, 1) == changed[link][0]:
+            tag, old, _ = line.split(None, 2)
+            lines[i] = line.replace(
+                f"{tag} {old} {link}", f"{tag} {changed[link][1]} {link}")
+
+    added = [
+        f"Alias {target} {link}\n" for link, target in diff.added_links
+    ]
+    added.extend(
+        f"Alias {new} {old}\n" for old, new in diff.renamed_zones)
+    added.extend(
+        f"Similar {target} {zone}\n" for zone, target in diff.merged_zones)
+    return insert_lines(lines, 2, added)
+
+
+def patch_country_timezones(
+    lines: List[str],
+    diff: TzdbDiff,
+    countries: Dict[str, str],
+) -> List[str]:
+    """Rename the timezones of the renamed Zones, remove the timezones which
+    no longer exist, and add the new Zones.
+    """
+    renamed = dict(diff.renamed_zones)
+    lines = list(lines)
+    for i, line in enumerate(lines):
+        timezone = line_key(line, 2)
+        if timezone in renamed:
+            lines[i] = line.replace(timezone, renamed[timezone], 1)
+
+    removed = set(diff.removed_zones)
+    removed.update(link for link, _ in diff.removed_links)
+    lines = remove_lines(lines, 2, removed)
+
+    # Region of each country, from its other timezones.
+    regions: Dict[str, str] = {}
+    for line in lines:
+        tokens = line.partition('#')[0].split()
+        if len(tokens) == 3:
+            regions.setdefault(tokens[1], tokens[0])
+
+    added = list(diff.added_zones)
+    added.extend(zone for zone, _ in diff.split_zones)
+    new_lines = []
+    for zone in added:
+        country = countries.get(zone, UNKNOWN_CODE)
+        region = regions.get(country, UNKNOWN_CODE)
+        new_lines.append(f"{region} {country} {zone}\n")
+    return insert_lines(lines, 2, new_lines)
+
+# -----------------------------------------------------------------------------
+
+
+def update_derived_files(data_dir: str, diff: TzdbDiff) -> None:
+    """Apply 'diff' to the zones.txt and links.txt files of 'data_dir'."""
+    zones_path = os.path.join(data_dir, 'zones.txt')
+    lines = read_data_lines(zones_path)
+    lines = remove_lines(lines, 1, set(diff.removed_zones) | {
+        zone for zone, _ in diff.renamed_zones + diff.merged_zones
+    })
+    added = list(diff.added_zones)
+    added.extend(new for _, new in diff.renamed_zones)
+    added.extend(zone for zone, _ in diff.split_zones)
+    lines = insert_lines(lines, 1, (f"Zone {zone}\n" for zone in added))
+    with open(zones_path, 'w', encoding='utf-8') as f:
+        f.writelines(lines)
+
+    links_path = os.path.join(data_dir, 'links.txt')
+    lines = read_data_lines(links_path)
+    links = [(link, target) for link, _, target in diff.changed_links]
+    links.extend(diff.added_links)
+    links.extend((old, new) for old, new in diff.renamed_zones)
+    links.extend(diff.merged_zones)
+    lines = remove_lines(lines, 2, {link for link, _ in diff.removed_links} | {
+        zone for zone, _ in diff.split_zones
+    } | {link for link, _ in links})
+    lines = insert_lines(
+        lines, 2, (f"Link {target} {link}\n" for link, target in links))
+    with open(links_path, 'w', encoding='utf-8') as f:
+        f.writelines(lines)
+
+# -----------------------------------------------------------------------------
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,12 @@
+#!/usr/bin/env python3
+#
+# Extract the Zone, Rule and Link entries from the raw TZDB files, and write
+# the zones.txt and links.txt files.
+#
+# Runs main() of tzplus/extract_tzdb.py, which documents its usage.
+# The code is in the tzplus package so that it is installed under that name.
+
+from tzplus.extract_tzdb import main
+
+if __name__ == '__main__':
+    main()
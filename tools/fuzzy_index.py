@@ -0,0 +1,11 @@
+#!/usr/bin/env python3
+#
+# Fuzzy search of the timezone IDs and country names.
+#
+# Runs main() of tzplus/fuzzy_index.py, which documents its usage.
+# The code is in the tzplus package so that it is installed under that name.
+
+from tzplus.fuzzy_index import main
+
+if __name__ == '__main__':
+    main()
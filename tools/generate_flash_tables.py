@@ -0,0 +1,427 @@
+#!/usr/bin/env python3
+#
+# Generate compact C/C++ tables of the region -> country -> timezone hierarchy
+# for microcontrollers, stored in flash memory using PROGMEM. All strings are
+# deduplicated into a single NUL-terminated string pool, and the common
+# prefixes of the timezone IDs (e.g. 'America/', 'Pacific/') are replaced by a
+# single fragment byte (0x01-0x1F) which indexes into a fragment table. Records
+# refer to strings and to other records through small integer indexes. A
+# per-table byte budget is printed, compared to a naive array of strings.
+#
+# Usage:
+# $ generate_flash_tables.py
+#   --regions {file}
+#   --countries {file}
+#   [--output_dir {dir}]
+#   [--name {name}]
+#   country_timezones.txt
+
+from typing import Dict
+from typing import List
+from typing import NamedTuple
+from typing import Optional
+from typing import Tuple
+
+import argparse
+import os
+
+from tzplus.list_zones import RegionCountryTimezones
+from tzplus.list_zones import build_region_country_timezones
+from tzplus.snapshot import load_rows
+
+# Fragment bytes are 0x01 to 0x1F, which never appear in ASCII names.
+MAX_FRAGMENTS = 31
+
+# Size of a pointer in a naive 'const char* const names[]' array, using the
+# smallest common microcontroller (8-bit AVR).
+POINTER_SIZE = 2
+
+
+class FlashTables(NamedTuple):
+    """The encoded tables. Each string is an offset into 'strings'."""
+    fragments: List[str]
+    strings: bytes
+    # (name offset, first country record, number of country records)
+    regions: List[Tuple[int, int, int]]
+    # (country code, short name offset, first timezone, num timezones)
+    countries: List[Tuple[str, int, int, int]]
+    # timezone name offset, grouped by country record
+    timezones: List[int]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description='Generate C/C++ flash tables of timezones.')
+    parser.add_argument(
+        '--regions', help='Region code to name', required=True)
+    parser.add_argument(
+        '--countries', help='Country code to short name', required=True)
+    parser.add_argument(
+        '--output_dir', help='Directory of generated files', default='.')
+    parser.add_argument(
+        '--name', help='Base name of generated files', default='tzplus_menu')
+    parser.add_argument('timezones', help='Timezone file')
+    args = parser.parse_args()
+
+    tables = load_rows({
+        'regions': args.regions,
+        'iso_short': args.countries,
+        'country_timezones': args.timezones,
+    })
+    regions = {row[0]: row[1] for row in tables['regions']}
+    countries = {row[0]: row[1] for row in tables['iso_short']}
+    zones = build_region_country_timezones(tables['country_timezones'])
+
+    flash = encode_tables(regions, countries, zones)
+    header, source = generate_cpp(args.name, flash)
+    with open(os.path.join(args.output_dir, f'{args.name}.h'), 'w') as f:
+        f.write(header)
+    with open(os.path.join(args.output_dir, f'{args.name}.cpp'), 'w') as f:
+        f.write(source)
+    print_budget(flash, naive_size(regions, countries, zones))
+
+# -----------------------------------------------------------------------------
+
+
+def encode_tables(
+    regions: Dict[str, str],
+    countries: Dict[str, str],
+    zones: RegionCountryTimezones,
+) -> FlashTables:
+    """Encode the region -> country -> timezone hierarchy, sorted in the same
+    order as list_zones.py.
+    """
+    timezone_names = sorted({
+        timezone
+        for country_timezones in zones.values()
+        for timezones in country_timezones.values()
+        for timezone in timezones
+    })
+    fragments = select_fragments(timezone_names)
+
+    pool = StringPool(fragments)
+    region_records: List[Tuple[int, int, int]] = []
+    country_records: List[Tuple[str, int, int, int]] = []
+    timezone_records: List[int] = []
+    for region, country_timezones in sorted(zones.items()):
+        region_records.append((
+            pool.add(regions.get(region, region)),
+            len(country_records),
+            len(country_timezones),
+        ))
+        for country, timezones in sorted(country_timezones.items()):
+            country_records.append((
+                country,
+                pool.add(countries.get(country, country)),
+                len(timezone_records),
+                len(timezones),
+            ))
+            for timezone in sorted(timezones):
+                timezone_records.append(pool.add(timezone))
+
+    return FlashTables(
+        fragments=fragments,
+        strings=pool.data(),
+        regions=region_records,
+        countries=country_records,
+        timezones=timezone_records,
+    )
+
+
+def select_fragments(names: List[str]) -> List[str]:
+    """Greedily select the '/'-terminated prefixes of 'names' which save the
+    most bytes when each name is encoded using its longest fragment. Each
+    fragment costs its own bytes, a NUL, and a 2-byte offset.
+    """
+    candidates = set()
+    for name in names:
+        for i, c in enumerate(name):
+            if c == '/':
+                candidates.add(name[:i + 1])
+
+    def savings(fragments: List[str]) -> int:
+        total = 0
+        for name in names:
+            best = longest_fragment(name, fragments)
+            if best is not None:
+                total += len(fragments[best]) - 1
+        return total - sum(len(f) + 3 for f in fragments)
+
+    selected: List[str] = []
+    current = 0
+    while len(selected) < MAX_FRAGMENTS:
+        best_fragment: Optional[str] = None
+        best_savings = current
+        for candidate in sorted(candidates - set(selected)):
+            s = savings(selected + [candidate])
+            if s > best_savings:
+                best_fragment, best_savings = candidate, s
+        if best_fragment is None:
+            break
+        selected.append(best_fragment)
+        current = best_savings
+    return sorted(selected)
+
+
+def longest_fragment(name: str, fragments: List[str]) -> Optional[int]:
+    """Return the index of the longest fragment which is a prefix of 'name'."""
+    best: Optional[int] = None
+    for i, fragment in enumerate(fragments):
+        if name.startswith(fragment):
+            if best is None or len(fragment) > len(fragments[best]):
+                best = i
+    return best
+
+
+class StringPool:
+    """A pool of deduplicated, NUL-terminated, fragment-encoded strings."""
+
+    def __init__(self, fragments: List[str]):
+        self.fragments = fragments
+        self.offsets: Dict[str, int] = {}
+        self.encoded: List[bytes] = []
+        self.size = 0
+
+    def add(self, s: str) -> int:
+        """Add 's' to the pool if necessary, and return its offset."""
+        offset = self.offsets.get(s)
+        if offset is not None:
+            return offset
+        encoded = encode_string(s, self.fragments)
+        offset = self.size
+        self.offsets[s] = offset
+        self.encoded.append(encoded)
+        self.size += len(encoded)
+        if self.size > 0xFFFF:
+            raise ValueError('String pool exceeds 64 kB')
+        return offset
+
+    def data(self) -> bytes:
+        return b''.join(self.encoded)
+
+
+def encode_string(s: str, fragments: List[str]) -> bytes:
+    """Encode 's' as ASCII, replacing its longest fragment prefix with the
+    fragment byte, followed by a NUL terminator.
+    """
+    i = longest_fragment(s, fragments)
+    if i is None:
+        return s.encode('ascii') + b'\0'
+    return bytes([i + 1]) + s[len(fragments[i]):].encode('ascii') + b'\0'
+
+
+def decode_string(data: bytes, offset: int, fragments: List[str]) -> str:
+    """Decode the string at 'offset' in the pool, the same way as the
+    generated C function."""
+    end = data.index(b'\0', offset)
+    s = data[offset:end]
+    if s and s[0] <= MAX_FRAGMENTS:
+        return fragments[s[0] - 1] + s[1:].decode('ascii')
+    return s.decode('ascii')
+
+# -----------------------------------------------------------------------------
+
+
+def table_sizes(flash: FlashTables) -> List[Tuple[str, int]]:
+    """Return the (table, bytes) of each generated table, using the struct
+    sizes of an 8-bit AVR, which has no padding.
+    """
+    fragment_bytes = sum(len(f) + 1 for f in flash.fragments)
+    return [
+        ('Fragments', fragment_bytes + 2 * len(flash.fragments)),
+        ('Strings', len(flash.strings) + 1),
+        ('Regions', 5 * len(flash.regions)),
+        ('Countries', 7 * len(flash.countries)),
+        ('Timezones', 2 * len(flash.timezones)),
+    ]
+
+
+def naive_size(
+    regions: Dict[str, str],
+    countries: Dict[str, str],
+    zones: RegionCountryTimezones,
+) -> int:
+    """Size of the hierarchy stored as nested arrays of C string pointers,
+    without deduplication or compression.
+    """
+    size = 0
+    for region, country_timezones in zones.items():
+        size += len(regions.get(region, region)) + 1 + POINTER_SIZE
+        for country, timezones in country_timezones.items():
+            size += 3 + POINTER_SIZE
+            size += len(countries.get(country, country)) + 1 + POINTER_SIZE
+            for timezone in timezones:
+                size += len(timezone) + 1 + POINTER_SIZE
+    return size
+
+
+def print_budget(flash: FlashTables, naive: int) -> None:
+    total = 0
+    print(f"{'Table':<12} {'Bytes':>6}")
+    for table, size in table_sizes(flash):
+        print(f"{table:<12} {size:>6}")
+        total += size
+    print(f"{'Total':<12} {total:>6}")
+    print(f"{'Naive':<12} {naive:>6} (saved {naive - total})")
+
+# -----------------------------------------------------------------------------
+
+
+def generate_cpp(name: str, flash: FlashTables) -> Tuple[str, str]:
+    """Return the (header, source) of the generated C/C++ files."""
+    guard = f'{name.upper()}_H'
+    header = f"""\
+// This file was generated by tools/generate_flash_tables.py.
+//
+// DO NOT EDIT
+
+#ifndef {guard}
+#define {guard}
+
+#include <stdint.h>
+#include <stddef.h>
+
+// Region record: regionCountries[countryStart, countryStart + countryCount)
+struct TzplusRegion {{
+  uint16_t name;
+  uint16_t countryStart;
+  uint8_t countryCount;
+}};
+
+// Country record within a region: timezones[timezoneStart, +timezoneCount)
+struct TzplusCountry {{
+  char code[2];
+  uint16_t name;
+  uint16_t timezoneStart;
+  uint8_t timezoneCount;
+}};
+
+extern const char kTzplusStrings[];
+extern const char* const kTzplusFragments[];
+extern const TzplusRegion kTzplusRegions[];
+extern const TzplusCountry kTzplusCountries[];
+extern const uint16_t kTzplusTimezones[];
+
+const uint8_t kTzplusNumFragments = {len(flash.fragments)};
+const uint8_t kTzplusNumRegions = {len(flash.regions)};
+const uint16_t kTzplusNumCountries = {len(flash.countries)};
+const uint16_t kTzplusNumTimezones = {len(flash.timezones)};
+
+/**
+ * Copy the string at 'offset' in kTzplusStrings into 'buf', expanding its
+ * fragment prefix. Returns the length of the string, truncated to size-1.
+ */
+size_t tzplusReadString(char* buf, size_t size, uint16_t offset);
+
+#endif
+"""
+
+    lines: List[str] = []
+    lines.append(f"""\
+// This file was generated by tools/generate_flash_tables.py.
+//
+// DO NOT EDIT
+
+#include "{name}.h"
+
+#if defined(ARDUINO)
+  #include <Arduino.h>
+#endif
+#ifndef PROGMEM
+  #define PROGMEM
+#endif
+#ifndef pgm_read_byte
+  #define pgm_read_byte(p) (*(const uint8_t*)(p))
+#endif
+#ifndef pgm_read_ptr
+  #define pgm_read_ptr(p) (*(const void* const*)(p))
+#endif
+""")
+
+    for i, fragment in enumerate(flash.fragments):
+        lines.append(
+            f'static const char kFragment{i + 1}[] PROGMEM = "{fragment}";')
+    lines.append('')
+    lines.append('const char* const kTzplusFragments[] PROGMEM = {')
+    for i in range(len(flash.fragments)):
+        lines.append(f'  kFragment{i + 1},')
+    lines.append('};')
+    lines.append('')
+
+    lines.append(
+        f'// {len(flash.strings)} bytes of NUL-terminated strings; '
+        'a leading byte 0x01-0x1F')
+    lines.append('// is an index into kTzplusFragments, plus 1.')
+    lines.append('const char kTzplusStrings[] PROGMEM =')
+    pos = 0
+    while pos < len(flash.strings):
+        end = flash.strings.index(b'\0', pos) + 1
+        lines.append(f'  "{c_escape(flash.strings[pos:end])}"')
+        pos = end
+    lines[-1] += ';'
+    lines.append('')
+
+    lines.append('const TzplusRegion kTzplusRegions[] PROGMEM = {')
+    for name_offset, start, count in flash.regions:
+        lines.append(f'  {{{name_offset}, {start}, {count}}},')
+    lines.append('};')
+    lines.append('')
+
+    lines.append('const TzplusCountry kTzplusCountries[] PROGMEM = {')
+    for code, name_offset, start, count in flash.countries:
+        lines.append(
+            f"  {{{{'{code[0]}', '{code[1]}'}}, {name_offset}, {start}, "
+            f"{count}}},")
+    lines.append('};')
+    lines.append('')
+
+    lines.append('const uint16_t kTzplusTimezones[] PROGMEM = {')
+    for offset in flash.timezones:
+        lines.append(f'  {offset},')
+    lines.append('};')
+    lines.append('')
+
+    lines.append("""\
+size_t tzplusReadString(char* buf, size_t size, uint16_t offset) {
+  const char* p = kTzplusStrings + offset;
+  size_t n = 0;
+  uint8_t c = pgm_read_byte(p);
+  if (c > 0 && c <= kTzplusNumFragments) {
+    const char* f = (const char*) pgm_read_ptr(&kTzplusFragments[c - 1]);
+    for (uint8_t fc; (fc = pgm_read_byte(f)) != 0 && n + 1 < size; f++) {
+      buf[n++] = fc;
+    }
+    p++;
+  }
+  for (; (c = pgm_read_byte(p)) != 0 && n + 1 < size; p++) {
+    buf[n++] = c;
+  }
+  if (size > 0) buf[n] = '\\0';
+  return n;
+}""")
+    return header, '\n'.join(lines) + '\n'
+
+
+def c_escape(s: bytes) -> str:
+    """Escape the bytes of a NUL-terminated string as a C string literal,
+    with an explicit NUL. The compiler appends one more NUL to the array.
+    """
+    out: List[str] = []
+    for i, b in enumerate(s[:-1]):
+        if 0x20 <= b < 0x7F and b not in b'"\\':
+            # A hex escape consumes the following hex digits, so split the
+            # literal after one.
+            if out and out[-1].startswith('\\x') and \
+                    chr(b) in '0123456789abcdefABCDEF':
+                out.append('" "')
+            out.append(chr(b))
+        else:
+            out.append(f'\\x{b:02x}')
+    out.append('\\0')
+    return ''.join(out)
+
+# -----------------------------------------------------------------------------
+
+
+if __name__ == '__main__':
+    main()
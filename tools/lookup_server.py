@@ -0,0 +1,481 @@
+#!/usr/bin/env python3
+#
+# A small asyncio server which loads the TimezoneCatalog and the prefix-search
+# index of the data files once, and answers batched lookups over a Unix
+# socket or local HTTP, so that services do not need to embed and parse the
+# data files themselves. The data files are polled for changes, and a new
+# catalog is built in a worker thread and swapped in with a single reference
+# assignment, so that each batch is answered entirely from either the old or
+# the new data.
+#
+# A request is a JSON object with a list of [op, argument] queries:
+#
+#   {"queries": [["country_timezones", "US"], ["search", "buenos"]]}
+#
+# and the response contains one result per query, in the same order, and the
+# generation of the catalog which answered them (incremented on each reload):
+#
+#   {"generation": 1, "results": [["America/New_York", ...], [...]]}
+#
+# The ops are listed in OPS. Over a Unix socket, each request and response is
+# a single line of JSON. Over HTTP, the request is the body of 'POST /query'.
+#
+# Usage:
+# $ lookup_server.py
+#   [--socket {path} | --port {port}]
+#   [--snapshot {file}]
+#   [--poll {seconds}]
+#   [--load_test [--clients {n}] [--duration {seconds}] [--batch {n}]]
+#   data_dir
+#
+# If --load_test is given, the server is started in a child process, and
+# 'n' concurrent local clients send random batches for the given duration.
+# The sustained requests per second, and the latency percentiles, are
+# printed.
+
+from typing import Any
+from typing import Callable
+from typing import Dict
+from typing import List
+from typing import NamedTuple
+from typing import Optional
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import subprocess
+import sys
+import time
+
+from tzplus.cache import FileStamps
+from tzplus.cache import file_stamps
+from tzplus.catalog import TimezoneCatalog
+from tzplus.catalog import load_catalog
+from tzplus.search_index import KIND_NAMES
+from tzplus.search_index import PrefixIndex
+from tzplus.search_index import build_index
+from tzplus.snapshot import data_files
+
+DEFAULT_HOST = '127.0.0.1'
+
+# Maximum size of a request line or HTTP body.
+MAX_REQUEST_SIZE = 1 << 20
+
+
+class LoadedCatalog(NamedTuple):
+    """The indexes built from one version of the data files."""
+    catalog: TimezoneCatalog
+    search_index: PrefixIndex
+    generation: int
+    stamps: FileStamps
+
+
+def search(loaded: LoadedCatalog, prefix: str) -> List[Any]:
+    return [
+        [KIND_NAMES[entry.kind], entry.value]
+        for entry in loaded.search_index.search(prefix)
+    ]
+
+
+# Queries: op -> function(loaded, argument).
+OPS: Dict[str, Callable[[LoadedCatalog, str], Any]] = {
+    'country_timezones':
+        lambda loaded, arg: loaded.catalog.country_timezones(arg),
+    'timezone_countries':
+        lambda loaded, arg: loaded.catalog.timezone_countries(arg),
+    'timezone_regions':
+        lambda loaded, arg: loaded.catalog.timezone_regions(arg),
+    'canonical_zone':
+        lambda loaded, arg: loaded.catalog.canonical_zone(arg),
+    'search': search,
+}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description='Serve timezone lookups from the data files.')
+    transport = parser.add_mutually_exclusive_group(required=True)
+    transport.add_argument('--socket', help='Path of the Unix socket')
+    transport.add_argument('--port', help='Local HTTP port', type=int)
+    parser.add_argument(
+        '--snapshot',
+        help='Binary snapshot of the data files, used if up to date')
+    parser.add_argument(
+        '--poll',
+        help='Seconds between checks of the data files (default: 1)',
+        type=float,
+        default=1.0)
+    parser.add_argument(
+        '--load_test',
+        help='Run a load test against a server in a child process',
+        action='store_true')
+    parser.add_argument(
+        '--clients', help='Concurrent clients (default: 8)', type=int,
+        default=8)
+    parser.add_argument(
+        '--duration', help='Seconds of load (default: 5)', type=float,
+        default=5.0)
+    parser.add_argument(
+        '--batch', help='Queries per request (default: 10)', type=int,
+        default=10)
+    parser.add_argument('data_dir', help='Directory of data files')
+    args = parser.parse_args()
+
+    if args.load_test:
+        run_load_test(args)
+        return
+
+    server = LookupServer(args.data_dir, args.snapshot)
+    try:
+        asyncio.run(server.serve(args.socket, args.port, args.poll))
+    except KeyboardInterrupt:
+        pass
+
+# -----------------------------------------------------------------------------
+
+
+class LookupServer:
+    """Answer the queries of OPS from the current LoadedCatalog."""
+
+    def __init__(self, data_dir: str, snapshot: Optional[str] = None):
+        self.data_dir = data_dir
+        self.snapshot = snapshot
+        self.paths = sorted(set(data_files(data_dir).values()))
+        self.loaded = self.build(0)
+
+    def build(self, generation: int) -> LoadedCatalog:
+        stamps = file_stamps(self.paths)
+        return LoadedCatalog(
+            load_catalog(self.data_dir, self.snapshot),
+            build_index(self.data_dir),
+            generation + 1,
+            stamps)
+
+    def load(self, generation: int) -> Optional[LoadedCatalog]:
+        """Build the indexes of the data files. Return None if a file
+        changed while it was read, or if the files are invalid, so that the
+        current indexes are kept.
+        """
+        try:
+            loaded = self.build(generation)
+            if file_stamps(self.paths) != loaded.stamps:
+                return None
+        except (Exception, SystemExit) as e:
+            print(f"Reload failed: {e!r}", file=sys.stderr)
+            return None
+        return loaded
+
+    async def reload_if_changed(self) -> bool:
+        """Rebuild the indexes in a worker thread if a data file changed,
+        then replace the current ones. Return True if they were replaced.
+        """
+        try:
+            if file_stamps(self.paths) == self.loaded.stamps:
+                return False
+        except OSError:
+            return False  # a file is being replaced
+        loaded = await asyncio.to_thread(self.load, self.loaded.generation)
+        if loaded is None:
+            return False
+        self.loaded = loaded
+        print(f"Reloaded generation {loaded.generation}", file=sys.stderr)
+        return True
+
+    async def watch(self, poll: float) -> None:
+        while True:
+            await asyncio.sleep(poll)
+            await self.reload_if_changed()
+
+    def answer(self, request: Any) -> Dict[str, Any]:
+        """Answer a decoded request, using a single LoadedCatalog for all of
+        its queries.
+        """
+        loaded = self.loaded
+        if not isinstance(request, dict) or not isinstance(
+            request.get('queries'), list
+        ):
+            return {'error': "Expected {\"queries\": [[op, arg], ...]}"}
+        results = []
+        for query in request['queries']:
+            if not (
+                isinstance(query, list) and len(query) == 2
+                and isinstance(query[0], str) and isinstance(query[1], str)
+            ):
+                return {'error': f"Invalid query {query!r}"}
+            op = OPS.get(query[0])
+            if op is None:
+                return {'error': f"Unknown op {query[0]!r}"}
+            results.append(op(loaded, query[1]))
+        return {'generation': loaded.generation, 'results': results}
+
+    def answer_json(self, data: bytes) -> bytes:
+        try:
+            request = json.loads(data)
+        except ValueError as e:
+            response = {'error': f"Invalid JSON: {e}"}
+        else:
+            response = self.answer(request)
+        return json.dumps(response, separators=(',', ':')).encode('utf-8')
+
+    # -------------------------------------------------------------------------
+
+    async def serve(
+        self,
+        socket_path: Optional[str],
+        port: Optional[int],
+        poll: float,
+    ) -> None:
+        if socket_path:
+            if os.path.exists(socket_path):
+                os.unlink(socket_path)
+            server = await asyncio.start_unix_server(
+                self.handle_lines, socket_path, limit=MAX_REQUEST_SIZE)
+        else:
+            server = await asyncio.start_server(
+                self.handle_http, DEFAULT_HOST, port,
+                limit=MAX_REQUEST_SIZE)
+        print(f"Serving {self.data_dir}", file=sys.stderr)
+        watcher = asyncio.create_task(self.watch(poll))
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            watcher.cancel()
+
+    async def handle_lines(
+        self,
+        reader: asyncio.StreamReader,
+        writer: asyncio.StreamWriter,
+    ) -> None:
+        """Answer one line of JSON per request, until the client closes."""
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                writer.write(self.answer_json(line) + b'\n')
+                await writer.drain()
+        except (ConnectionError, ValueError):
+            pass  # reset by the client, or request too long
+        finally:
+            writer.close()
+
+    async def handle_http(
+        self,
+        reader: asyncio.StreamReader,
+        writer: asyncio.StreamWriter,
+    ) -> None:
+        """Answer 'POST /query' requests on a keep-alive HTTP/1.1
+        connection.
+        """
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                headers: Dict[str, str] = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b'\r\n', b'\n', b''):
+                        break
+                    name, _, value = line.decode('latin-1').partition(':')
+                    headers[name.strip().lower()] = value.strip()
+                length = int(headers.get('content-length', '0'))
+                if length > MAX_REQUEST_SIZE:
+                    break
+                body = await reader.readexactly(length)
+
+                method, path, _ = request_line.decode('latin-1').split(' ', 2)
+                if method == 'POST' and path == '/query':
+                    status, content = '200 OK', self.answer_json(body)
+                else:
+                    status, content = '404 Not Found', b'{"error":"Not found"}'
+                writer.write(
+                    f"HTTP/1.1 {status}\r\n"
+                    f"Content-Type: application/json\r\n"
+                    f"Content-Length: {len(content)}\r\n\r\n".encode('latin-1')
+                    + content)
+                await writer.drain()
+                if headers.get('connection', '').lower() == 'close':
+                    break
+        except (ConnectionError, ValueError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+# -----------------------------------------------------------------------------
+
+
+class LookupClient:
+    """A client of LookupServer, over a Unix socket or local HTTP."""
+
+    def __init__(
+        self,
+        reader: asyncio.StreamReader,
+        writer: asyncio.StreamWriter,
+        http: bool,
+    ):
+        self.reader = reader
+        self.writer = writer
+        self.http = http
+
+    @staticmethod
+    async def connect(
+        socket_path: Optional[str] = None,
+        port: Optional[int] = None,
+    ) -> 'LookupClient':
+        if socket_path:
+            reader, writer = await asyncio.open_unix_connection(
+                socket_path, limit=MAX_REQUEST_SIZE)
+            return LookupClient(reader, writer, False)
+        reader, writer = await asyncio.open_connection(
+            DEFAULT_HOST, port, limit=MAX_REQUEST_SIZE)
+        return LookupClient(reader, writer, True)
+
+    async def query(self, queries: List[List[str]]) -> Dict[str, Any]:
+        body = json.dumps({'queries': queries}).encode('utf-8')
+        if not self.http:
+            self.writer.write(body + b'\n')
+            await self.writer.drain()
+            response: Dict[str, Any] = json.loads(await self.reader.readline())
+            return response
+
+        self.writer.write(
+            f"POST /query HTTP/1.1\r\nHost: {DEFAULT_HOST}\r\n"
+            f"Content-Type: application/json\r\n"
+            f"Content-Length: {len(body)}\r\n\r\n".encode('latin-1') + body)
+        await self.writer.drain()
+        await self.reader.readline()  # status line
+        length = 0
+        while True:
+            line = await self.reader.readline()
+            if line in (b'\r\n', b''):
+                break
+            name, _, value = line.decode('latin-1').partition(':')
+            if name.strip().lower() == 'content-length':
+                length = int(value)
+        response = json.loads(await self.reader.readexactly(length))
+        return response
+
+    async def close(self) -> None:
+        self.writer.close()
+        await self.writer.wait_closed()
+
+# -----------------------------------------------------------------------------
+
+
+def random_queries(
+    catalog: TimezoneCatalog,
+    rnd: random.Random,
+    size: int,
+) -> List[List[str]]:
+    """Return 'size' random queries over the names of the catalog."""
+    countries = [c for c in catalog.names if catalog.country_name(c)]
+    timezones = [z for z in catalog.names if catalog.canonical_zone(z)]
+    queries = []
+    for _ in range(size):
+        op = rnd.choice(list(OPS))
+        if op == 'country_timezones':
+            arg = rnd.choice(countries)
+        elif op == 'search':
+            arg = rnd.choice(timezones).split('/')[-1][:3]
+        else:
+            arg = rnd.choice(timezones)
+        queries.append([op, arg])
+    return queries
+
+
+async def load_client(
+    socket_path: Optional[str],
+    port: Optional[int],
+    batches: List[List[List[str]]],
+    deadline: float,
+    latencies: List[float],
+) -> None:
+    client = await LookupClient.connect(socket_path, port)
+    i = 0
+    while time.perf_counter() < deadline:
+        start = time.perf_counter()
+        response = await client.query(batches[i % len(batches)])
+        latencies.append(time.perf_counter() - start)
+        if 'error' in response:
+            raise ValueError(response['error'])
+        i += 1
+    await client.close()
+
+
+async def wait_for_server(
+    socket_path: Optional[str],
+    port: Optional[int],
+    timeout: float = 30.0,
+) -> None:
+    deadline = time.perf_counter() + timeout
+    while True:
+        try:
+            client = await LookupClient.connect(socket_path, port)
+            await client.close()
+            return
+        except OSError:
+            if time.perf_counter() > deadline:
+                raise
+            await asyncio.sleep(0.05)
+
+
+def percentile(sorted_values: List[float], fraction: float) -> float:
+    index = min(len(sorted_values) - 1, int(len(sorted_values) * fraction))
+    return sorted_values[index]
+
+
+def run_load_test(args: argparse.Namespace) -> None:
+    """Start the server in a child process, run the clients, and print the
+    throughput and latencies.
+    """
+    command = [sys.executable, os.path.abspath(__file__), args.data_dir]
+    if args.socket:
+        command += ['--socket', args.socket]
+    else:
+        command += ['--port', str(args.port)]
+    if args.snapshot:
+        command += ['--snapshot', args.snapshot]
+    server = subprocess.Popen(command)
+    try:
+        rnd = random.Random(0)
+        catalog = load_catalog(args.data_dir)
+        batches = [
+            random_queries(catalog, rnd, args.batch) for _ in range(1000)
+        ]
+        latencies: List[float] = []
+
+        async def run() -> float:
+            await wait_for_server(args.socket, args.port)
+            start = time.perf_counter()
+            deadline = start + args.duration
+            await asyncio.gather(*(
+                load_client(
+                    args.socket, args.port, batches[i::args.clients],
+                    deadline, latencies)
+                for i in range(args.clients)
+            ))
+            return time.perf_counter() - start
+
+        elapsed = asyncio.run(run())
+    finally:
+        server.terminate()
+        server.wait()
+
+    latencies.sort()
+    print(
+        f"{len(latencies)} requests of {args.batch} queries, "
+        f"{args.clients} clients, {elapsed:.1f} s")
+    print(f"  requests/s: {len(latencies) / elapsed:.0f}")
+    print(f"  queries/s: {len(latencies) * args.batch / elapsed:.0f}")
+    for label, fraction in [('p50', 0.50), ('p99', 0.99), ('max', 1.0)]:
+        print(f"  {label}: {percentile(latencies, fraction) * 1000:.3f} ms")
+
+# -----------------------------------------------------------------------------
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,505 @@
+#!/usr/bin/env python3
+#
+# Compute the POSIX TZ string (e.g. 'CET-1CEST,M3.5.0,M10.5.0/3') of every
+# timezone in country_timezones.txt from the Zone and Rule lines of the raw
+# TZDB files, and write them as a table, so that devices which can only
+# evaluate a POSIX TZ rule get the correct local time without a full timezone
+# engine. A Link (including the 'Similar' and 'Alternate' links) has the
+# string of its Zone.
+#
+# The string describes the last era of the Zone: a fixed offset, or the 2
+# Rules of the era which continue until 'max', one for standard time and one
+# for DST. The dates of the Rules are converted like zic: 'lastSun' is
+# 'M{month}.5.0', 'Sun>=8' is 'M{month}.2.0', 'Sun>=2' is the Saturday on or
+# after the 1st at 24:00 plus the AT time ('M{month}.1.6/26'), and a fixed
+# day of the month is a Julian day 'Jn'. The AT times are converted into the
+# local time in effect before the transition. Negative DST (e.g.
+# Europe/Dublin) is written as a DST offset smaller than the standard offset.
+#
+# A string is flagged 'approximate' when the future rules of the Zone, from
+# the given year (default: the year of the TZDB version), cannot be
+# expressed: e.g. the Rules of Morocco, which are listed year by year until
+# 2087, or a last era which is not yet in effect. The approximate string is
+# the local time after the last transition of the Zone, or its standard time.
+# The reason is written as a comment.
+#
+# Usage:
+# $ posix_tz.py
+#   [--year {year}]
+#   [--output {file}]
+#   [--check {years}]
+#   tzdb_dir country_timezones.txt
+#
+# If --check is given, the transitions of every exact string during 'years'
+# years from the year are compared with the transitions of transitions.py.
+# The differences are printed, and the exit status is 1 if there are any.
+
+from datetime import date
+from typing import Dict
+from typing import List
+from typing import NamedTuple
+from typing import Optional
+from typing import TextIO
+from typing import Tuple
+
+import argparse
+import calendar
+import sys
+
+from transitions import MIN_TIME
+from transitions import Transition
+from transitions import add_transition
+from transitions import epoch_seconds
+from transitions import format_abbreviation
+from transitions import rule_change
+from transitions import zone_transitions
+from tzplus.data_parser import iter_file_lines
+from tzplus.data_parser import parse_region_country_timezones
+from tzplus.errors import error
+from tzplus.extract_tzdb import MAX_YEAR
+from tzplus.extract_tzdb import RuleRecord
+from tzplus.extract_tzdb import Tzdb
+from tzplus.extract_tzdb import ZoneEra
+from tzplus.extract_tzdb import ZoneRecord
+from tzplus.extract_tzdb import load_tzdb
+from tzplus.extract_tzdb import parse_month
+from tzplus.extract_tzdb import parse_seconds
+from tzplus.extract_tzdb import parse_weekday
+from tzplus.extract_tzdb import read_version
+from tzplus.extract_tzdb import rule_years
+from tzplus.extract_tzdb import time_suffix
+from tzplus.extract_tzdb import until_fields
+from tzplus.verify_data import link_resolver
+
+POSIX_TZ_HEADER = """\
+# POSIX TZ strings of the timezones in country_timezones.txt, computed from
+# the Zone and Rule lines of TZDB {version} for the year {year} and later.
+#
+# DO NOT EDIT: This file was autogenerated by tools/posix_tz.py.
+#
+# The status is 'exact' if the string matches the Zone from the year on, or
+# 'approximate' if its future rules cannot be expressed, followed by the
+# reason as a comment.
+#
+# timezone posix_tz status
+
+"""
+
+# Default AT time of a POSIX rule, which is omitted.
+DEFAULT_TIME = 2 * 3600
+
+# Default DST offset of a POSIX rule (1 hour ahead), which is omitted.
+DEFAULT_SAVE = 3600
+
+# Largest AT time of a POSIX rule (RFC 8536 extension).
+MAX_TIME = 167 * 3600
+
+SECONDS_PER_DAY = 86400
+
+# A year which is not a leap year, for the Julian days 'Jn'.
+NON_LEAP_YEAR = 2001
+
+
+class PosixDate(NamedTuple):
+    """The date and time of a POSIX rule: 'Mm.w.d/time', or 'Jn/time' if
+    'julian' is not 0.
+    """
+    month: int  # 1-12
+    week: int  # 1-5, 5 is the last week of the month
+    weekday: int  # 0 (Sun) - 6
+    julian: int  # 1-365, never counting Feb 29, or 0
+    time: int  # seconds, local time before the transition
+
+
+class PosixTz(NamedTuple):
+    std_abbreviation: str
+    std_offset: int  # seconds, east of UTC
+    dst_abbreviation: str  # empty if there is no DST
+    dst_offset: int  # seconds, east of UTC
+    start: Optional[PosixDate]  # start of DST
+    end: Optional[PosixDate]  # end of DST
+
+
+class PosixTzEntry(NamedTuple):
+    posix_tz: str
+    exact: bool
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description='Compute the POSIX TZ strings of timezones from TZDB.')
+    parser.add_argument(
+        '--year',
+        help='First year of the strings (default: year of TZDB version)',
+        type=int)
+    parser.add_argument('--output', help='Output file (default: stdout)')
+    parser.add_argument(
+        '--check',
+        help='Compare the transitions of the exact strings during this '
+        'number of years',
+        type=int)
+    parser.add_argument('tzdb', help='Directory of raw TZDB files')
+    parser.add_argument('timezones', help='country_timezones.txt file')
+    args = parser.parse_args()
+
+    version = read_version(args.tzdb)
+    year = args.year if args.year else int(version[:4])
+    tzdb = load_tzdb(args.tzdb)
+    timezones = sorted(set(
+        row.timezone for row in parse_region_country_timezones(args.timezones)
+    ))
+    posix_tzs = compute_posix_tzs(tzdb, timezones, year)
+
+    header = POSIX_TZ_HEADER.format(version=version, year=year)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            write_posix_tzs(f, header, posix_tzs)
+    else:
+        write_posix_tzs(sys.stdout, header, posix_tzs)
+
+    if args.check:
+        resolver = link_resolver(tzdb.links)
+        differences = 0
+        for timezone, (tz, reason) in posix_tzs.items():
+            if reason:
+                continue
+            zone = tzdb.zones[resolver.resolve(timezone) or '']
+            difference = check_posix_tz(
+                tzdb, zone, tz, year, year + args.check)
+            if difference:
+                print(
+                    f"{timezone}: {format_posix_tz(tz)}: {difference}",
+                    file=sys.stderr)
+                differences += 1
+        if differences:
+            sys.exit(1)
+
+# -----------------------------------------------------------------------------
+
+
+def compute_posix_tzs(
+    tzdb: Tzdb,
+    timezones: List[str],
+    year: int,
+) -> Dict[str, Tuple[PosixTz, str]]:
+    """Return the {timezone -> (PosixTz, reason)} of each timezone from
+    'year' on. The reason is empty if the string is exact.
+    """
+    resolver = link_resolver(tzdb.links)
+    posix_tzs: Dict[str, Tuple[PosixTz, str]] = {}
+    for timezone in timezones:
+        zone_name = resolver.resolve(timezone)
+        zone = tzdb.zones.get(zone_name or '')
+        if zone is None:
+            error(f"Unknown timezone '{timezone}'")
+        assert zone is not None
+        posix_tzs[timezone] = zone_posix_tz(tzdb, zone, year)
+    return posix_tzs
+
+
+def zone_posix_tz(
+    tzdb: Tzdb,
+    zone: ZoneRecord,
+    year: int,
+) -> Tuple[PosixTz, str]:
+    """Return the PosixTz of the last era of 'zone', and the reason why it
+    does not match the Zone from 'year' on, or an empty reason.
+    """
+    era = zone.eras[-1]
+    stdoff = parse_seconds(era.stdoff)
+
+    reason = ''
+    if len(zone.eras) > 1:
+        until_year, month, day, time = until_fields(zone.eras[-2].until)
+        if (until_year, month, day, parse_seconds(time)) > (year, 1, 1, 0):
+            reason = f"Zone changes in {until_year}"
+
+    rules = tzdb.rules.get(era.rules)
+    if era.rules == '-' or rules is None:
+        save = parse_seconds(era.rules)
+        return fixed_posix_tz(era, stdoff, save, ''), reason
+
+    ongoing = [rule for rule in rules if rule_years(rule)[1] == MAX_YEAR]
+    last_year = max(
+        [to_year for _, to_year in map(rule_years, rules)
+         if to_year != MAX_YEAR],
+        default=0)
+    if not reason and last_year >= year:
+        reason = f"Rules {era.rules} change until {last_year}"
+    for rule in ongoing:
+        if not reason and rule_years(rule)[0] > year:
+            reason = f"Rules {era.rules} start in {rule_years(rule)[0]}"
+
+    if not ongoing:
+        # The local time after the last transition of the Rules.
+        latest = max(
+            rule_change(rule, rule_years(rule)[1]) for rule in rules)
+        return fixed_posix_tz(era, stdoff, latest[2], latest[3]), reason
+
+    std_rules = [rule for rule in ongoing if parse_seconds(rule.save) == 0]
+    dst_rules = [rule for rule in ongoing if parse_seconds(rule.save) != 0]
+    if len(std_rules) != 1 or len(dst_rules) != 1:
+        letter = std_rules[0].letter if std_rules else '-'
+        return fixed_posix_tz(era, stdoff, 0, letter), (
+            reason or f"{len(ongoing)} ongoing Rules {era.rules}")
+
+    std_rule = std_rules[0]
+    dst_rule = dst_rules[0]
+    save = parse_seconds(dst_rule.save)
+    start, start_reason = posix_date(dst_rule, stdoff, 0)
+    end, end_reason = posix_date(std_rule, stdoff, save)
+    if start is None or end is None:
+        return fixed_posix_tz(era, stdoff, 0, std_rule.letter), (
+            reason or start_reason or end_reason)
+
+    tz = PosixTz(
+        std_abbreviation=format_abbreviation(
+            era.format, 0, rule_letter(std_rule), stdoff),
+        std_offset=stdoff,
+        dst_abbreviation=format_abbreviation(
+            era.format, save, rule_letter(dst_rule), stdoff + save),
+        dst_offset=stdoff + save,
+        start=start,
+        end=end,
+    )
+    return tz, reason
+
+
+def fixed_posix_tz(
+    era: ZoneEra,
+    stdoff: int,
+    save: int,
+    letter: str,
+) -> PosixTz:
+    """Return the PosixTz of a constant local time. Permanent DST is written
+    as a standard time with the total offset, like zic.
+    """
+    offset = stdoff + save
+    abbreviation = format_abbreviation(
+        era.format, save, '' if letter == '-' else letter, offset)
+    return PosixTz(abbreviation, offset, '', offset, None, None)
+
+
+def rule_letter(rule: RuleRecord) -> str:
+    return '' if rule.letter == '-' else rule.letter
+
+
+def posix_date(
+    rule: RuleRecord,
+    stdoff: int,
+    save_before: int,
+) -> Tuple[Optional[PosixDate], str]:
+    """Return the PosixDate of 'rule', whose AT time is converted into the
+    local time of (stdoff + save_before), or None and the reason why it
+    cannot be expressed.
+    """
+    month = parse_month(rule.in_month)
+    time = parse_seconds(rule.at_time)
+    suffix = time_suffix(rule.at_time)
+    if suffix == 's':
+        time += save_before
+    elif suffix == 'u':
+        time += stdoff + save_before
+
+    on_day = rule.on_day
+    week = 0
+    weekday = 0
+    julian = 0
+    if on_day.isdigit():
+        day = int(on_day)
+        if month == 2 and day == 29:
+            return None, f"Rule {rule.name} on Feb 29"
+        julian = (
+            date(NON_LEAP_YEAR, month, day).toordinal()
+            - date(NON_LEAP_YEAR, 1, 1).toordinal() + 1)
+    elif on_day.startswith('last'):
+        week = 5
+        weekday = posix_weekday(on_day[4:])
+    else:
+        op = '>=' if '>=' in on_day else '<='
+        name, day_field = on_day.split(op)
+        first = int(day_field)
+        if op == '<=':
+            first -= 6
+        # The weekday on or after the 'first' is the weekday 'shift' days
+        # earlier on or after the first day of its week, 'shift' days later.
+        shift = (first - 1) % 7
+        week = (first - 1) // 7 + 1
+        if first < 1 or week > 4:
+            return None, f"Rule {rule.name} on '{on_day}'"
+        weekday = (posix_weekday(name) - shift) % 7
+        time += shift * SECONDS_PER_DAY
+
+    if abs(time) > MAX_TIME:
+        return None, f"Rule {rule.name} at '{rule.at_time}'"
+    return PosixDate(month, week, weekday, julian, time), ''
+
+
+def posix_weekday(field: str) -> int:
+    """Return the POSIX weekday, 0 (Sun) - 6, of a weekday name."""
+    return (parse_weekday(field) + 1) % 7
+
+# -----------------------------------------------------------------------------
+
+
+def format_posix_tz(tz: PosixTz) -> str:
+    """Return the POSIX TZ string of 'tz'."""
+    s = (
+        format_posix_abbreviation(tz.std_abbreviation)
+        + format_posix_time(-tz.std_offset))
+    if tz.start is None or tz.end is None:
+        return s
+    s += format_posix_abbreviation(tz.dst_abbreviation)
+    if tz.dst_offset - tz.std_offset != DEFAULT_SAVE:
+        s += format_posix_time(-tz.dst_offset)
+    return f"{s},{format_posix_date(tz.start)},{format_posix_date(tz.end)}"
+
+
+def format_posix_abbreviation(abbreviation: str) -> str:
+    """Quote the abbreviations which are not 3 or more letters, such as
+    '+03', as '<+03>'.
+    """
+    if len(abbreviation) >= 3 and abbreviation.isalpha():
+        return abbreviation
+    return f"<{abbreviation}>"
+
+
+def format_posix_time(seconds: int) -> str:
+    """Format an offset or a time as [-]h[:mm[:ss]]."""
+    sign = '-' if seconds < 0 else ''
+    minutes, secs = divmod(abs(seconds), 60)
+    hours, minutes = divmod(minutes, 60)
+    if secs:
+        return f"{sign}{hours}:{minutes:02}:{secs:02}"
+    if minutes:
+        return f"{sign}{hours}:{minutes:02}"
+    return f"{sign}{hours}"
+
+
+def format_posix_date(d: PosixDate) -> str:
+    s = f"J{d.julian}" if d.julian else f"M{d.month}.{d.week}.{d.weekday}"
+    if d.time != DEFAULT_TIME:
+        s += f"/{format_posix_time(d.time)}"
+    return s
+
+# -----------------------------------------------------------------------------
+
+
+def write_posix_tzs(
+    output: TextIO,
+    header: str,
+    posix_tzs: Dict[str, Tuple[PosixTz, str]],
+) -> None:
+    output.write(header)
+    for timezone, (tz, reason) in sorted(posix_tzs.items()):
+        if reason:
+            output.write(
+                f"{timezone} {format_posix_tz(tz)} approximate # {reason}\n")
+        else:
+            output.write(f"{timezone} {format_posix_tz(tz)} exact\n")
+
+
+def read_posix_tzs(filename: str) -> Dict[str, PosixTzEntry]:
+    """Read the table written by write_posix_tzs()."""
+    posix_tzs: Dict[str, PosixTzEntry] = {}
+    for line in iter_file_lines(filename):
+        timezone, posix_tz, status = line.split()
+        posix_tzs[timezone] = PosixTzEntry(posix_tz, status == 'exact')
+    return posix_tzs
+
+# -----------------------------------------------------------------------------
+
+
+def posix_transitions(
+    tz: PosixTz,
+    start_year: int,
+    until_year: int,
+) -> List[Transition]:
+    """Return the transitions of 'tz' from 'start_year' until 'until_year',
+    starting with its standard time at MIN_TIME.
+    """
+    transitions = [
+        Transition(MIN_TIME, tz.std_offset, False, tz.std_abbreviation)]
+    if tz.start is None or tz.end is None:
+        return transitions
+    changes = []
+    for year in range(start_year, until_year):
+        changes.append(Transition(
+            posix_local_time(tz.start, year) - tz.std_offset,
+            tz.dst_offset, True, tz.dst_abbreviation))
+        changes.append(Transition(
+            posix_local_time(tz.end, year) - tz.dst_offset,
+            tz.std_offset, False, tz.std_abbreviation))
+    for t in sorted(changes):
+        add_transition(transitions, t)
+    return transitions
+
+
+def posix_local_time(d: PosixDate, year: int) -> int:
+    """Return the local time in epoch seconds of 'd' during 'year'."""
+    if d.julian:
+        julian_date = date.fromordinal(
+            date(NON_LEAP_YEAR, 1, 1).toordinal() + d.julian - 1)
+        return epoch_seconds(
+            year, julian_date.month, julian_date.day, d.time)
+    first = (date(year, d.month, 1).weekday() + 1) % 7
+    day = 1 + (d.weekday - first) % 7 + 7 * (d.week - 1)
+    last = calendar.monthrange(year, d.month)[1]
+    while day > last:
+        day -= 7
+    return epoch_seconds(year, d.month, day, d.time)
+
+
+def check_posix_tz(
+    tzdb: Tzdb,
+    zone: ZoneRecord,
+    tz: PosixTz,
+    start_year: int,
+    until_year: int,
+) -> str:
+    """Compare the (time, offset, abbreviation) of the transitions of 'tz' and
+    of 'zone' from 'start_year' until 'until_year', including the local time
+    at the start. Return the first difference, or an empty string.
+    """
+    expected = transitions_window(
+        zone_transitions(tzdb, zone, until_year), start_year, until_year)
+    observed = transitions_window(
+        posix_transitions(tz, start_year - 1, until_year),
+        start_year, until_year)
+    for e, o in zip(expected, observed):
+        if e != o:
+            return f"expected {e}, observed {o}"
+    if len(expected) != len(observed):
+        return (
+            f"expected {len(expected)} transitions, "
+            f"observed {len(observed)}")
+    return ''
+
+
+def transitions_window(
+    transitions: List[Transition],
+    start_year: int,
+    until_year: int,
+) -> List[Tuple[int, int, str]]:
+    """Return the (time, offset, abbreviation) in effect at the start of
+    'start_year', then of each change until 'until_year'.
+    """
+    start = epoch_seconds(start_year, 1, 1, 0)
+    until = epoch_seconds(until_year, 1, 1, 0)
+    window: List[Tuple[int, int, str]] = []
+    for t in transitions:
+        if t.time >= until:
+            break
+        change = (max(t.time, start), t.offset, t.abbreviation)
+        if window and window[-1][1:] == change[1:]:
+            continue
+        if window and window[-1][0] == start and change[0] == start:
+            window.pop()
+        window.append(change)
+    return window
+
+# -----------------------------------------------------------------------------
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,11 @@
+#!/usr/bin/env python3
+#
+# Build a prefix-search index of the timezone, country, and region names.
+#
+# Runs main() of tzplus/search_index.py, which documents its usage.
+# The code is in the tzplus package so that it is installed under that name.
+
+from tzplus.search_index import main
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,11 @@
+#!/usr/bin/env python3
+#
+# Compile the data/*.txt files into a single versioned binary snapshot.
+#
+# Runs main() of tzplus/snapshot.py, which documents its usage.
+# The code is in the tzplus package so that it is installed under that name.
+
+from tzplus.snapshot import main
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,11 @@
+#!/usr/bin/env python3
+#
+# Compute the sort orders of the menu of country_timezones.txt.
+#
+# Runs main() of tzplus/sort_orders.py, which documents its usage.
+# The code is in the tzplus package so that it is installed under that name.
+
+from tzplus.sort_orders import main
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,12 @@
+#!/usr/bin/env python3
+#
+# Find the timezones of country_timezones.txt nearest to a (latitude,
+# longitude), or within a radius of it.
+#
+# Runs main() of tzplus/spatial_index.py, which documents its usage.
+# The code is in the tzplus package so that it is installed under that name.
+
+from tzplus.spatial_index import main
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+#
+# Benchmark the cold start of tzplus-lookup: the median wall time of new
+# Python processes which look up a name in the cached catalog, against the
+# median of empty Python processes. The slowest top-level imports of the
+# lookup are printed, from 'python -X importtime'. Exits with status 1 if the
+# median of the lookup is over the budget, so that it can guard the startup
+# time in CI.
+#
+# Usage:
+# $ startup_benchmark.py
+#   [--runs {n}]
+#   [--budget {ms}]
+#   [--name {name}]
+#   data_dir
+
+from typing import Dict
+from typing import List
+from typing import Tuple
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+# Same as the console script of tzplus-lookup.
+LOOKUP_CODE = 'import sys; from tzplus.cli import lookup; sys.exit(lookup())'
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description='Benchmark the cold start of tzplus-lookup.')
+    parser.add_argument(
+        '--runs', help='Number of processes (default: 20)', type=int,
+        default=20)
+    parser.add_argument(
+        '--budget', help='Maximum median lookup time (default: 150 ms)',
+        type=float, default=150.0)
+    parser.add_argument(
+        '--name', help='Name to look up (default: US)', default='US')
+    parser.add_argument('data_dir', help='Directory of data files')
+    args = parser.parse_args()
+
+    env = dict(os.environ)
+    tools_dir = os.path.dirname(os.path.abspath(__file__))
+    env['PYTHONPATH'] = os.pathsep.join(
+        filter(None, [tools_dir, env.get('PYTHONPATH')]))
+
+    with tempfile.TemporaryDirectory() as cache_dir:
+        lookup = [
+            sys.executable, '-c', LOOKUP_CODE,
+            '--data_dir', args.data_dir, '--cache_dir', cache_dir, args.name,
+        ]
+        empty = time_command([sys.executable, '-c', 'pass'], env, args.runs)
+        miss = time_command(lookup, env, 1)
+        hit = time_command(lookup, env, args.runs)
+        imports = slowest_imports(lookup, env)
+
+    median = statistics.median(hit)
+    print(f"python -c pass: {statistics.median(empty):.1f} ms")
+    print(f"tzplus-lookup (cache miss): {miss[0]:.1f} ms")
+    print(
+        f"tzplus-lookup (cache hit): {median:.1f} ms "
+        f"(median of {args.runs}, budget {args.budget:.0f} ms)")
+    print("Slowest imports:")
+    for name, ms in imports[:8]:
+        print(f"  {name}: {ms:.1f} ms")
+
+    if median > args.budget:
+        print(f"FAILED: over budget by {median - args.budget:.1f} ms")
+        sys.exit(1)
+
+
+def time_command(
+    command: List[str],
+    env: Dict[str, str],
+    runs: int,
+) -> List[float]:
+    """Return the wall time in milliseconds of each of 'runs' executions of
+    'command'.
+    """
+    times = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run(
+            command, env=env, check=True, stdout=subprocess.DEVNULL)
+        times.append((time.perf_counter() - start) * 1000)
+    return times
+
+
+def slowest_imports(
+    command: List[str],
+    env: Dict[str, str],
+) -> List[Tuple[str, float]]:
+    """Return the (module, cumulative ms) of the top-level imports of the
+    Python 'command', slowest first.
+    """
+    result = subprocess.run(
+        command[:1] + ['-X', 'importtime'] + command[1:], env=env, check=True,
+        stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
+    return parse_importtime(result.stderr)
+
+
+def parse_importtime(output: str) -> List[Tuple[str, float]]:
+    """Parse the output of 'python -X importtime' into the (module,
+    cumulative ms) of the top-level imports, slowest first.
+    """
+    imports = []
+    for line in output.splitlines():
+        if not line.startswith('import time:'):
+            continue
+        fields = line[len('import time:'):].split('|')
+        if len(fields) != 3 or not fields[1].strip().isdigit():
+            continue  # header
+        name = fields[2][1:].rstrip()
+        if name.startswith(' '):
+            continue  # nested import
+        imports.append((name, int(fields[1]) / 1000))
+    imports.sort(key=lambda i: i[1], reverse=True)
+    return imports
+
+
+if __name__ == '__main__':
+    main()
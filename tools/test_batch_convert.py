@@ -0,0 +1,45 @@
+import os
+import unittest
+import batch_convert
+from batch_convert import convert_batch_python
+from batch_convert import random_pairs
+from transitions import compile_tables
+from tzplus.extract_tzdb import load_tzdb
+
+TZDB_DIR = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), '..', 'tzdb')
+
+
+class TestBatchConvert(unittest.TestCase):
+    """Unit test for the batch conversion, against one lookup() per pair."""
+
+    def setUp(self) -> None:
+        self.tables = compile_tables(load_tzdb(TZDB_DIR), 1970, 2050)
+        names = sorted(self.tables.names)
+        self.timestamps, self.timezones = random_pairs(names, 10000)
+        self.expected = [
+            self.tables.lookup(z, t).offset
+            for t, z in zip(self.timestamps, self.timezones)
+        ]
+
+    def test_python(self) -> None:
+        result = convert_batch_python(
+            self.tables, self.timestamps, self.timezones)
+        self.assertEqual(self.expected, list(result.offsets))
+        self.assertEqual(
+            [t + o for t, o in zip(self.timestamps, self.expected)],
+            list(result.local_times))
+        with self.assertRaises(KeyError):
+            convert_batch_python(self.tables, [0], ['Mars/Olympus_Mons'])
+
+    @unittest.skipIf(batch_convert.np is None, 'NumPy is not installed')
+    def test_numpy(self) -> None:
+        np = batch_convert.np
+        result = batch_convert.convert_batch_numpy(
+            self.tables, np.array(self.timestamps), np.array(self.timezones))
+        self.assertEqual(self.expected, result.offsets.tolist())
+
+        ids = batch_convert.zone_ids(self.tables, self.timezones)
+        result = batch_convert.convert_batch_numpy(
+            self.tables, self.timestamps, ids)
+        self.assertEqual(self.expected, result.offsets.tolist())
@@ -0,0 +1,22 @@
+import tempfile
+import unittest
+import benchmark
+
+
+class TestBenchmark(unittest.TestCase):
+    """Verify that the synthetic data files pass every check."""
+
+    def test_scale_2(self) -> None:
+        saved = benchmark.MIN_TOTAL_TIME
+        benchmark.MIN_TOTAL_TIME = 0.0
+        try:
+            with tempfile.TemporaryDirectory() as tmpdir:
+                files = benchmark.generate_data(tmpdir, 2)
+                timings = benchmark.run_benchmarks(files)
+        finally:
+            benchmark.MIN_TOTAL_TIME = saved
+
+        self.assertEqual(700, timings['sizes']['zones'])
+        self.assertEqual(492, timings['sizes']['links'])
+        self.assertIn('check_timezones', timings)
+        self.assertIn('has_cycle', timings)
@@ -0,0 +1,54 @@
+import os
+import unittest
+from tzplus.catalog import load_catalog
+from tzplus.verify_data import get_poly_timezones
+from tzplus.verify_data import read_region_country_timezones
+
+DATA_DIR = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), '..', 'data')
+
+
+class TestTimezoneCatalog(unittest.TestCase):
+    """Verify the catalog indexes against the verify_data.py readers."""
+
+    def setUp(self) -> None:
+        self.catalog = load_catalog(DATA_DIR)
+        self.country_timezones, self.region_timezones = \
+            read_region_country_timezones(
+                os.path.join(DATA_DIR, 'country_timezones.txt'))
+
+    def test_forward(self) -> None:
+        for country, timezones in self.country_timezones.items():
+            self.assertEqual(
+                timezones, self.catalog.country_timezones(country))
+        for region, timezones in self.region_timezones.items():
+            self.assertEqual(
+                sorted(set(timezones)),
+                sorted(self.catalog.region_timezones(region)))
+
+    def test_reverse(self) -> None:
+        for country, timezones in self.country_timezones.items():
+            for timezone in timezones:
+                self.assertIn(
+                    country, self.catalog.timezone_countries(timezone))
+        self.assertEqual(
+            {k: sorted(v) for k, v in get_poly_timezones(
+                self.country_timezones).items()},
+            {k: sorted(v) for k, v in self.catalog.poly_timezones().items()})
+        self.assertEqual(['NA', 'PO'], self.catalog.country_regions('US'))
+        self.assertEqual(['NA'], self.catalog.timezone_regions('US/Eastern'))
+
+    def test_names(self) -> None:
+        self.assertEqual('Atlantic Ocean', self.catalog.region_name('AO'))
+        self.assertEqual('Angola', self.catalog.country_name('AO'))
+        self.assertEqual('UAE', self.catalog.country_short_name('AE'))
+        self.assertIsNone(self.catalog.region_name('XX'))
+
+    def test_canonical_zone(self) -> None:
+        self.assertEqual(
+            'America/New_York', self.catalog.canonical_zone('US/Eastern'))
+        self.assertEqual(
+            'America/New_York',
+            self.catalog.canonical_zone('America/New_York'))
+        self.assertEqual('Alternate', self.catalog.timezone_tag('US/Eastern'))
+        self.assertIsNone(self.catalog.canonical_zone('Nowhere/City'))
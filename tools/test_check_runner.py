@@ -0,0 +1,88 @@
+import os
+import tempfile
+import unittest
+from tzplus.errors import error
+from tzplus.verify_data import CheckFailure
+from tzplus.verify_data import CheckRunner
+from tzplus.verify_data import Entry
+from tzplus.verify_data import RegionTimezones
+from tzplus.verify_data import VerifyCache
+from tzplus.verify_data import check_countries
+from tzplus.verify_data import check_regions
+from tzplus.verify_data import check_zones
+from tzplus.verify_data import collect_errors
+from tzplus.verify_data import read_regions
+
+ZONES = {
+    'Europe/Paris': Entry(None, 'Zone'),
+    'Asia/Tokyo': Entry(None, 'Zone'),
+}
+
+
+class TestCheckRunner(unittest.TestCase):
+    """Unit test for running the checks of verify_data.py with all of their
+    failures collected.
+    """
+
+    def test_collect_errors(self) -> None:
+        failures = collect_errors(
+            'check_zones(z)', check_zones, 'z', ZONES,
+            {'Europe/Paris': Entry(None, 'Zone'),
+             'Etc/Foo': Entry(None, 'Zone')})
+        self.assertEqual([
+            CheckFailure('check_zones(z)', 'Extra zones in z', ['Etc/Foo']),
+            CheckFailure(
+                'check_zones(z)', 'Missing zones in z', ['Asia/Tokyo']),
+        ], failures)
+
+        # error() exits again outside of collect_errors().
+        with self.assertRaises(SystemExit):
+            error('failed')
+
+    def test_collect_exception(self) -> None:
+        # check_countries() requires the uninhabited BV and HM.
+        failures = collect_errors(
+            'check_countries(c)', check_countries, 'c', {}, {'FR': 'France'})
+        self.assertEqual(1, len(failures))
+        self.assertTrue(failures[0].message.startswith('KeyError'))
+
+    def test_workers(self) -> None:
+        runner = CheckRunner(jobs=2)
+        try:
+            cache = VerifyCache(None, runner=runner)
+            cache.check(['z'], check_zones, 'z', ZONES, ZONES)
+            cache.check(['r'], check_regions, 'r', {'EU': []}, {'AS': 'Asia'})
+            failures = cache.finish()
+        finally:
+            runner.close()
+        self.assertEqual([
+            CheckFailure('check_regions(r)', 'Extra regions in r', ['EU']),
+            CheckFailure('check_regions(r)', 'Missing regions in r', ['AS']),
+        ], failures)
+
+    def test_cache_only_passed(self) -> None:
+        with tempfile.TemporaryDirectory() as tmpdir:
+            cache_file = os.path.join(tmpdir, 'cache')
+            regions_file = os.path.join(tmpdir, 'regions.txt')
+            with open(regions_file, 'w', encoding='utf-8') as f:
+                f.write('AF Africa\n')
+
+            def run(region_timezones: RegionTimezones) -> int:
+                cache = VerifyCache(cache_file, runner=CheckRunner())
+                regions = cache.read(read_regions, regions_file)
+                cache.check(
+                    [regions_file], check_regions,
+                    regions_file, region_timezones, regions)
+                failures = cache.finish()
+                cache.save()
+                return len(failures)
+
+            # The failed check is run again, and the passed one is cached.
+            self.assertEqual(1, run({}))
+            self.assertEqual(1, run({}))
+            self.assertEqual(0, run({'AF': []}))
+            self.assertEqual(0, run({}))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,89 @@
+import os
+import unittest
+from classify_links import Proposal
+from classify_links import compute_histories
+from classify_links import diff_links
+from classify_links import group_histories
+from classify_links import propose_links
+from classify_links import zone_countries
+from tzplus.extract_tzdb import ALL_FILES
+from tzplus.extract_tzdb import load_tzdb
+from tzplus.verify_data import Entry
+
+TZDB_DIR = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), '..', 'tzdb')
+
+
+class TestClassifyLinks(unittest.TestCase):
+    """Unit test for the Link classification from transition histories."""
+
+    def setUp(self) -> None:
+        self.tzdb = load_tzdb(TZDB_DIR)
+        self.histories = compute_histories(
+            load_tzdb(TZDB_DIR, ALL_FILES), 2040)
+        self.countries = zone_countries(os.path.join(TZDB_DIR, 'zone.tab'))
+
+    def test_histories(self) -> None:
+        # Europe/Oslo is a Zone of backzone, which differs from Europe/Berlin
+        # only before 1970.
+        oslo = self.histories['Europe/Oslo']
+        berlin = self.histories['Europe/Berlin']
+        self.assertNotEqual(oslo.before_1970, berlin.before_1970)
+        self.assertEqual(oslo.since_1970, berlin.since_1970)
+
+        groups = group_histories(self.histories, 'since_1970')
+        self.assertIn(['America/Edmonton', 'America/Yellowknife'], groups)
+        self.assertTrue(all(len(group) > 1 for group in groups))
+
+    def test_propose_links(self) -> None:
+        current = {
+            'Europe/Oslo': Entry('Europe/Berlin', 'Similar'),
+            'US/Pacific': Entry('America/Los_Angeles', 'Alternate'),
+            'Africa/Asmera': Entry('Africa/Asmara', 'Alias'),
+        }
+        proposals = propose_links(
+            self.tzdb, self.histories, self.countries, current)
+
+        # Different history in backzone.
+        self.assertEqual(
+            Proposal(
+                'Similar', 'Europe/Berlin',
+                'backzone history differs before 1970'),
+            proposals['Europe/Oslo'])
+        # Different country in zone.tab.
+        self.assertEqual(
+            Proposal(
+                'Similar', 'Europe/Rome', 'country VA differs from IT'),
+            proposals['Europe/Vatican'])
+        # Same timezone, the current tag and target are kept.
+        self.assertEqual('Alternate', proposals['US/Pacific'].tag)
+        self.assertEqual(
+            Proposal(
+                'Alias', 'Africa/Asmara', 'same history as Africa/Nairobi'),
+            proposals['Africa/Asmera'])
+        # New Link.
+        self.assertEqual('Alias', proposals['UTC'].tag)
+
+    def test_diff_links(self) -> None:
+        current = {
+            'A': Entry('X', 'Similar'),
+            'B': Entry('X', 'Alternate'),
+            'C': Entry('X', 'Alias'),
+            'D': Entry('X', 'Obsolete'),
+        }
+        proposals = {
+            'A': Proposal('Alias', 'X', 'same history as X'),
+            'B': Proposal('Alternate', 'X', 'same history as X'),
+            'C': Proposal('Alias', 'Y', 'same history as Y'),
+            'E': Proposal('Similar', 'X', 'country E differs from X'),
+        }
+        self.assertEqual([
+            'A: Similar -> Alias (same history as X)',
+            'C: target X -> Y',
+            'D: Obsolete -> removed',
+            'E: new -> Similar (country E differs from X)',
+        ], diff_links(current, proposals))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,75 @@
+import os
+import tempfile
+import unittest
+from tzplus import columnar_export
+from tzplus.columnar_export import COLUMNS
+from tzplus.columnar_export import catalog_columns
+from tzplus.columnar_export import decode_binary
+from tzplus.columnar_export import dictionary_encode
+from tzplus.columnar_export import encode_binary
+from tzplus.columnar_export import load_columnar
+from tzplus.columnar_export import write_arrow
+
+DATA_DIR = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), '..', 'data')
+
+
+class TestColumnarExport(unittest.TestCase):
+    """Unit test for the dictionary-encoded columnar export and loader."""
+
+    def setUp(self) -> None:
+        self.columns = catalog_columns(DATA_DIR)
+
+    def test_catalog_columns(self) -> None:
+        columns = self.columns
+        self.assertEqual(COLUMNS, list(columns))
+        i = columns['timezone'].index('US/Pacific')
+        self.assertEqual('NA', columns['region'][i])
+        self.assertEqual('US', columns['country'][i])
+        self.assertEqual('Alternate', columns['tag'][i])
+        self.assertEqual('America/Los_Angeles', columns['target'][i])
+
+    def test_dictionary_encode(self) -> None:
+        dictionary, codes = dictionary_encode(['b', 'a', 'b', 'c'])
+        self.assertEqual(['a', 'b', 'c'], dictionary)
+        self.assertEqual([1, 0, 1, 2], codes.tolist())
+        self.assertEqual('H', codes.typecode)
+
+    def test_binary(self) -> None:
+        table = decode_binary(encode_binary(self.columns))
+        self.assertEqual(len(self.columns['timezone']), table.num_rows)
+        for name in COLUMNS:
+            self.assertEqual(self.columns[name], table.column(name))
+
+        rows = table.join('timezone', ['Asia/Kolkata', 'Nowhere'])
+        self.assertEqual(-1, rows[1])
+        self.assertEqual('IN', table.row(rows[0])['country'])
+        self.assertEqual(
+            [0, -1],
+            table.encode('tag', ['Alternate', 'Nowhere']).tolist())
+
+    def test_load_binary(self) -> None:
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, 'catalog.bin')
+            with open(path, 'wb') as f:
+                f.write(encode_binary(self.columns))
+            table = load_columnar(path)
+            self.assertEqual(
+                self.columns['timezone'], table.column('timezone'))
+            del table
+
+    @unittest.skipIf(columnar_export.pa is None, 'pyarrow is not installed')
+    def test_arrow(self) -> None:
+        with tempfile.TemporaryDirectory() as tmpdir:
+            for name, parquet in [('c.arrow', False), ('c.parquet', True)]:
+                path = os.path.join(tmpdir, name)
+                write_arrow(path, self.columns, parquet)
+                table = load_columnar(path)
+                for column in COLUMNS:
+                    self.assertEqual(
+                        self.columns[column], table.column(column))
+                del table
+
+
+if __name__ == '__main__':
+    unittest.main()
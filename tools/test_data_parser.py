@@ -0,0 +1,71 @@
+import io
+import os
+import unittest
+from tzplus import data_parser
+from tzplus.data_parser import NameRow
+from tzplus.data_parser import RegionCountryTimezoneRow
+from tzplus.data_parser import iter_lines
+from tzplus.data_parser import parse_country_lines
+from tzplus.data_parser import parse_region_country_timezones
+from tzplus.verify_data import read_line
+
+DATA_DIR = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), '..', 'data')
+
+CONTENT = (
+    '# comment\n'
+    'Zone Europe/Paris # trailing comment\n'
+    '\n'
+    '   \t\n'
+    '  Leading whitespace  \n'
+    'Windows line\r\n'
+    'No final newline'
+)
+
+
+class TestDataParser(unittest.TestCase):
+    """Unit test for the streaming data file parser."""
+
+    def test_iter_lines(self) -> None:
+        expected = [
+            'Zone Europe/Paris',
+            '  Leading whitespace',
+            'Windows line',
+            'No final newline',
+        ]
+        self.assertEqual(expected, list(iter_lines(io.StringIO(CONTENT))))
+
+    def test_same_as_read_line(self) -> None:
+        # Tiny blocks, so that lines straddle the block boundaries.
+        saved = data_parser.BLOCK_SIZE
+        data_parser.BLOCK_SIZE = 7
+        try:
+            lines = list(iter_lines(io.StringIO(CONTENT)))
+        finally:
+            data_parser.BLOCK_SIZE = saved
+
+        expected = []
+        f = io.StringIO(CONTENT, newline='')
+        while True:
+            line = read_line(f)
+            if line is None:
+                break
+            expected.append(line)
+        self.assertEqual(expected, lines)
+
+    def test_parse_data_file(self) -> None:
+        rows = list(parse_region_country_timezones(
+            os.path.join(DATA_DIR, 'country_timezones.txt')))
+        paris = rows[rows.index(
+            RegionCountryTimezoneRow('EU', 'FR', 'Europe/Paris'))]
+        self.assertEqual('FR', paris.country)
+        self.assertEqual('Europe/Paris', paris.timezone)
+
+    def test_parse_country_lines(self) -> None:
+        lines = iter_lines(io.StringIO(
+            '# ISO 3166 alpha-2\tcountry name\n'
+            'FR\tFrance\n'
+            'GB\tBritain (UK)\n'))
+        self.assertEqual(
+            [NameRow('FR', 'France'), NameRow('GB', 'Britain (UK)')],
+            list(parse_country_lines(lines)))
@@ -0,0 +1,139 @@
+import unittest
+from diff_tzdb import diff_trees
+from diff_tzdb import insert_line
+from diff_tzdb import patch_classified_links
+from diff_tzdb import patch_classified_zones
+from diff_tzdb import patch_country_timezones
+from diff_tzdb import split_blocks
+
+OLD_EUROPE = """\
+# Rule  NAME    FROM    TO      -       IN      ON      AT      SAVE    LETTER/S
+Rule    EU      1981    max     -       Mar     lastSun  1:00u  1:00    S
+Rule    EU      1996    max     -       Oct     lastSun  1:00u  0       -
+Zone    Europe/Kiev     2:02:04 -       LMT     1880
+                        2:00    EU      EE%sT
+Zone    Europe/Andorra  0:06:04 -       LMT     1901
+                        1:00    EU      CE%sT
+Zone    Europe/Paris    0:09:21 -       LMT     1891
+                        1:00    EU      CE%sT
+"""
+
+NEW_EUROPE = """\
+Rule    EU      1981    max     -       Mar     lastSun  1:00u  1:00    S
+Rule    EU      1996    2030    -       Oct     lastSun  1:00u  0       -
+# Renamed.
+Zone    Europe/Kyiv     2:02:04 -       LMT     1880
+                        2:00    EU      EE%sT
+Zone    Europe/Paris    0:09:21 -       LMT     1891 # comment
+                        1:00    EU      CE%sT
+"""
+
+OLD_BACKWARD = """\
+Link    Europe/Paris            Europe/Monaco
+Link    Europe/Kiev             Europe/Uzhgorod
+"""
+
+NEW_BACKWARD = """\
+Link    Europe/Paris            Europe/Monaco
+Link    Europe/Kyiv             Europe/Kiev
+Link    Europe/Kyiv             Europe/Uzhgorod
+Link    Europe/Paris            Europe/Andorra
+"""
+
+ASIA = """\
+Zone    Asia/Tokyo      9:18:59 -       LMT     1887 Dec 31 15:00u
+                        9:00    -       JST
+"""
+
+
+class TestDiffTzdb(unittest.TestCase):
+    """Unit test for the block-by-block comparison of TZDB releases."""
+
+    def setUp(self) -> None:
+        self.diff = diff_trees(
+            {'europe': OLD_EUROPE, 'backward': OLD_BACKWARD, 'asia': ASIA},
+            {'europe': NEW_EUROPE, 'backward': NEW_BACKWARD, 'asia': ASIA},
+        )
+
+    def test_split_blocks(self) -> None:
+        blocks = split_blocks(OLD_EUROPE, 'europe')
+        self.assertEqual(
+            [('Rule', 'EU'), ('Zone', 'Europe/Kiev'),
+             ('Zone', 'Europe/Andorra'), ('Zone', 'Europe/Paris')],
+            list(blocks))
+        self.assertEqual(2, len(blocks[('Rule', 'EU')].lines))
+        self.assertEqual(2, len(blocks[('Zone', 'Europe/Kiev')].lines))
+
+        # Comments and spacing do not change the hashes.
+        new_blocks = split_blocks(NEW_EUROPE, 'europe')
+        self.assertEqual(
+            blocks[('Zone', 'Europe/Paris')].digest,
+            new_blocks[('Zone', 'Europe/Paris')].digest)
+
+    def test_diff_trees(self) -> None:
+        diff = self.diff
+        self.assertEqual(['backward', 'europe'], diff.changed_files)
+        self.assertEqual([('Europe/Kiev', 'Europe/Kyiv')], diff.renamed_zones)
+        self.assertEqual(
+            [('Europe/Andorra', 'Europe/Paris')], diff.merged_zones)
+        self.assertEqual([], diff.added_zones)
+        self.assertEqual([], diff.removed_zones)
+        self.assertEqual([], diff.changed_zones)
+        self.assertEqual([], diff.added_links)
+        self.assertEqual(
+            [('Europe/Uzhgorod', 'Europe/Kiev', 'Europe/Kyiv')],
+            diff.changed_links)
+        self.assertEqual(['EU'], diff.changed_rules)
+
+    def test_split_zone(self) -> None:
+        diff = diff_trees(
+            {'europe': NEW_EUROPE, 'backward': NEW_BACKWARD},
+            {'europe': OLD_EUROPE, 'backward': OLD_BACKWARD},
+        )
+        self.assertEqual(
+            [('Europe/Andorra', 'Europe/Paris'),
+             ('Europe/Kiev', 'Europe/Kyiv')],
+            diff.split_zones)
+        self.assertEqual(['Europe/Kyiv'], diff.removed_zones)
+
+    def test_insert_line(self) -> None:
+        lines = ['# comment\n', 'Zone A\n', '\n', 'Zone C\n', '# end\n']
+        self.assertEqual(
+            ['# comment\n', 'Zone A\n', '\n', 'Zone B\n', 'Zone C\n',
+             '# end\n'],
+            insert_line(lines, 1, 'Zone B\n'))
+        self.assertEqual(
+            ['# comment\n', 'Zone A\n', '\n', 'Zone C\n', 'Zone D\n',
+             '# end\n'],
+            insert_line(lines, 1, 'Zone D\n'))
+
+    def test_patch_classified_files(self) -> None:
+        zones = ['Zone Europe/Andorra\n', 'Zone Europe/Kiev\n',
+                 'Zone Europe/Paris\n']
+        self.assertEqual(
+            ['Zone Europe/Kyiv\n', 'Zone Europe/Paris\n'],
+            patch_classified_zones(zones, self.diff))
+
+        links = [
+            'Similar Europe/Paris Europe/Monaco\n',
+            'Similar Europe/Kiev Europe/Uzhgorod # Ukraine\n',
+        ]
+        self.assertEqual([
+            'Similar Europe/Paris Europe/Andorra\n',
+            'Alias Europe/Kyiv Europe/Kiev\n',
+            'Similar Europe/Paris Europe/Monaco\n',
+            'Similar Europe/Kyiv Europe/Uzhgorod # Ukraine\n',
+        ], patch_classified_links(links, self.diff))
+
+        timezones = [
+            'EU AD Europe/Andorra # Andorra\n',
+            'EU UA Europe/Kiev # Ukraine\n',
+        ]
+        self.assertEqual([
+            'EU AD Europe/Andorra # Andorra\n',
+            'EU UA Europe/Kyiv # Ukraine\n',
+        ], patch_country_timezones(timezones, self.diff, {}))
+
+
+if __name__ == '__main__':
+    unittest.main()
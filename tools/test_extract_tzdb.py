@@ -0,0 +1,114 @@
+import io
+import os
+import unittest
+from tzplus.extract_tzdb import MAIN_FILES
+from tzplus.extract_tzdb import LinkRecord
+from tzplus.extract_tzdb import RuleRecord
+from tzplus.extract_tzdb import ZoneEra
+from tzplus.extract_tzdb import ZoneRecord
+from tzplus.extract_tzdb import ZoneTabRecord
+from tzplus.extract_tzdb import extract_tzdb
+from tzplus.extract_tzdb import parse_coordinates
+from tzplus.extract_tzdb import parse_day
+from tzplus.extract_tzdb import parse_lines
+from tzplus.extract_tzdb import parse_seconds
+from tzplus.extract_tzdb import read_zone_tab
+from tzplus.extract_tzdb import until_fields
+from tzplus.extract_tzdb import write_links
+from tzplus.extract_tzdb import write_zones
+
+TOP_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+TZDB_DIR = os.path.join(TOP_DIR, 'tzdb')
+DATA_DIR = os.path.join(TOP_DIR, 'data')
+
+
+class TestParseLines(unittest.TestCase):
+    """Unit test for parse_lines()."""
+
+    def test_records(self) -> None:
+        lines = [
+            '# Comment\n',
+            'Rule\tUS\t1967\t2006\t-\tOct\tlastSun\t2:00\t0\tS\n',
+            '\n',
+            'Zone America/New_York\t-4:56:02 -\tLMT\t1883 Nov 18 17:00u\n',
+            '\t\t\t-5:00\tUS\tE%sT # trailing comment\n',
+            'Link\tAmerica/New_York\tUS/Eastern\n',
+        ]
+        records = list(parse_lines(lines, 'test'))
+        self.assertEqual(
+            [
+                RuleRecord(
+                    'US', '1967', '2006', 'Oct', 'lastSun', '2:00', '0', 'S',
+                    'test'),
+                ZoneRecord(
+                    'America/New_York',
+                    [
+                        ZoneEra(
+                            '-4:56:02', '-', 'LMT',
+                            ('1883', 'Nov', '18', '17:00u')),
+                        ZoneEra('-5:00', 'US', 'E%sT', ()),
+                    ],
+                    'test'),
+                LinkRecord('America/New_York', 'US/Eastern', 'test'),
+            ],
+            records)
+
+
+class TestExtractTzdb(unittest.TestCase):
+    """Verify that the extracted zones.txt and links.txt are identical to the
+    files in data/.
+    """
+
+    def test_zones_and_links(self) -> None:
+        tzdb_files = extract_tzdb(TZDB_DIR, MAIN_FILES, jobs=2)
+        self.assertEqual(MAIN_FILES, [f.filename for f in tzdb_files])
+
+        output = io.StringIO()
+        write_zones(output, tzdb_files)
+        with open(os.path.join(DATA_DIR, 'zones.txt'), encoding='utf-8') as f:
+            self.assertEqual(f.read(), output.getvalue())
+
+        output = io.StringIO()
+        write_links(output, tzdb_files)
+        with open(os.path.join(DATA_DIR, 'links.txt'), encoding='utf-8') as f:
+            self.assertEqual(f.read(), output.getvalue())
+
+
+class TestFields(unittest.TestCase):
+    """Unit test for the parsers of the field values."""
+
+    def test_parse_seconds(self) -> None:
+        self.assertEqual(0, parse_seconds('-'))
+        self.assertEqual(0, parse_seconds('0'))
+        self.assertEqual(7200, parse_seconds('2:00s'))
+        self.assertEqual(-12600, parse_seconds('-3:30'))
+        self.assertEqual(-17762, parse_seconds('-4:56:02'))
+        self.assertEqual(90000, parse_seconds('25'))
+
+    def test_parse_day(self) -> None:
+        self.assertEqual(26, parse_day(2023, 3, 'lastSun'))
+        self.assertEqual(29, parse_day(2023, 10, 'Sun>=23'))
+        self.assertEqual(23, parse_day(2023, 4, 'Sun<=25'))
+        self.assertEqual(15, parse_day(2023, 4, '15'))
+        # Crosses into April 1.
+        self.assertEqual(32, parse_day(2023, 3, 'Sat>=30'))
+
+    def test_until_fields(self) -> None:
+        self.assertEqual((1883, 1, 1, '0'), until_fields(('1883',)))
+        self.assertEqual(
+            (1883, 11, 18, '17:00u'),
+            until_fields(('1883', 'Nov', '18', '17:00u')))
+
+    def test_parse_coordinates(self) -> None:
+        self.assertEqual((42.5, 1.5), parse_coordinates('+4230+00130'))
+        latitude, longitude = parse_coordinates('+120903-0681636')
+        self.assertAlmostEqual(12.150833, latitude, places=6)
+        self.assertAlmostEqual(-68.276667, longitude, places=6)
+
+    def test_read_zone_tab(self) -> None:
+        records = read_zone_tab(os.path.join(TZDB_DIR, 'zone1970.tab'))
+        self.assertIn(
+            ZoneTabRecord(['AD'], '+4230+00131', 'Europe/Andorra', ''),
+            records)
+        dubai = [r for r in records if r.timezone == 'Asia/Dubai'][0]
+        self.assertEqual(['AE', 'OM', 'RE', 'SC', 'TF'], dubai.codes)
@@ -0,0 +1,90 @@
+import os
+import random
+import unittest
+from tzplus.fuzzy_index import FuzzyIndex
+from tzplus.fuzzy_index import build_fuzzy_index
+from tzplus.fuzzy_index import edit_distance
+from tzplus.fuzzy_index import misspell
+from tzplus.search_index import KIND_COUNTRY
+from tzplus.search_index import KIND_TIMEZONE
+from tzplus.search_index import SearchEntry
+
+DATA_DIR = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), '..', 'data')
+
+
+def levenshtein(a: str, b: str) -> int:
+    previous = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        current = [i]
+        for j, cb in enumerate(b, 1):
+            current.append(min(
+                previous[j] + 1, current[j - 1] + 1,
+                previous[j - 1] + (ca != cb)))
+        previous = current
+    return previous[-1]
+
+
+class TestFuzzyIndex(unittest.TestCase):
+    """Unit test for the trigram fuzzy-search index."""
+
+    def setUp(self) -> None:
+        self.index = build_fuzzy_index(DATA_DIR)
+
+    def test_edit_distance(self) -> None:
+        self.assertEqual(1, edit_distance('kolkatta', 'kolkata', 2))
+        self.assertEqual(3, edit_distance('kitten', 'sitting', 3))
+        self.assertEqual(3, edit_distance('kitten', 'sitting', 2))
+        rnd = random.Random(1)
+        for _ in range(2000):
+            a = ''.join(rnd.choice('abc') for _ in range(rnd.randrange(8)))
+            b = ''.join(rnd.choice('abc') for _ in range(rnd.randrange(8)))
+            k = rnd.randrange(5)
+            self.assertEqual(
+                min(levenshtein(a, b), k + 1), edit_distance(a, b, k))
+
+    def test_search(self) -> None:
+        index = self.index
+        self.assertEqual(
+            SearchEntry(KIND_TIMEZONE, 'America/Argentina/Buenos_Aires'),
+            index.search('Buenos Aires')[0].entry)
+        match = index.search('Kolkatta')[0]
+        self.assertEqual(
+            SearchEntry(KIND_TIMEZONE, 'Asia/Kolkata'), match.entry)
+        self.assertEqual(('kolkata', 1), (match.name, match.distance))
+        self.assertEqual(
+            SearchEntry(KIND_COUNTRY, 'CI'),
+            index.search('Ivory Coast')[0].entry)
+        self.assertEqual(
+            SearchEntry(KIND_COUNTRY, 'US'),
+            index.search('untied states')[0].entry)
+        self.assertEqual([], index.search('xyzzy'))
+
+    def test_short_query(self) -> None:
+        index = FuzzyIndex()
+        index.add('Etc/UTC', SearchEntry(KIND_TIMEZONE, 'Etc/UTC'))
+        index.add('UTC', SearchEntry(KIND_TIMEZONE, 'Etc/UTC'))
+        index.add('Chad', SearchEntry(KIND_COUNTRY, 'TD'))
+        # 'ut' shares no trigram with 'utc', but is 1 edit away.
+        self.assertEqual(
+            ['utc'], [m.name for m in index.search('ut', max_distance=1)])
+        self.assertEqual(
+            ['chad'], [m.name for m in index.search('cahd', max_distance=2)])
+
+    def test_same_as_linear_search(self) -> None:
+        index = self.index
+        rnd = random.Random(2)
+        for _ in range(200):
+            query = misspell(rnd, rnd.choice(index.names))
+            self.assertEqual(
+                index.linear_search(query), index.search(query), query)
+
+    def test_search_batch(self) -> None:
+        results = self.index.search_batch(['Kolkatta', 'kolkatta ', 'Chad'])
+        self.assertEqual(3, len(results))
+        self.assertIs(results[0], results[1])
+        self.assertEqual(SearchEntry(KIND_COUNTRY, 'TD'), results[2][0].entry)
+
+
+if __name__ == '__main__':
+    unittest.main()
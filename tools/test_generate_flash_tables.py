@@ -0,0 +1,52 @@
+import unittest
+from generate_flash_tables import decode_string
+from generate_flash_tables import encode_tables
+from generate_flash_tables import select_fragments
+
+
+class TestGenerateFlashTables(unittest.TestCase):
+    """Unit test for the encoding of the flash tables."""
+
+    def test_select_fragments(self) -> None:
+        names = [
+            'America/Argentina/Buenos_Aires',
+            'America/Argentina/Cordoba',
+            'America/Argentina/Salta',
+            'America/Chicago',
+            'America/New_York',
+            'Europe/Paris',
+        ]
+        self.assertEqual(
+            ['America/', 'America/Argentina/'], select_fragments(names))
+
+        # A fragment which does not pay for itself is not selected.
+        self.assertEqual(['America/'], select_fragments(names[1:]))
+
+    def test_encode_tables(self) -> None:
+        regions = {'NA': 'North America', 'SA': 'South America'}
+        countries = {'US': 'USA', 'AR': 'Argentina'}
+        zones = {
+            'SA': {'AR': [
+                'America/Argentina/Cordoba', 'America/Argentina/Buenos_Aires',
+            ]},
+            'NA': {'US': ['America/New_York', 'America/Chicago']},
+        }
+        flash = encode_tables(regions, countries, zones)
+
+        def decode(offset: int) -> str:
+            return decode_string(flash.strings, offset, flash.fragments)
+
+        self.assertEqual(
+            ['North America', 'South America'],
+            [decode(r[0]) for r in flash.regions])
+        self.assertEqual(
+            [('US', 'USA', 0, 2), ('AR', 'Argentina', 2, 2)],
+            [(c[0], decode(c[1]), c[2], c[3]) for c in flash.countries])
+        self.assertEqual(
+            [
+                'America/Chicago',
+                'America/New_York',
+                'America/Argentina/Buenos_Aires',
+                'America/Argentina/Cordoba',
+            ],
+            [decode(offset) for offset in flash.timezones])
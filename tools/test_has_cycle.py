@@ -1,6 +1,8 @@
 import unittest
-from verify_data import Entry
-from verify_data import has_cycle
+from tzplus.verify_data import Entry
+from tzplus.verify_data import has_cycle
+from tzplus.verify_data import LinkResolver
+from tzplus.verify_data import link_resolver
 
 
 class TestHashCycle(unittest.TestCase):
@@ -52,3 +54,42 @@ class TestHashCycle(unittest.TestCase):
         self.assertTrue(has_cycle('a', links))
         self.assertTrue(has_cycle('b', links))
         self.assertTrue(has_cycle('c', links))
+
+
+class TestLinkResolver(unittest.TestCase):
+    """Unit test for the LinkResolver which flattens chains of links."""
+
+    def test_resolve_all(self) -> None:
+        links = {
+            'a': Entry('zone', 'Link'),
+            'b': Entry('a', 'Link'),
+            'c': Entry('b', 'Link'),
+            'd': Entry('e', 'Link'),
+            'e': Entry('f', 'Link'),
+            'f': Entry('d', 'Link'),
+            'g': Entry('e', 'Link'),
+        }
+        resolver = LinkResolver(links)
+        self.assertEqual(
+            {'a': 'zone', 'b': 'zone', 'c': 'zone'},
+            resolver.resolve_all())
+        self.assertEqual([['d', 'e', 'f']], resolver.cycles)
+        self.assertTrue(resolver.has_cycle('g'))
+        self.assertFalse(resolver.has_cycle('c'))
+        self.assertEqual('zone', resolver.resolve('zone'))
+
+    def test_long_chain(self) -> None:
+        # A chain much longer than the recursion limit.
+        n = 100000
+        links = {f'l{i}': Entry(f'l{i + 1}', 'Link') for i in range(n)}
+        resolver = LinkResolver(links)
+        targets = resolver.resolve_all()
+        self.assertEqual(n, len(targets))
+        self.assertEqual(f'l{n}', targets['l0'])
+        self.assertEqual([], resolver.cycles)
+
+    def test_link_resolver(self) -> None:
+        resolver = link_resolver({'a': 'b', 'b': 'zone', 'c': 'c'})
+        self.assertEqual('zone', resolver.resolve('a'))
+        self.assertIsNone(resolver.resolve('c'))
+        self.assertEqual(Entry('b', 'Link'), resolver.links['a'])
@@ -0,0 +1,103 @@
+import asyncio
+import os
+import shutil
+import tempfile
+import unittest
+from lookup_server import LookupClient
+from lookup_server import LookupServer
+from tzplus.snapshot import DATA_FILES
+
+DATA_DIR = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), '..', 'data')
+
+
+class TestLookupServer(unittest.TestCase):
+    """Unit test for the lookup server, on a copy of the data files."""
+
+    def setUp(self) -> None:
+        self.tmp_dir = tempfile.mkdtemp()
+        for filename in DATA_FILES.values():
+            shutil.copy(os.path.join(DATA_DIR, filename), self.tmp_dir)
+        self.server = LookupServer(self.tmp_dir)
+
+    def tearDown(self) -> None:
+        shutil.rmtree(self.tmp_dir)
+
+    def test_answer(self) -> None:
+        response = self.server.answer({'queries': [
+            ['country_timezones', 'ES'],
+            ['timezone_countries', 'Europe/Simferopol'],
+            ['timezone_regions', 'Africa/Ceuta'],
+            ['canonical_zone', 'US/Pacific'],
+            ['canonical_zone', 'Nowhere'],
+            ['search', 'buenos'],
+        ]})
+        self.assertEqual(1, response['generation'])
+        self.assertEqual([
+            ['Africa/Ceuta', 'Atlantic/Canary', 'Europe/Madrid'],
+            ['RU', 'UA'],
+            ['AF'],
+            'America/Los_Angeles',
+            None,
+            [['timezone', 'America/Argentina/Buenos_Aires']],
+        ], response['results'])
+
+        self.assertIn('error', self.server.answer({'queries': [['x', 'y']]}))
+        self.assertIn('error', self.server.answer({'queries': [['search']]}))
+        self.assertIn('error', self.server.answer([]))
+        self.assertIn(b'error', self.server.answer_json(b'{'))
+
+    def test_unix_socket(self) -> None:
+        path = os.path.join(self.tmp_dir, 'lookup.sock')
+
+        async def run() -> None:
+            server = await asyncio.start_unix_server(
+                self.server.handle_lines, path)
+            async with server:
+                client = await LookupClient.connect(socket_path=path)
+                for _ in range(2):
+                    response = await client.query(
+                        [['canonical_zone', 'Europe/Kiev']])
+                    self.assertEqual(['Europe/Kyiv'], response['results'])
+                await client.close()
+
+        asyncio.run(run())
+
+    def test_http(self) -> None:
+        async def run() -> None:
+            server = await asyncio.start_server(
+                self.server.handle_http, '127.0.0.1', 0)
+            port = server.sockets[0].getsockname()[1]
+            async with server:
+                client = await LookupClient.connect(port=port)
+                for _ in range(2):
+                    response = await client.query(
+                        [['country_timezones', 'JP']])
+                    self.assertEqual([['Asia/Tokyo']], response['results'])
+                await client.close()
+
+        asyncio.run(run())
+
+    def test_reload(self) -> None:
+        self.assertFalse(asyncio.run(self.server.reload_if_changed()))
+
+        # Replace a file, as an editor or 'make' would.
+        path = os.path.join(self.tmp_dir, 'country_timezones.txt')
+        with open(path, 'a', encoding='utf-8') as f:
+            f.write('AS JP Asia/Seoul\n')
+        self.assertTrue(asyncio.run(self.server.reload_if_changed()))
+        response = self.server.answer(
+            {'queries': [['country_timezones', 'JP']]})
+        self.assertEqual(2, response['generation'])
+        self.assertEqual(
+            [['Asia/Tokyo', 'Asia/Seoul']], response['results'])
+
+        # An invalid file keeps the current catalog.
+        with open(path, 'a', encoding='utf-8') as f:
+            f.write('XX\n')
+        self.assertFalse(asyncio.run(self.server.reload_if_changed()))
+        self.assertEqual(2, self.server.loaded.generation)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,52 @@
+import contextlib
+import io
+import os
+import unittest
+from tzplus.list_zones import print_nested_timezones
+from tzplus.list_zones import read_region_country_timezones
+from tzplus.menu_format import MenuReader
+from tzplus.menu_format import print_menu
+from tzplus.menu_format import write_menu
+from tzplus.verify_data import read_countries
+from tzplus.verify_data import read_regions
+
+DATA_DIR = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), '..', 'data')
+
+
+class TestMenuFormat(unittest.TestCase):
+    """Unit test for the binary menu format."""
+
+    def test_seek(self) -> None:
+        zones = {
+            'NA': {'US': ['America/New_York', 'America/Chicago']},
+            'EU': {'FR': ['Europe/Paris'], 'DE': ['Europe/Berlin']},
+        }
+        reader = MenuReader(write_menu({'EU': 'Europe'}, {}, zones))
+        self.assertEqual(2, reader.num_regions)
+
+        europe = reader.region(0)
+        self.assertEqual(('EU', 'Europe', 2), europe[:3])
+        france = reader.country(europe, 1)
+        self.assertEqual(('FR', '', 1), france[:3])
+        self.assertEqual('Europe/Paris', reader.timezone(france, 0))
+
+        us = reader.country(reader.region(1), 0)
+        self.assertEqual('America/New_York', reader.timezone(us, 1))
+        with self.assertRaises(IndexError):
+            reader.timezone(us, 2)
+
+    def test_same_as_text(self) -> None:
+        regions = read_regions(os.path.join(DATA_DIR, 'regions.txt'))
+        countries = read_countries(
+            os.path.join(DATA_DIR, 'iso3166_short.txt'))
+        zones = read_region_country_timezones(
+            os.path.join(DATA_DIR, 'country_timezones.txt'))
+
+        expected = io.StringIO()
+        with contextlib.redirect_stdout(expected):
+            print_nested_timezones(regions, countries, zones)
+        observed = io.StringIO()
+        with contextlib.redirect_stdout(observed):
+            print_menu(MenuReader(write_menu(regions, countries, zones)))
+        self.assertEqual(expected.getvalue(), observed.getvalue())
@@ -0,0 +1,100 @@
+import os
+import unittest
+from posix_tz import PosixDate
+from posix_tz import check_posix_tz
+from posix_tz import compute_posix_tzs
+from posix_tz import format_posix_time
+from posix_tz import format_posix_tz
+from posix_tz import posix_date
+from posix_tz import read_posix_tzs
+from tzplus.verify_data import link_resolver
+from tzplus.data_parser import parse_region_country_timezones
+from tzplus.extract_tzdb import RuleRecord
+from tzplus.extract_tzdb import load_tzdb
+
+TOOLS_DIR = os.path.dirname(os.path.abspath(__file__))
+DATA_DIR = os.path.join(TOOLS_DIR, '..', 'data')
+TZDB_DIR = os.path.join(TOOLS_DIR, '..', 'tzdb')
+
+
+def rule(on_day: str, at_time: str) -> RuleRecord:
+    return RuleRecord(
+        'X', '2000', 'max', 'Mar', on_day, at_time, '1:00', 'D', 'test')
+
+
+class TestPosixTz(unittest.TestCase):
+    """Unit test for the POSIX TZ strings computed from the TZDB files."""
+
+    def setUp(self) -> None:
+        self.tzdb = load_tzdb(TZDB_DIR)
+        self.timezones = sorted(set(
+            row.timezone
+            for row in parse_region_country_timezones(
+                os.path.join(DATA_DIR, 'country_timezones.txt'))
+        ))
+        self.posix_tzs = compute_posix_tzs(self.tzdb, self.timezones, 2023)
+
+    def test_posix_tz(self) -> None:
+        expected = {
+            'Europe/Paris': 'CET-1CEST,M3.5.0,M10.5.0/3',
+            'US/Pacific': 'PST8PDT,M3.2.0,M11.1.0',
+            'Asia/Kolkata': 'IST-5:30',
+            'America/St_Johns': 'NST3:30NDT,M3.2.0,M11.1.0',
+            # Negative DST.
+            'Europe/Dublin': 'IST-1GMT0,M10.5.0,M3.5.0/1',
+            # 'Sun>=2' and 'Fri>=23'.
+            'America/Santiago': '<-04>4<-03>,M9.1.6/24,M4.1.6/24',
+            'Asia/Jerusalem': 'IST-2IDT,M3.4.4/26,M10.5.0',
+            'Pacific/Chatham':
+                '<+1245>-12:45<+1345>,M9.5.0/2:45,M4.1.0/3:45',
+            'Antarctica/Troll': '<+00>0<+02>-2,M3.5.0/1,M10.5.0/3',
+        }
+        for timezone, posix_tz in expected.items():
+            tz, reason = self.posix_tzs[timezone]
+            self.assertEqual(posix_tz, format_posix_tz(tz), timezone)
+            self.assertEqual('', reason, timezone)
+
+    def test_approximate(self) -> None:
+        tz, reason = self.posix_tzs['Africa/Casablanca']
+        self.assertEqual('<+01>-1', format_posix_tz(tz))
+        self.assertEqual('Rules Morocco change until 2087', reason)
+
+    def test_posix_date(self) -> None:
+        self.assertEqual(
+            (PosixDate(3, 5, 0, 0, 3600), ''),
+            posix_date(rule('lastSun', '1:00u'), 0, 0))
+        self.assertEqual(
+            (PosixDate(3, 3, 3, 0, 4 * 86400 + 10800), ''),
+            posix_date(rule('Sun<=25', '2:00s'), 3600, 3600))
+        self.assertEqual(
+            (PosixDate(3, 0, 0, 80, 0), ''),
+            posix_date(rule('21', '0:00'), 0, 0))
+        date, reason = posix_date(rule('Sun>=29', '2:00'), 0, 0)
+        self.assertIsNone(date)
+        self.assertEqual("Rule X on 'Sun>=29'", reason)
+
+    def test_format_posix_time(self) -> None:
+        self.assertEqual('0', format_posix_time(0))
+        self.assertEqual('-5:30', format_posix_time(-19800))
+        self.assertEqual('26', format_posix_time(93600))
+        self.assertEqual('0:19:32', format_posix_time(1172))
+
+    def test_same_as_transitions(self) -> None:
+        resolver = link_resolver(self.tzdb.links)
+        for timezone, (tz, reason) in self.posix_tzs.items():
+            if reason:
+                continue
+            zone = self.tzdb.zones[resolver.resolve(timezone) or '']
+            self.assertEqual(
+                '', check_posix_tz(self.tzdb, zone, tz, 2023, 2033), timezone)
+
+    def test_data_file_is_current(self) -> None:
+        posix_tzs = read_posix_tzs(os.path.join(DATA_DIR, 'posix_tz.txt'))
+        self.assertEqual(self.timezones, sorted(posix_tzs))
+        for timezone, (tz, reason) in self.posix_tzs.items():
+            self.assertEqual(
+                (format_posix_tz(tz), not reason), posix_tzs[timezone])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,28 @@
+import unittest
+from tzplus.profiler import Profiler
+
+
+class TestProfiler(unittest.TestCase):
+    """Unit test for the per-stage profiler."""
+
+    def test_call(self) -> None:
+        profiler = Profiler()
+        table = profiler.call('build', lambda n: list(range(n)), 10000)
+        profiler.call('discard', lambda: len([0] * 100000))
+        profiler.stop()
+
+        self.assertEqual(10000, len(table))
+        build, discard = profiler.stages
+        self.assertEqual('build', build.name)
+        self.assertGreater(build.retained_bytes, 10000 * 8)
+        self.assertGreaterEqual(build.peak_bytes, build.retained_bytes)
+        self.assertGreater(discard.peak_bytes, 100000 * 8)
+        self.assertLess(discard.retained_bytes, 1000)
+        self.assertEqual(
+            ['build', 'discard'],
+            [s['name'] for s in profiler.to_json()['stages']])
+
+    def test_disabled(self) -> None:
+        profiler = Profiler(enabled=False)
+        self.assertEqual(3, profiler.call('add', lambda a, b: a + b, 1, 2))
+        self.assertEqual([], profiler.stages)
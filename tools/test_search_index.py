@@ -0,0 +1,43 @@
+import os
+import unittest
+from tzplus.search_index import KIND_COUNTRY
+from tzplus.search_index import KIND_REGION
+from tzplus.search_index import KIND_TIMEZONE
+from tzplus.search_index import PrefixIndex
+from tzplus.search_index import SearchEntry
+from tzplus.search_index import build_index
+from tzplus.search_index import search_serialized
+
+DATA_DIR = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), '..', 'data')
+
+
+class TestPrefixIndex(unittest.TestCase):
+    """Unit test for the in-memory and serialized prefix index."""
+
+    def test_search(self) -> None:
+        index = PrefixIndex()
+        ba = SearchEntry(KIND_TIMEZONE, 'America/Argentina/Buenos_Aires')
+        index.add('America/Argentina/Buenos_Aires', ba)
+        index.add('Buenos_Aires', ba)
+        index.add('Argentina', SearchEntry(KIND_COUNTRY, 'AR'))
+        index.add('Atlantic Ocean', SearchEntry(KIND_REGION, 'AO'))
+
+        self.assertEqual([ba], index.search('Buenos'))
+        self.assertEqual([ba], index.search('aires'))
+        self.assertEqual(
+            [SearchEntry(KIND_COUNTRY, 'AR'), ba], index.search('ARG'))
+        self.assertEqual(
+            [SearchEntry(KIND_REGION, 'AO')], index.search('ocean'))
+        self.assertEqual([], index.search('x'))
+        self.assertEqual(3, len(index.search('')))
+
+    def test_serialized(self) -> None:
+        index = build_index(DATA_DIR)
+        data = index.serialize()
+        for prefix in ['', 'a', 'america/n', 'new y', 'st ', 'kolk', 'zz']:
+            self.assertEqual(
+                index.search(prefix), search_serialized(data, prefix))
+        self.assertEqual(
+            [SearchEntry(KIND_TIMEZONE, 'Asia/Kolkata')],
+            search_serialized(data, 'Kolk'))
@@ -0,0 +1,92 @@
+import mmap
+import os
+import tempfile
+import unittest
+from typing import Any
+from typing import List
+from unittest import mock
+from tzplus.snapshot import Snapshot
+from tzplus.snapshot import compile_snapshot
+from tzplus.snapshot import data_files
+from tzplus.snapshot import hash_file
+from tzplus.snapshot import load_rows
+from tzplus.snapshot import open_snapshot
+from tzplus.snapshot import read_rows
+
+DATA_DIR = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), '..', 'data')
+
+
+class TestSnapshot(unittest.TestCase):
+    """Verify that the snapshot returns the same rows as the text files."""
+
+    def test_round_trip(self) -> None:
+        files = data_files(DATA_DIR)
+        tables = {name: read_rows(name, path) for name, path in files.items()}
+        hashes = {name: hash_file(path) for name, path in files.items()}
+        snapshot = Snapshot(compile_snapshot(tables, hashes))
+
+        for name, rows in tables.items():
+            self.assertEqual(rows, list(snapshot.rows(name)))
+        self.assertTrue(snapshot.is_fresh(files))
+
+    def test_stale_snapshot(self) -> None:
+        with tempfile.TemporaryDirectory() as tmpdir:
+            regions = os.path.join(tmpdir, 'regions.txt')
+            with open(regions, 'w', encoding='utf-8') as f:
+                f.write('AF Africa\n')
+            files = {'regions': regions}
+            tables = {'regions': read_rows('regions', regions)}
+            snapshot_path = os.path.join(tmpdir, 'tzplus.bin')
+            with open(snapshot_path, 'wb') as f:
+                f.write(compile_snapshot(
+                    tables, {'regions': hash_file(regions)}))
+            self.assertEqual(
+                [('AF', 'Africa')],
+                list(load_rows(files, snapshot_path)['regions']))
+
+            # Editing the text file invalidates the snapshot.
+            with open(regions, 'w', encoding='utf-8') as f:
+                f.write('AN Antarctica\n')
+            self.assertEqual(
+                [('AN', 'Antarctica')],
+                list(load_rows(files, snapshot_path)['regions']))
+
+    def test_empty_table(self) -> None:
+        with tempfile.TemporaryDirectory() as tmpdir:
+            regions = os.path.join(tmpdir, 'regions.txt')
+            with open(regions, 'w', encoding='utf-8') as f:
+                f.write('# Only comments\n')
+            files = {'regions': regions}
+            tables = {'regions': read_rows('regions', regions)}
+            snapshot_path = os.path.join(tmpdir, 'tzplus.bin')
+            with open(snapshot_path, 'wb') as f:
+                f.write(compile_snapshot(
+                    tables, {'regions': hash_file(regions)}))
+            self.assertEqual(
+                [], list(load_rows(files, snapshot_path)['regions']))
+
+    def test_invalid_snapshot_is_closed(self) -> None:
+        files = data_files(DATA_DIR)
+        tables = {name: read_rows(name, path) for name, path in files.items()}
+        hashes = {name: hash_file(path) for name, path in files.items()}
+        data = compile_snapshot(tables, hashes)
+
+        opened: List[mmap.mmap] = []
+        real_mmap = mmap.mmap
+
+        def record_mmap(*args: Any, **kwargs: Any) -> mmap.mmap:
+            buf = real_mmap(*args, **kwargs)
+            opened.append(buf)
+            return buf
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, 'tzplus.bin')
+            # Truncated in the directory, and with an invalid magic.
+            for content in [data[:40], b'X' + data[1:]]:
+                with open(path, 'wb') as f:
+                    f.write(content)
+                with mock.patch.object(mmap, 'mmap', side_effect=record_mmap):
+                    self.assertIsNone(open_snapshot(path))
+        self.assertEqual(2, len(opened))
+        self.assertTrue(all(buf.closed for buf in opened))
@@ -0,0 +1,134 @@
+import contextlib
+import io
+import os
+import tempfile
+import unittest
+from tzplus.extract_tzdb import read_version
+from tzplus.list_zones import print_nested_timezones
+from tzplus.menu_format import MenuReader
+from tzplus.menu_format import print_menu
+from tzplus.menu_format import write_menu
+from tzplus.sort_orders import SortOrders
+from tzplus.sort_orders import apply_sort_order
+from tzplus.sort_orders import build_sort_orders
+from tzplus.sort_orders import compute_longitudes
+from tzplus.sort_orders import compute_sort_orders
+from tzplus.sort_orders import read_sort_orders
+from tzplus.sort_orders import write_sort_orders
+
+TOOLS_DIR = os.path.dirname(os.path.abspath(__file__))
+DATA_DIR = os.path.join(TOOLS_DIR, '..', 'data')
+TZDB_DIR = os.path.join(TOOLS_DIR, '..', 'tzdb')
+
+
+class TestSortOrders(unittest.TestCase):
+    """Unit test for the precomputed sort orders of the menu."""
+
+    def setUp(self) -> None:
+        self.zones = {
+            'NA': {
+                'US': ['America/New_York', 'America/Denver', 'US/Pacific'],
+                'CA': ['America/Toronto', 'America/Vancouver'],
+            },
+            'EU': {'FR': ['Europe/Paris']},
+        }
+        self.longitudes = {
+            'America/New_York': -74.0,
+            'America/Denver': -105.0,
+            'US/Pacific': -118.2,
+            'America/Toronto': -79.4,
+            'America/Vancouver': -123.1,
+            'Europe/Paris': 2.3,
+        }
+        self.offsets = {
+            'America/New_York': -18000,
+            'America/Denver': -25200,
+            'US/Pacific': -28800,
+            'America/Toronto': -18000,
+            'America/Vancouver': -28800,
+            'Europe/Paris': 3600,
+        }
+        self.orders = compute_sort_orders(
+            self.zones, {}, {'US': 'United States', 'CA': 'Canada'},
+            self.longitudes, self.offsets)
+
+    def test_compute_sort_orders(self) -> None:
+        permutations = self.orders.permutations
+        self.assertEqual([1, 0], permutations[('name', '-', '-')])
+        self.assertEqual([1, 0], permutations[('name', 'NA', '-')])
+        self.assertEqual([1, 0, 2], permutations[('name', 'NA', 'US')])
+        self.assertEqual([2, 1, 0], permutations[('longitude', 'NA', 'US')])
+        # The lower median of Canada is Vancouver, west of Denver, the median
+        # of the US.
+        self.assertEqual([1, 0], permutations[('longitude', 'NA', '-')])
+        self.assertEqual([1, 0], permutations[('offset', 'NA', 'CA')])
+        self.assertEqual([0, 1], permutations[('offset', '-', '-')])
+
+    def test_apply_sort_order(self) -> None:
+        ordered = apply_sort_order(self.zones, self.orders, 'longitude')
+        self.assertEqual(['NA', 'EU'], list(ordered))
+        self.assertEqual(['CA', 'US'], list(ordered['NA']))
+        self.assertEqual(
+            ['US/Pacific', 'America/Denver', 'America/New_York'],
+            ordered['NA']['US'])
+
+        ordered = apply_sort_order(self.zones, self.orders, 'name')
+        self.assertEqual(['EU', 'NA'], list(ordered))
+        self.assertEqual(['CA', 'US'], list(ordered['NA']))
+
+        # A changed tree is detected.
+        self.zones['EU']['DE'] = ['Europe/Berlin']
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            with self.assertRaises(SystemExit):
+                apply_sort_order(self.zones, self.orders, 'name')
+        self.assertIn('out of date', output.getvalue())
+
+    def test_write_read(self) -> None:
+        with tempfile.TemporaryDirectory() as tmpdir:
+            filename = os.path.join(tmpdir, 'sort_orders.txt')
+            with open(filename, 'w', encoding='utf-8') as f:
+                write_sort_orders(f, '# header\n\n', self.orders)
+            self.assertEqual(self.orders, read_sort_orders(filename))
+
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            with self.assertRaises(SystemExit):
+                apply_sort_order(
+                    self.zones,
+                    SortOrders(self.orders.checksum, {}),
+                    'offset')
+        self.assertIn("Invalid sort order 'offset'", output.getvalue())
+
+    def test_compute_longitudes(self) -> None:
+        longitudes = compute_longitudes(
+            {'America/Los_Angeles': (34.05, -118.25)},
+            {'US/Pacific': 'America/Los_Angeles'},
+            {'US/Pacific': -28800, 'Etc/GMT+5': -18000})
+        self.assertEqual(-118.25, longitudes['US/Pacific'])
+        self.assertEqual(-75.0, longitudes['Etc/GMT+5'])
+
+    def test_data_file_is_current(self) -> None:
+        orders = build_sort_orders(
+            TZDB_DIR,
+            os.path.join(DATA_DIR, 'country_timezones.txt'),
+            os.path.join(DATA_DIR, 'regions.txt'),
+            os.path.join(DATA_DIR, 'iso3166_short.txt'),
+            int(read_version(TZDB_DIR)[:4]))
+        self.assertEqual(
+            orders,
+            read_sort_orders(os.path.join(DATA_DIR, 'sort_orders.txt')))
+
+    def test_menu_same_as_text(self) -> None:
+        ordered = apply_sort_order(self.zones, self.orders, 'offset')
+        expected = io.StringIO()
+        with contextlib.redirect_stdout(expected):
+            print_nested_timezones({}, {}, ordered, ordered=True)
+        observed = io.StringIO()
+        with contextlib.redirect_stdout(observed):
+            print_menu(MenuReader(write_menu({}, {}, ordered, ordered=True)))
+        self.assertEqual(expected.getvalue(), observed.getvalue())
+
+
+if __name__ == '__main__':
+    unittest.main()
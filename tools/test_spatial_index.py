@@ -0,0 +1,81 @@
+import os
+import random
+import unittest
+from tzplus.spatial_index import SpatialIndex
+from tzplus.spatial_index import ZonePoint
+from tzplus.spatial_index import linear_nearest
+from tzplus.spatial_index import read_zone_points
+
+TOP_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+TZDB_DIR = os.path.join(TOP_DIR, 'tzdb')
+TIMEZONES_FILE = os.path.join(TOP_DIR, 'data', 'country_timezones.txt')
+
+
+class TestSpatialIndex(unittest.TestCase):
+    """Unit test for the k-d tree of timezone coordinates."""
+
+    def setUp(self) -> None:
+        self.points = read_zone_points(TZDB_DIR, TIMEZONES_FILE)
+        self.index = SpatialIndex(self.points)
+
+    def test_read_zone_points(self) -> None:
+        points = {p.timezone: p for p in self.points}
+        simferopol = points['Europe/Simferopol']
+        self.assertEqual(('RU', 'UA'), simferopol.countries)
+        self.assertEqual(('EU',), simferopol.regions)
+        # Links with their own coordinates in zone.tab.
+        self.assertIn('Europe/Vatican', points)
+        # Links without coordinates.
+        self.assertNotIn('US/Pacific', points)
+
+    def test_nearest(self) -> None:
+        matches = self.index.nearest(48.85, 2.35, 2)
+        self.assertEqual(
+            ['Europe/Paris', 'Europe/Brussels'],
+            [m.point.timezone for m in matches])
+        self.assertLess(matches[0].distance_km, 5)
+
+        # Across the antimeridian.
+        match = self.index.nearest(51.5, 179.9)[0]
+        self.assertEqual('America/Adak', match.point.timezone)
+
+    def test_nearest_matches_linear_scan(self) -> None:
+        rnd = random.Random(1)
+        points = [
+            (rnd.uniform(-90, 90), rnd.uniform(-180, 180))
+            for _ in range(500)
+        ]
+        for (lat, lon), matches in zip(
+            points, self.index.nearest_batch(points)
+        ):
+            expected = linear_nearest(self.points, lat, lon)
+            self.assertAlmostEqual(
+                expected.distance_km, matches[0].distance_km, places=6)
+
+    def test_within(self) -> None:
+        radius = 500.0
+        for lat, lon in [(46.0, 8.0), (0.0, 0.0), (-33.9, 151.2)]:
+            matches = self.index.within(lat, lon, radius)
+            self.assertEqual(
+                sorted(m.distance_km for m in matches),
+                [m.distance_km for m in matches])
+            expected = {
+                p.timezone for p in self.points
+                if linear_nearest([p], lat, lon).distance_km <= radius
+            }
+            self.assertEqual(expected, {m.point.timezone for m in matches})
+
+        batch = self.index.within_batch([(46.0, 8.0), (0.0, -160.0)], 300.0)
+        self.assertEqual(4, len(batch[0]))
+        self.assertEqual([], batch[1])
+
+    def test_small(self) -> None:
+        self.assertEqual([], SpatialIndex([]).nearest(0.0, 0.0))
+        point = ZonePoint('A', 10.0, 20.0, ('AA',), ('R',))
+        matches = SpatialIndex([point]).nearest(10.0, 20.0, 3)
+        self.assertEqual(1, len(matches))
+        self.assertAlmostEqual(0.0, matches[0].distance_km)
+
+
+if __name__ == '__main__':
+    unittest.main()
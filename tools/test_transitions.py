@@ -0,0 +1,77 @@
+import os
+import unittest
+from transitions import LocalTime
+from transitions import compile_tables
+from transitions import epoch_seconds
+from transitions import format_abbreviation
+from transitions import load_tables
+from tzplus.extract_tzdb import load_tzdb
+
+TZDB_DIR = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), '..', 'tzdb')
+
+
+class TestTransitions(unittest.TestCase):
+    """Unit test for the compiled transitions. The expected values were
+    verified using zdump(8) on the output of zic(8) for the same TZDB.
+    """
+
+    def setUp(self) -> None:
+        self.tables = compile_tables(load_tzdb(TZDB_DIR), 1970, 2050)
+
+    def test_lookup(self) -> None:
+        # 2023-03-26 01:00 UTC, start of DST in the EU.
+        t = epoch_seconds(2023, 3, 26, 3600)
+        self.assertEqual(
+            LocalTime(3600, False, 'CET'),
+            self.tables.lookup('Europe/Paris', t - 1))
+        self.assertEqual(
+            LocalTime(7200, True, 'CEST'),
+            self.tables.lookup('Europe/Paris', t))
+
+        # 2007-03-11 2:00 EST, the first year of the current US rules.
+        t = epoch_seconds(2007, 3, 11, 7 * 3600)
+        self.assertEqual(
+            LocalTime(-18000, False, 'EST'),
+            self.tables.lookup('America/New_York', t - 1))
+        self.assertEqual(
+            LocalTime(-14400, True, 'EDT'),
+            self.tables.lookup('US/Eastern', t))
+
+        # Negative DST in winter.
+        self.assertEqual(
+            LocalTime(0, True, 'GMT'),
+            self.tables.lookup('Europe/Dublin', epoch_seconds(2023, 1, 1, 0)))
+
+        # A rule change at the same wall time as the start of an era is in
+        # effect at its start.
+        t = epoch_seconds(1999, 10, 3, 3 * 3600)
+        self.assertEqual(
+            LocalTime(-10800, True, '-03'),
+            self.tables.lookup('America/Argentina/Buenos_Aires', t))
+
+        # Before the start year.
+        self.assertEqual(
+            LocalTime(19800, False, 'IST'),
+            self.tables.lookup('Asia/Kolkata', -10**10))
+        self.assertEqual(
+            epoch_seconds(2023, 1, 1, 19800),
+            self.tables.utc_to_local(
+                'Asia/Kolkata', epoch_seconds(2023, 1, 1, 0)))
+        with self.assertRaises(KeyError):
+            self.tables.lookup('Mars/Olympus_Mons', 0)
+
+    def test_serialize(self) -> None:
+        loaded = load_tables(self.tables.serialize())
+        self.assertEqual(self.tables.names, loaded.names)
+        self.assertEqual(
+            self.tables.transitions('Australia/Lord_Howe'),
+            loaded.transitions('Australia/Lord_Howe'))
+
+    def test_format_abbreviation(self) -> None:
+        self.assertEqual('EDT', format_abbreviation('E%sT', 3600, 'D', 0))
+        self.assertEqual('GMT', format_abbreviation('GMT/BST', 0, '', 0))
+        self.assertEqual('BST', format_abbreviation('GMT/BST', 3600, '', 0))
+        self.assertEqual(
+            '+0530', format_abbreviation('%z', 0, '', 19800))
+        self.assertEqual('-03', format_abbreviation('%z', 0, '', -10800))
@@ -0,0 +1,121 @@
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import unittest
+from startup_benchmark import parse_importtime
+from tzplus import cli
+from tzplus import snapshot
+from tzplus.cache import cache_path
+from tzplus.cache import load_cached_catalog
+from tzplus.cache import read_cache
+from tzplus.cli import default_data_dir
+from unittest import mock
+
+TOOLS_DIR = os.path.dirname(os.path.abspath(__file__))
+DATA_DIR = os.path.join(os.path.dirname(TOOLS_DIR), 'data')
+
+
+def run_python(code: str) -> str:
+    """Return the output of 'code' run in a new Python process."""
+    return subprocess.run(
+        [sys.executable, '-c', code], cwd=TOOLS_DIR, check=True,
+        stdout=subprocess.PIPE, text=True).stdout
+
+
+class TestTzplus(unittest.TestCase):
+    """Unit test for the lazy tzplus package and its catalog cache."""
+
+    def setUp(self) -> None:
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.cache_dir = os.path.join(self.tmpdir.name, 'cache')
+
+    def tearDown(self) -> None:
+        self.tmpdir.cleanup()
+
+    def test_lazy_import(self) -> None:
+        output = run_python(
+            "import sys, tzplus\n"
+            "print('tzplus.catalog' in sys.modules)\n"
+            "tzplus.read_regions\n"
+            "print('tzplus.verify_data' in sys.modules,\n"
+            "      'tzplus.catalog' in sys.modules)\n")
+        self.assertEqual('False\nTrue False\n', output)
+
+    def test_cache(self) -> None:
+        data_dir = os.path.join(self.tmpdir.name, 'data')
+        shutil.copytree(DATA_DIR, data_dir)
+
+        catalog = load_cached_catalog(data_dir, self.cache_dir)
+        self.assertTrue(os.path.exists(cache_path(data_dir, self.cache_dir)))
+        self.assertEqual('Japan', catalog.country_name('JP'))
+        self.assertIsNone(catalog.region_name('XX'))
+
+        # The cached catalog is equal to the built one.
+        cached = load_cached_catalog(data_dir, self.cache_dir)
+        self.assertEqual(
+            catalog.country_timezones('US'), cached.country_timezones('US'))
+        self.assertEqual(catalog.names, cached.names)
+
+        # A changed data file rebuilds the catalog.
+        with open(os.path.join(data_dir, 'regions.txt'), 'a') as f:
+            f.write('XX Nowhere\n')
+        catalog = load_cached_catalog(data_dir, self.cache_dir)
+        self.assertEqual('Nowhere', catalog.region_name('XX'))
+
+    def test_changed_reader_rebuilds(self) -> None:
+        # A copy of snapshot.py, which the catalog reads the data files with.
+        snapshot_file = os.path.join(self.tmpdir.name, 'snapshot.py')
+        shutil.copyfile(snapshot.__file__ or '', snapshot_file)
+        path = cache_path(DATA_DIR, self.cache_dir)
+        data_dir = os.path.realpath(DATA_DIR)
+        with mock.patch.object(snapshot, '__file__', snapshot_file):
+            load_cached_catalog(DATA_DIR, self.cache_dir)
+            self.assertIsNotNone(read_cache(path, data_dir))
+
+            with open(snapshot_file, 'a') as f:
+                f.write('# changed\n')
+            self.assertIsNone(read_cache(path, data_dir))
+
+    def test_cache_hit_skips_readers(self) -> None:
+        load_cached_catalog(DATA_DIR, self.cache_dir)
+        output = run_python(
+            "import sys\n"
+            "from tzplus.cache import load_cached_catalog\n"
+            f"catalog = load_cached_catalog({DATA_DIR!r}, "
+            f"{self.cache_dir!r})\n"
+            "print(catalog.country_name('JP'))\n"
+            "print('tzplus.verify_data' in sys.modules,\n"
+            "      'tzplus.snapshot' in sys.modules)\n")
+        self.assertEqual('Japan\nFalse False\n', output)
+
+    def test_default_data_dir(self) -> None:
+        with mock.patch.dict(os.environ, {'TZPLUS_DATA_DIR': ''}):
+            self.assertEqual(
+                os.path.realpath(DATA_DIR),
+                os.path.realpath(default_data_dir() or ''))
+
+            # An installed package has no data/ directory of the source tree.
+            installed = os.path.join(
+                self.tmpdir.name, 'site-packages', 'tzplus', 'cli.py')
+            with mock.patch.object(cli, '__file__', installed):
+                self.assertIsNone(default_data_dir())
+
+        with mock.patch.dict(os.environ, {'TZPLUS_DATA_DIR': 'data'}):
+            self.assertEqual('data', default_data_dir())
+
+    def test_parse_importtime(self) -> None:
+        output = (
+            "import time: self [us] | cumulative | imported package\n"
+            "import time:       614 |       1663 | encodings\n"
+            "import time:       502 |       2052 |   os\n"
+            "import time:      1204 |      42517 | tzplus.cli\n"
+        )
+        self.assertEqual(
+            [('tzplus.cli', 42.517), ('encodings', 1.663)],
+            parse_importtime(output))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,93 @@
+import os
+import shutil
+import tempfile
+import unittest
+from typing import Dict
+from typing import List
+from unittest import mock
+from tzplus import data_parser
+from tzplus.verify_data import VerifyCache
+from tzplus.verify_data import read_regions
+
+
+class TestVerifyCache(unittest.TestCase):
+    """Unit test for the incremental VerifyCache."""
+
+    def test_rerun_only_changed(self) -> None:
+        calls: List[str] = []
+
+        def check_regions(regions: Dict[str, str]) -> None:
+            calls.append('regions')
+
+        def check_both(regions: Dict[str, str]) -> None:
+            calls.append('both')
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            cache_file = os.path.join(tmpdir, 'cache')
+            regions_file = os.path.join(tmpdir, 'regions.txt')
+            other_file = os.path.join(tmpdir, 'other.txt')
+            with open(regions_file, 'w', encoding='utf-8') as f:
+                f.write('AF Africa\n')
+            with open(other_file, 'w', encoding='utf-8') as f:
+                f.write('other\n')
+
+            def run() -> Dict[str, str]:
+                cache = VerifyCache(cache_file)
+                regions = cache.read(read_regions, regions_file)
+                cache.check([regions_file], check_regions, regions)
+                cache.check([regions_file, other_file], check_both, regions)
+                cache.save()
+                return regions
+
+            self.assertEqual({'AF': 'Africa'}, run())
+            self.assertEqual(['regions', 'both'], calls)
+
+            # No-op run.
+            calls.clear()
+            self.assertEqual({'AF': 'Africa'}, run())
+            self.assertEqual([], calls)
+
+            # Only the check depending on other.txt is re-run.
+            with open(other_file, 'w', encoding='utf-8') as f:
+                f.write('changed\n')
+            calls.clear()
+            run()
+            self.assertEqual(['both'], calls)
+
+            # A changed input file is parsed again.
+            with open(regions_file, 'w', encoding='utf-8') as f:
+                f.write('AN Antarctica\n')
+            calls.clear()
+            self.assertEqual({'AN': 'Antarctica'}, run())
+            self.assertEqual(['regions', 'both'], calls)
+
+    def test_changed_parser_invalidates(self) -> None:
+        calls: List[str] = []
+
+        def check_regions(regions: Dict[str, str]) -> None:
+            calls.append('regions')
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            cache_file = os.path.join(tmpdir, 'cache')
+            regions_file = os.path.join(tmpdir, 'regions.txt')
+            with open(regions_file, 'w', encoding='utf-8') as f:
+                f.write('AF Africa\n')
+            parser_file = os.path.join(tmpdir, 'data_parser.py')
+            shutil.copyfile(data_parser.__file__ or '', parser_file)
+
+            def run() -> None:
+                with mock.patch.object(data_parser, '__file__', parser_file):
+                    cache = VerifyCache(cache_file)
+                    regions = cache.read(read_regions, regions_file)
+                    cache.check([regions_file], check_regions, regions)
+                    cache.save()
+
+            run()
+            run()
+            self.assertEqual(['regions'], calls)
+
+            # An edited parser module re-runs the readers and the checks.
+            with open(parser_file, 'a', encoding='utf-8') as f:
+                f.write('# changed\n')
+            run()
+            self.assertEqual(['regions', 'regions'], calls)
@@ -0,0 +1,96 @@
+import os
+import shutil
+import subprocess
+import tarfile
+import tempfile
+import unittest
+from verify_releases import ReleaseSource
+from verify_releases import read_data_files
+from verify_releases import verify_releases
+
+TOP_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+TZDB_DIR = os.path.join(TOP_DIR, 'tzdb')
+DATA_DIR = os.path.join(TOP_DIR, 'data')
+
+
+class TestVerifyReleases(unittest.TestCase):
+    """Verify the vendored tzdb/ files as a git tag and as a tarball."""
+
+    def setUp(self) -> None:
+        self.tmpdir = tempfile.mkdtemp()
+        self.data = read_data_files(DATA_DIR)
+
+    def tearDown(self) -> None:
+        shutil.rmtree(self.tmpdir)
+
+    def test_git_tags(self) -> None:
+        repo = os.path.join(self.tmpdir, 'tz')
+        shutil.copytree(TZDB_DIR, repo)
+
+        def git(*args: str) -> None:
+            subprocess.run(
+                ['git', '-c', 'user.name=test', '-c', 'user.email=test@test',
+                 '-C', repo] + list(args),
+                check=True, stdout=subprocess.DEVNULL)
+
+        git('init', '-q')
+        git('add', '.')
+        git('commit', '-q', '-m', 'good')
+        git('tag', 'good')
+        with open(os.path.join(repo, 'etcetera'), 'a') as f:
+            f.write('Zone\tEtc/Extra\t0\t-\tXXX\n')
+        git('commit', '-q', '-a', '-m', 'bad')
+        git('tag', 'bad')
+
+        reports = verify_releases(
+            [
+                ReleaseSource('good', repo=repo),
+                ReleaseSource('bad', repo=repo),
+            ],
+            self.data,
+            jobs=2)
+        self.assertEqual(['good', 'bad'], [r.name for r in reports])
+        self.assertEqual([], reports[0].failures)
+        self.assertEqual(
+            [('check_zones', 'Missing zones in bad\n  Etc/Extra\n')],
+            reports[1].failures)
+
+    def make_tarball(self, version: str, extra: str = '') -> str:
+        """Return a tzdata{version}.tar.gz of the tzdb/ files, with 'extra'
+        appended to 'etcetera'.
+        """
+        tarball = os.path.join(self.tmpdir, f'tzdata{version}.tar.gz')
+        with tarfile.open(tarball, 'w:gz') as tar:
+            for name in os.listdir(TZDB_DIR):
+                path = os.path.join(TZDB_DIR, name)
+                if name == 'etcetera' and extra:
+                    path = os.path.join(self.tmpdir, name)
+                    shutil.copyfile(os.path.join(TZDB_DIR, name), path)
+                    with open(path, 'a') as f:
+                        f.write(extra)
+                tar.add(path, arcname=name)
+        return tarball
+
+    def test_tarball(self) -> None:
+        tarball = self.make_tarball('2023c')
+
+        reports = verify_releases(
+            [ReleaseSource('2023c', tarball=tarball)], self.data)
+        self.assertEqual(1, len(reports))
+        self.assertEqual(350, reports[0].num_zones)
+        self.assertEqual([], reports[0].failures)
+
+    def test_malformed_release(self) -> None:
+        reports = verify_releases(
+            [
+                ReleaseSource('bad', tarball=self.make_tarball(
+                    'bad', 'Bogus Etc/Bogus\n')),
+                ReleaseSource('good', tarball=self.make_tarball('good')),
+            ],
+            self.data,
+            jobs=2)
+        self.assertEqual(['bad', 'good'], [r.name for r in reports])
+        [(check, output)] = reports[0].failures
+        self.assertEqual('parse_release', check)
+        self.assertIn("Unknown tag 'Bogus'", output)
+        self.assertEqual([], reports[1].failures)
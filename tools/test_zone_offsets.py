@@ -0,0 +1,63 @@
+import os
+import unittest
+from tzplus.extract_tzdb import load_tzdb
+from tzplus.zone_offsets import GeonamesOffset
+from tzplus.zone_offsets import ZoneOffset
+from tzplus.zone_offsets import check_geonames
+from tzplus.zone_offsets import compute_offsets
+from tzplus.zone_offsets import format_offset
+
+TZDB_DIR = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), '..', 'tzdb')
+
+
+class TestZoneOffsets(unittest.TestCase):
+    """Unit test for the UTC offsets computed from the TZDB files."""
+
+    def test_compute_offsets(self) -> None:
+        tzdb = load_tzdb(TZDB_DIR)
+        offsets = compute_offsets(tzdb, [
+            'Asia/Kolkata',
+            'America/Santiago',
+            'Africa/Casablanca',
+            'Europe/Dublin',
+            'Europe/Paris',
+            'Europe/Vatican',
+        ], 2023)
+        self.assertEqual(ZoneOffset(19800, 19800, False),
+                         offsets['Asia/Kolkata'])
+        self.assertEqual(ZoneOffset(-14400, -10800, True),
+                         offsets['America/Santiago'])
+        self.assertEqual(ZoneOffset(3600, 7200, True),
+                         offsets['Europe/Paris'])
+        # Link resolves to its Zone.
+        self.assertEqual(offsets['Europe/Paris'], offsets['Europe/Vatican'])
+        # Negative DST is normalized.
+        self.assertEqual(ZoneOffset(0, 3600, True), offsets['Europe/Dublin'])
+        self.assertEqual(ZoneOffset(0, 3600, True),
+                         offsets['Africa/Casablanca'])
+
+        # Mexico abolished DST in Oct 2022.
+        mexico = compute_offsets(tzdb, ['America/Mexico_City'], 2022)
+        self.assertTrue(mexico['America/Mexico_City'].uses_dst)
+        mexico = compute_offsets(tzdb, ['America/Mexico_City'], 2023)
+        self.assertFalse(mexico['America/Mexico_City'].uses_dst)
+
+    def test_check_geonames(self) -> None:
+        offsets = {
+            'A': ZoneOffset(0, 3600, True),
+            'B': ZoneOffset(7200, 7200, False),
+            'C': ZoneOffset(0, 0, False),
+        }
+        geonames = {
+            'A': GeonamesOffset(3600, 3600, 0),
+            'B': GeonamesOffset(7200, 7200, 3600),
+        }
+        self.assertEqual(
+            [('B', geonames['B'], offsets['B'])],
+            check_geonames(offsets, geonames))
+
+    def test_format_offset(self) -> None:
+        self.assertEqual('+05:30', format_offset(19800))
+        self.assertEqual('-03:00', format_offset(-10800))
+        self.assertEqual('-00:25:21', format_offset(-1521))
@@ -0,0 +1,492 @@
+#!/usr/bin/env python3
+#
+# Compile the Zone and Rule lines of the raw TZDB files into sorted arrays of
+# UTC transitions over a range of years, and look up the local offset and
+# abbreviation of a UTC instant by binary search, without the zoneinfo of the
+# host. The transitions of all zones are stored in a few flat integer arrays
+# (like the TZif format), with a deduplicated table of (offset, is_dst,
+# abbreviation) types shared by all zones. Links share the arrays of their
+# Zone.
+#
+# Usage:
+# $ transitions.py
+#   [--start_year {year}]
+#   [--until_year {year}]
+#   [--output {file}]
+#   [--lookup {timezone} {epoch_seconds}]
+#   tzdb_dir
+#
+# The instants before 'start_year' use the offset in effect at its start. The
+# instants at or after 'until_year' use the last offset before it, which is
+# correct only for timezones without DST.
+#
+# Binary format written by --output (all integers are little-endian):
+#
+#   header: magic 'TZPT', version u16, start_year u16, until_year u16,
+#       num_zones u32, num_names u32, num_transitions u32, num_types u32,
+#       num_abbreviations u32
+#   zone starts: (num_zones + 1) * u32, indexes into the transitions
+#   transition times: num_transitions * i64, epoch seconds
+#   transition types: num_transitions * u16
+#   type offsets: num_types * i32, seconds
+#   type is_dst: num_types * u8
+#   type abbreviations: num_types * u16
+#   name zones: num_names * u32, zone index of each name
+#   strings: '\n'-separated names, then '\n'-separated abbreviations (utf-8)
+
+from array import array
+from bisect import bisect_right
+from datetime import date
+from typing import Dict
+from typing import List
+from typing import NamedTuple
+from typing import Tuple
+
+import argparse
+import struct
+
+from tzplus.errors import error
+from tzplus.extract_tzdb import RuleRecord
+from tzplus.extract_tzdb import Tzdb
+from tzplus.extract_tzdb import ZoneEra
+from tzplus.extract_tzdb import ZoneRecord
+from tzplus.extract_tzdb import load_tzdb
+from tzplus.extract_tzdb import parse_day
+from tzplus.extract_tzdb import parse_month
+from tzplus.extract_tzdb import parse_seconds
+from tzplus.extract_tzdb import rule_years
+from tzplus.extract_tzdb import time_suffix
+from tzplus.extract_tzdb import until_fields
+from tzplus.verify_data import link_resolver
+
+TRANSITIONS_MAGIC = b'TZPT'
+TRANSITIONS_VERSION = 1
+HEADER_FORMAT = '<4sHHHIIIII'
+HEADER_SIZE = struct.calcsize(HEADER_FORMAT)
+
+# Time of the first transition of every zone, before any real transition.
+MIN_TIME = -(1 << 59)
+
+EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+
+
+class LocalTime(NamedTuple):
+    offset: int  # seconds, UTC offset including DST
+    is_dst: bool
+    abbreviation: str
+
+
+class Transition(NamedTuple):
+    time: int  # epoch seconds
+    offset: int
+    is_dst: bool
+    abbreviation: str
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description='Compile TZDB transitions, and look up local times.')
+    parser.add_argument(
+        '--start_year', help='First year (default: 1970)', type=int,
+        default=1970)
+    parser.add_argument(
+        '--until_year', help='Year after the last (default: 2050)', type=int,
+        default=2050)
+    parser.add_argument('--output', help='Compiled transitions file')
+    parser.add_argument(
+        '--lookup', nargs=2, metavar=('TIMEZONE', 'EPOCH_SECONDS'),
+        help='Print the local time of a UTC instant')
+    parser.add_argument('tzdb', help='Directory of raw TZDB files')
+    args = parser.parse_args()
+
+    tzdb = load_tzdb(args.tzdb)
+    tables = compile_tables(tzdb, args.start_year, args.until_year)
+    if args.output:
+        data = tables.serialize()
+        with open(args.output, 'wb') as f:
+            f.write(data)
+        print(
+            f"{args.output}: {len(data)} bytes, "
+            f"{len(tables.zone_starts) - 1} zones, "
+            f"{len(tables.times)} transitions, "
+            f"{len(tables.offsets)} types")
+    if args.lookup:
+        timezone, epoch_seconds = args.lookup
+        local = tables.lookup(timezone, int(epoch_seconds))
+        print(
+            f"{timezone} {epoch_seconds}: offset={local.offset} "
+            f"is_dst={int(local.is_dst)} abbreviation={local.abbreviation}")
+
+# -----------------------------------------------------------------------------
+
+
+class TransitionTables:
+    """The compiled transitions of all zones, in flat arrays. The
+    transitions of zone 'i' are at indexes zone_starts[i] to
+    zone_starts[i + 1] of 'times' and 'types'. Each type is an index into
+    the 'offsets', 'dst_flags' and 'abbreviation_indexes' arrays.
+    """
+
+    def __init__(
+        self,
+        start_year: int,
+        until_year: int,
+        names: Dict[str, int],
+        zone_starts: 'array[int]',
+        times: 'array[int]',
+        types: 'array[int]',
+        offsets: 'array[int]',
+        dst_flags: 'array[int]',
+        abbreviation_indexes: 'array[int]',
+        abbreviations: List[str],
+    ) -> None:
+        self.start_year = start_year
+        self.until_year = until_year
+        self.names = names  # timezone -> zone index
+        self.zone_starts = zone_starts
+        self.times = times
+        self.types = types
+        self.offsets = offsets
+        self.dst_flags = dst_flags
+        self.abbreviation_indexes = abbreviation_indexes
+        self.abbreviations = abbreviations
+
+    def lookup(self, timezone: str, utc: int) -> LocalTime:
+        """Return the local offset and abbreviation of 'timezone' at the
+        epoch seconds 'utc'.
+        """
+        zone = self.names.get(timezone)
+        if zone is None:
+            raise KeyError(timezone)
+        start = self.zone_starts[zone]
+        end = self.zone_starts[zone + 1]
+        i = bisect_right(self.times, utc, start, end) - 1
+        type_index = self.types[max(i, start)]
+        return LocalTime(
+            self.offsets[type_index],
+            bool(self.dst_flags[type_index]),
+            self.abbreviations[self.abbreviation_indexes[type_index]])
+
+    def utc_to_local(self, timezone: str, utc: int) -> int:
+        """Return the local epoch seconds of 'utc' in 'timezone'."""
+        return utc + self.lookup(timezone, utc).offset
+
+    def transitions(self, timezone: str) -> List[Transition]:
+        """Return the transitions of 'timezone', mostly for debugging."""
+        zone = self.names[timezone]
+        result = []
+        for i in range(self.zone_starts[zone], self.zone_starts[zone + 1]):
+            t = self.types[i]
+            result.append(Transition(
+                self.times[i], self.offsets[t], bool(self.dst_flags[t]),
+                self.abbreviations[self.abbreviation_indexes[t]]))
+        return result
+
+    def serialize(self) -> bytes:
+        names = sorted(self.names.items())
+        name_zones = array('I', [zone for _, zone in names])
+        strings = '\n'.join(
+            [name for name, _ in names] + self.abbreviations
+        ).encode('utf-8')
+        header = struct.pack(
+            HEADER_FORMAT, TRANSITIONS_MAGIC, TRANSITIONS_VERSION,
+            self.start_year, self.until_year,
+            len(self.zone_starts) - 1, len(names), len(self.times),
+            len(self.offsets), len(self.abbreviations))
+        arrays = [
+            self.zone_starts, self.times, self.types, self.offsets,
+            self.dst_flags, self.abbreviation_indexes, name_zones,
+        ]
+        return header + b''.join(
+            to_little_endian(a).tobytes() for a in arrays) + strings
+
+
+def load_tables(data: bytes) -> TransitionTables:
+    """Load the TransitionTables written by serialize()."""
+    (
+        magic, version, start_year, until_year, num_zones, num_names,
+        num_transitions, num_types, num_abbreviations,
+    ) = struct.unpack_from(HEADER_FORMAT, data)
+    if magic != TRANSITIONS_MAGIC or version != TRANSITIONS_VERSION:
+        raise ValueError('Invalid transitions magic or version')
+
+    offset = HEADER_SIZE
+
+    def read_array(typecode: str, count: int) -> 'array[int]':
+        nonlocal offset
+        a = array(typecode)
+        size = a.itemsize * count
+        a.frombytes(data[offset:offset + size])
+        offset += size
+        return to_little_endian(a)
+
+    zone_starts = read_array('I', num_zones + 1)
+    times = read_array('q', num_transitions)
+    types = read_array('H', num_transitions)
+    offsets = read_array('i', num_types)
+    dst_flags = read_array('B', num_types)
+    abbreviation_indexes = read_array('H', num_types)
+    name_zones = read_array('I', num_names)
+    strings = data[offset:].decode('utf-8').split('\n')
+    names = dict(zip(strings[:num_names], name_zones))
+    abbreviations = strings[num_names:num_names + num_abbreviations]
+    return TransitionTables(
+        start_year, until_year, names, zone_starts, times, types, offsets,
+        dst_flags, abbreviation_indexes, abbreviations)
+
+
+def to_little_endian(a: 'array[int]') -> 'array[int]':
+    """Return 'a' in little-endian byte order (byteswap is its own inverse,
+    so this also converts from little-endian to native).
+    """
+    if struct.pack('=I', 1) != struct.pack('<I', 1):
+        a = array(a.typecode, a)
+        a.byteswap()
+    return a
+
+# -----------------------------------------------------------------------------
+
+
+def compile_tables(
+    tzdb: Tzdb,
+    start_year: int,
+    until_year: int,
+) -> TransitionTables:
+    """Compile the transitions of every Zone and Link of 'tzdb' between
+    'start_year' and 'until_year'.
+    """
+    start_time = epoch_seconds(start_year, 1, 1, 0)
+    until_time = epoch_seconds(until_year, 1, 1, 0)
+
+    zone_starts = array('I', [0])
+    times = array('q')
+    types = array('H')
+    type_indexes: Dict[Tuple[int, bool, str], int] = {}
+    abbreviation_indexes: Dict[str, int] = {}
+    names: Dict[str, int] = {}
+
+    for zone_index, (name, zone) in enumerate(sorted(tzdb.zones.items())):
+        names[name] = zone_index
+        transitions = zone_transitions(tzdb, zone, until_year)
+
+        # Keep the last transition before 'start_time' as the initial type,
+        # at MIN_TIME.
+        first = max(bisect_right(
+            [t.time for t in transitions], start_time) - 1, 0)
+        for i, t in enumerate(transitions[first:]):
+            if t.time >= until_time:
+                break
+            key = (t.offset, t.is_dst, t.abbreviation)
+            type_index = type_indexes.get(key)
+            if type_index is None:
+                type_index = len(type_indexes)
+                type_indexes[key] = type_index
+                abbreviation_indexes.setdefault(
+                    t.abbreviation, len(abbreviation_indexes))
+            times.append(t.time if i > 0 else MIN_TIME)
+            types.append(type_index)
+        zone_starts.append(len(times))
+
+    # Links share the transitions of their Zone.
+    resolver = link_resolver(tzdb.links)
+    for name in tzdb.links:
+        target = resolver.resolve(name)
+        if target is None or target not in names:
+            error(f"Link '{name}' does not resolve to a Zone")
+        assert target is not None
+        names[name] = names[target]
+
+    sorted_types = sorted(type_indexes.items(), key=lambda kv: kv[1])
+    return TransitionTables(
+        start_year=start_year,
+        until_year=until_year,
+        names=names,
+        zone_starts=zone_starts,
+        times=times,
+        types=types,
+        offsets=array('i', [key[0] for key, _ in sorted_types]),
+        dst_flags=array('B', [int(key[1]) for key, _ in sorted_types]),
+        abbreviation_indexes=array('H', [
+            abbreviation_indexes[key[2]] for key, _ in sorted_types
+        ]),
+        abbreviations=list(abbreviation_indexes),
+    )
+
+
+def zone_transitions(
+    tzdb: Tzdb,
+    zone: ZoneRecord,
+    until_year: int,
+) -> List[Transition]:
+    """Return every transition of 'zone' before 'until_year', starting with
+    its first era at MIN_TIME. Consecutive transitions to the same (offset,
+    is_dst, abbreviation) are merged.
+    """
+    transitions: List[Transition] = []
+    era_start = MIN_TIME
+    # Offsets at the end of the previous era.
+    stdoff = 0
+    save = 0
+    for era in zone.eras:
+        prev_stdoff, prev_save = stdoff, save
+        stdoff = parse_seconds(era.stdoff)
+        era_end_year = (
+            until_fields(era.until)[0] if era.until else until_year)
+        era_end_year = min(era_end_year, until_year)
+
+        # Rule transitions of the era, as (time, suffix, save, letter),
+        # sorted by their local time.
+        rule_changes = era_rule_changes(tzdb, era, era_end_year)
+
+        # State at the start of the era: the latest rule change before it.
+        # If there is none, the letter of the first rule with SAVE 0. Like
+        # zic, a change at the same wall time as the UNTIL of the previous
+        # era, in the offsets of the previous era, is in effect at the start.
+        save, letter = era_initial_save(tzdb, era, rule_changes)
+        i = 0
+        while i < len(rule_changes):
+            change = rule_changes[i]
+            if (
+                to_utc(change[0], change[1], stdoff, save) > era_start
+                and to_utc(change[0], change[1], prev_stdoff, prev_save)
+                > era_start
+            ):
+                break
+            save, letter = change[2], change[3]
+            i += 1
+        add_transition(transitions, Transition(
+            era_start, stdoff + save, save != 0,
+            format_abbreviation(era.format, save, letter, stdoff + save)))
+
+        # Rule changes before the UNTIL of the era.
+        for change in rule_changes[i:]:
+            if era.until and to_utc(
+                *era_until(era), stdoff, save
+            ) <= to_utc(change[0], change[1], stdoff, save):
+                break
+            time = to_utc(change[0], change[1], stdoff, save)
+            save, letter = change[2], change[3]
+            add_transition(transitions, Transition(
+                time, stdoff + save, save != 0,
+                format_abbreviation(era.format, save, letter, stdoff + save)))
+
+        if not era.until:
+            break
+        era_start = to_utc(*era_until(era), stdoff, save)
+        if era_start >= epoch_seconds(until_year, 1, 1, 0):
+            break
+    return transitions
+
+
+RuleChange = Tuple[int, str, int, str]  # local time, suffix, save, letter
+
+
+def era_rule_changes(
+    tzdb: Tzdb,
+    era: ZoneEra,
+    end_year: int,
+) -> List[RuleChange]:
+    """Return the changes of the named Rule of 'era' until 'end_year'
+    inclusive, sorted by their local time. A fixed SAVE has no changes.
+    """
+    rules = tzdb.rules.get(era.rules)
+    if not rules:
+        return []
+    changes: List[RuleChange] = []
+    for rule in rules:
+        from_year, to_year = rule_years(rule)
+        for year in range(from_year, min(to_year, end_year) + 1):
+            changes.append(rule_change(rule, year))
+    changes.sort(key=lambda c: c[0])
+    return changes
+
+
+def rule_change(rule: RuleRecord, year: int) -> RuleChange:
+    month = parse_month(rule.in_month)
+    day = parse_day(year, month, rule.on_day)
+    return (
+        epoch_seconds(year, month, day, parse_seconds(rule.at_time)),
+        time_suffix(rule.at_time),
+        parse_seconds(rule.save),
+        '' if rule.letter == '-' else rule.letter,
+    )
+
+
+def era_initial_save(
+    tzdb: Tzdb,
+    era: ZoneEra,
+    rule_changes: List[RuleChange],
+) -> Tuple[int, str]:
+    """Return the (save, letter) of 'era' before its first rule change."""
+    if era.rules == '-':
+        return 0, ''
+    rules = tzdb.rules.get(era.rules)
+    if rules is None:
+        return parse_seconds(era.rules), ''
+    for change in rule_changes:
+        if change[2] == 0:
+            return 0, change[3]
+    return 0, ''
+
+
+def era_until(era: ZoneEra) -> Tuple[int, str]:
+    """Return the (local time, suffix) of the UNTIL of 'era'."""
+    year, month, day, time = until_fields(era.until)
+    return epoch_seconds(year, month, day, parse_seconds(time)), \
+        time_suffix(time)
+
+
+def to_utc(local: int, suffix: str, stdoff: int, save: int) -> int:
+    """Convert a wall ('w'), standard ('s') or UTC ('u') time to UTC."""
+    if suffix == 'u':
+        return local
+    if suffix == 's':
+        return local - stdoff
+    return local - stdoff - save
+
+
+def add_transition(transitions: List[Transition], t: Transition) -> None:
+    """Append 't', unless it changes nothing. A transition at the same time
+    as the previous one replaces it.
+    """
+    if transitions and transitions[-1][1:] == t[1:]:
+        return
+    if transitions and transitions[-1].time >= t.time:
+        transitions.pop()
+        if transitions and transitions[-1][1:] == t[1:]:
+            return
+    transitions.append(t)
+
+
+def format_abbreviation(
+    format: str,
+    save: int,
+    letter: str,
+    offset: int,
+) -> str:
+    """Expand the FORMAT of a Zone era: 'STD/DST', '%s' or '%z'."""
+    if '/' in format:
+        std, dst = format.split('/', 1)
+        return dst if save else std
+    if '%s' in format:
+        return format.replace('%s', letter)
+    if '%z' in format:
+        sign = '-' if offset < 0 else '+'
+        hours, minutes = divmod(abs(offset) // 60, 60)
+        z = f"{sign}{hours:02}{minutes:02}" if minutes else f"{sign}{hours:02}"
+        return format.replace('%z', z)
+    return format
+
+
+def epoch_seconds(year: int, month: int, day: int, seconds: int) -> int:
+    """Return the epoch seconds of a date and time of day. The 'day' and
+    'seconds' may overflow into the next month or day.
+    """
+    days = date(year, month, 1).toordinal() - EPOCH_ORDINAL + day - 1
+    return days * 86400 + seconds
+
+# -----------------------------------------------------------------------------
+
+
+if __name__ == '__main__':
+    main()
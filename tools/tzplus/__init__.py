@@ -0,0 +1,62 @@
+# The tzplus package: the readers, catalog, and indexes of the tools, as its
+# submodules, whose main() is run by the scripts of the same name in tools/.
+# The submodules are imported only when one of their names is first used, so
+# that 'import tzplus' costs almost nothing, and a command loads only the
+# submodules that it needs.
+#
+# Usage:
+#   import tzplus
+#   catalog = tzplus.load_cached_catalog('data')
+#   catalog.country_timezones('US')
+
+from typing import Any
+from typing import List
+
+import importlib
+
+__version__ = '2023.3.1'  # 2023c.1
+
+# Public name -> submodule which defines it.
+EXPORTS = {
+    # Readers of the data files.
+    'Entry': '.verify_data',
+    'LinkResolver': '.verify_data',
+    'read_zones': '.verify_data',
+    'read_links': '.verify_data',
+    'read_countries': '.verify_data',
+    'read_regions': '.verify_data',
+    'read_region_country_timezones': '.verify_data',
+    'read_country_timezones': '.verify_data',
+    'parse_region_country_timezones': '.data_parser',
+    'data_files': '.snapshot',
+    'load_rows': '.snapshot',
+    # Catalog and indexes.
+    'TimezoneCatalog': '.catalog',
+    'load_catalog': '.catalog',
+    'load_cached_catalog': '.cache',
+    'PrefixIndex': '.search_index',
+    'build_index': '.search_index',
+    'FuzzyIndex': '.fuzzy_index',
+    'build_fuzzy_index': '.fuzzy_index',
+    'ColumnarTable': '.columnar_export',
+    'load_columnar': '.columnar_export',
+    'SpatialIndex': '.spatial_index',
+    'read_zone_points': '.spatial_index',
+    'read_sort_orders': '.sort_orders',
+    'apply_sort_order': '.sort_orders',
+}
+
+__all__ = ['__version__'] + list(EXPORTS)
+
+
+def __getattr__(name: str) -> Any:
+    module = EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module 'tzplus' has no attribute '{name}'")
+    value = getattr(importlib.import_module(module, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> List[str]:
+    return sorted(__all__)
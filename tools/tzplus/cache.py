@@ -0,0 +1,130 @@
+# A cache of the parsed TimezoneCatalog of a data directory, pickled on first
+# use, so that later processes skip importing the readers, parsing the data
+# files, and building the indexes.
+#
+# The cache file holds two pickles: a header with the (path, mtime, size) of
+# the data files and of the modules which build the catalog (CATALOG_MODULES)
+# when the catalog was built, then the catalog. The cache is current while a
+# stat() of each file in the header matches, so a cache hit needs neither the
+# names of the data files nor the readers.
+#
+# The cache files are stored in $TZPLUS_CACHE_DIR, or in
+# $XDG_CACHE_HOME/tzplus (default: ~/.cache/tzplus), one per data directory.
+
+from typing import Any
+from typing import List
+from typing import Optional
+from typing import Tuple
+
+import importlib
+import os
+import pickle
+import zlib
+
+from .catalog import TimezoneCatalog
+from .catalog import catalog_files
+from .catalog import load_catalog
+
+CACHE_VERSION = 3
+
+FileStamps = Tuple[Tuple[str, int, int], ...]  # (path, mtime_ns, size)
+
+# Submodules whose code builds the catalog, so that a change to any of them
+# rebuilds the cached catalog.
+CATALOG_MODULES = ['catalog', 'data_parser', 'snapshot', 'verify_data']
+
+
+def default_cache_dir() -> str:
+    cache_dir = os.environ.get('TZPLUS_CACHE_DIR')
+    if cache_dir:
+        return cache_dir
+    cache_home = os.environ.get('XDG_CACHE_HOME') or os.path.join(
+        os.path.expanduser('~'), '.cache')
+    return os.path.join(cache_home, 'tzplus')
+
+
+def cache_path(data_dir: str, cache_dir: Optional[str] = None) -> str:
+    """Return the cache file of the catalog of 'data_dir'."""
+    if cache_dir is None:
+        cache_dir = default_cache_dir()
+    crc = zlib.crc32(os.path.realpath(data_dir).encode('utf-8'))
+    return os.path.join(cache_dir, f"catalog-{crc:08x}.pickle")
+
+
+def file_stamps(paths: List[str]) -> FileStamps:
+    """Return the (path, mtime, size) of each file, which change when the
+    file is rewritten.
+    """
+    stamps = []
+    for path in paths:
+        st = os.stat(path)
+        stamps.append((path, st.st_mtime_ns, st.st_size))
+    return tuple(stamps)
+
+
+def load_cached_catalog(
+    data_dir: str,
+    cache_dir: Optional[str] = None,
+) -> TimezoneCatalog:
+    """Return the catalog of 'data_dir' from its cache file if it is current.
+    Otherwise build it from the data files, and write the cache file for the
+    next call. A cache file which cannot be read or written is ignored.
+    """
+    data_dir = os.path.realpath(data_dir)
+    path = cache_path(data_dir, cache_dir)
+    cached = read_cache(path, data_dir)
+    if cached is not None:
+        return cached
+
+    paths = [os.path.realpath(p) for p in catalog_files(data_dir).values()]
+    paths.extend(source_files())
+    stamps = file_stamps(paths)
+    result = load_catalog(data_dir)
+    write_cache(path, (CACHE_VERSION, data_dir, stamps), result)
+    return result
+
+
+def source_files() -> List[str]:
+    """Return the files of CATALOG_MODULES, which load_catalog() imports."""
+    return [
+        os.path.realpath(
+            importlib.import_module(f'.{name}', __package__).__file__ or '')
+        for name in CATALOG_MODULES
+    ]
+
+
+def read_cache(path: str, data_dir: str) -> Optional[TimezoneCatalog]:
+    """Return the catalog in the cache file 'path' if it was built from the
+    current files of 'data_dir', otherwise None.
+    """
+    try:
+        with open(path, 'rb') as f:
+            header = pickle.load(f)
+            version, cached_dir, stamps = header
+            if version != CACHE_VERSION or cached_dir != data_dir:
+                return None
+            if file_stamps([p for p, _, _ in stamps]) != stamps:
+                return None
+            result = pickle.load(f)
+    except Exception:
+        # Missing, stale, corrupt, or incompatible cache file.
+        return None
+    return result if isinstance(result, TimezoneCatalog) else None
+
+
+def write_cache(path: str, header: Tuple[Any, ...], value: Any) -> None:
+    """Write the cache file atomically, so that concurrent processes read
+    either the old or the new file.
+    """
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(tmp_path, 'wb') as f:
+            pickle.dump(header, f, protocol=pickle.HIGHEST_PROTOCOL)
+            pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, path)
+    except OSError:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
@@ -0,0 +1,267 @@
+# An in-memory catalog of the regions, countries, and timezones in the data
+# files, with precomputed forward and reverse indexes. Every name is interned
+# into an integer ID, and each relationship is stored as a pair of compact
+# integer arrays (offsets and values, indexed by the ID of the key), so that a
+# lookup is a dict lookup followed by an array slice.
+#
+# Usage:
+# $ catalog.py
+#   [--snapshot {file}]
+#   data_dir
+#   name ...
+
+from typing import Dict
+from typing import Iterable
+from typing import List
+from typing import Optional
+from typing import Tuple
+
+from array import array
+import argparse
+
+# The readers of the data files (snapshot, verify_data) are imported by the
+# functions which build a catalog, so that unpickling a cached catalog
+# (tzplus/cache.py) does not import them.
+
+# Same as snapshot.Row.
+Row = Tuple[str, ...]
+
+# Tables of the data files needed by the catalog.
+CATALOG_TABLES = [
+    'classified_zones',
+    'classified_links',
+    'iso_long',
+    'iso_short',
+    'regions',
+    'country_timezones',
+]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description='Look up regions, countries and timezones.')
+    parser.add_argument(
+        '--snapshot',
+        help='Binary snapshot of the data files, used if up to date')
+    parser.add_argument('data_dir', help='Directory of data files')
+    parser.add_argument('names', nargs='+', help='Names to look up')
+    args = parser.parse_args()
+
+    catalog = load_catalog(args.data_dir, args.snapshot)
+    for name in args.names:
+        print(f"{name}:")
+        print_lookup(catalog, name)
+
+
+def print_lookup(catalog: 'TimezoneCatalog', name: str) -> None:
+    region_name = catalog.region_name(name)
+    if region_name:
+        print(f"  region: {region_name}")
+        print(f"    countries: {catalog.region_countries(name)}")
+    country_name = catalog.country_name(name)
+    if country_name:
+        print(f"  country: {country_name}")
+        print(f"    regions: {catalog.country_regions(name)}")
+        print(f"    timezones: {catalog.country_timezones(name)}")
+    canonical = catalog.canonical_zone(name)
+    if canonical:
+        print(f"  timezone: {catalog.timezone_tag(name)} -> {canonical}")
+        print(f"    countries: {catalog.timezone_countries(name)}")
+        print(f"    regions: {catalog.timezone_regions(name)}")
+
+
+def load_catalog(
+    data_dir: str,
+    snapshot_path: Optional[str] = None,
+) -> 'TimezoneCatalog':
+    """Load the catalog from the data files in 'data_dir', or from the binary
+    snapshot if it is up to date.
+    """
+    from .snapshot import load_rows
+    return TimezoneCatalog(load_rows(catalog_files(data_dir), snapshot_path))
+
+
+def catalog_files(data_dir: str) -> Dict[str, str]:
+    """Return the {table -> path} of the data files used by the catalog."""
+    from .snapshot import data_files
+    files = data_files(data_dir)
+    return {name: files[name] for name in CATALOG_TABLES}
+
+# -----------------------------------------------------------------------------
+
+
+class Index:
+    """A one-to-many relationship between interned IDs, in compressed sparse
+    row form. The values of key ID 'k' are values[offsets[k]:offsets[k+1]],
+    in the order in which they were first added.
+    """
+    __slots__ = ['offsets', 'values']
+
+    def __init__(self, num_ids: int, pairs: Iterable[Tuple[int, int]]):
+        groups: Dict[int, Dict[int, None]] = {}
+        for key, value in pairs:
+            groups.setdefault(key, {})[value] = None
+        self.offsets = array('I', [0] * (num_ids + 1))
+        self.values = array('I')
+        for k in range(num_ids):
+            group = groups.get(k)
+            if group:
+                self.values.extend(group)
+            self.offsets[k + 1] = len(self.values)
+
+    def get(self, key: int) -> 'array[int]':
+        return self.values[self.offsets[key]:self.offsets[key + 1]]
+
+
+class TimezoneCatalog:
+    """Regions, countries, and timezones, with the following indexes:
+
+    * region -> countries, and country -> regions
+    * country -> timezones, and timezone -> countries
+    * region -> timezones, and timezone -> regions
+    * timezone or link -> canonical Zone
+
+    The 'tables' are the rows of the data files, as returned by load_rows().
+    """
+    __slots__ = [
+        'names', 'ids', 'region_names', 'country_names', 'short_names',
+        'tags', 'canonical', 'region_country', 'country_region',
+        'country_timezone', 'timezone_country', 'region_timezone',
+        'timezone_region',
+    ]
+
+    def __init__(self, tables: Dict[str, Iterable[Row]]):
+        from .verify_data import Entry
+        from .verify_data import LinkResolver
+
+        self.names: List[str] = []
+        self.ids: Dict[str, int] = {}
+
+        regions = [self.intern_row(row) for row in tables['regions']]
+        iso_long = [self.intern_row(row) for row in tables['iso_long']]
+        iso_short = [self.intern_row(row) for row in tables['iso_short']]
+        zones = [self.intern_row(row) for row in tables['classified_zones']]
+        links = [self.intern_row(row) for row in tables['classified_links']]
+        triplets = [
+            self.intern_row(row) for row in tables['country_timezones']
+        ]
+        n = len(self.names)
+
+        # Name lookups, indexed by the ID of the code, -1 if none.
+        self.region_names = self.mapping(n, regions, 1)
+        self.country_names = self.mapping(n, iso_long, 1)
+        self.short_names = self.mapping(n, iso_short, 1)
+
+        # Zone and Link tags, and the canonical Zone of each timezone.
+        self.tags = self.mapping(n, zones + links, -1)
+        link_entries = {
+            self.names[link]: Entry(self.names[target], self.names[tag])
+            for link, target, tag in links
+        }
+        self.canonical = array('i', [-1] * n)
+        for zone, _ in zones:
+            self.canonical[zone] = zone
+        for link, target in LinkResolver(link_entries).resolve_all().items():
+            self.canonical[self.ids[link]] = self.ids[target]
+
+        # Relationships among (region, country, timezone).
+        self.region_country = Index(n, ((r, c) for r, c, z in triplets))
+        self.country_region = Index(n, ((c, r) for r, c, z in triplets))
+        self.country_timezone = Index(n, ((c, z) for r, c, z in triplets))
+        self.timezone_country = Index(n, ((z, c) for r, c, z in triplets))
+        self.region_timezone = Index(n, ((r, z) for r, c, z in triplets))
+        self.timezone_region = Index(n, ((z, r) for r, c, z in triplets))
+
+    def intern_row(self, row: Row) -> Tuple[int, ...]:
+        return tuple(self.intern(s) for s in row)
+
+    def intern(self, s: str) -> int:
+        i = self.ids.get(s)
+        if i is None:
+            i = len(self.names)
+            self.names.append(s)
+            self.ids[s] = i
+        return i
+
+    @staticmethod
+    def mapping(
+        n: int,
+        rows: List[Tuple[int, ...]],
+        column: int,
+    ) -> 'array[int]':
+        """Map the ID of rows[0] to the ID in rows[column], -1 if none."""
+        ids = array('i', [-1] * n)
+        for row in rows:
+            ids[row[0]] = row[column]
+        return ids
+
+    # -------------------------------------------------------------------------
+
+    def lookup(self, index: Index, name: str) -> List[str]:
+        i = self.ids.get(name)
+        if i is None:
+            return []
+        names = self.names
+        return [names[v] for v in index.get(i)]
+
+    def name_of(self, ids: 'array[int]', name: str) -> Optional[str]:
+        i = self.ids.get(name)
+        if i is None or ids[i] < 0:
+            return None
+        return self.names[ids[i]]
+
+    def region_name(self, region: str) -> Optional[str]:
+        return self.name_of(self.region_names, region)
+
+    def country_name(self, country: str) -> Optional[str]:
+        """Return the long name of the ISO country."""
+        return self.name_of(self.country_names, country)
+
+    def country_short_name(self, country: str) -> Optional[str]:
+        return self.name_of(self.short_names, country)
+
+    def timezone_tag(self, name: str) -> Optional[str]:
+        """Return the classification ('Zone', 'Similar', etc.) of the
+        timezone.
+        """
+        return self.name_of(self.tags, name)
+
+    def canonical_zone(self, name: str) -> Optional[str]:
+        """Return the Zone which defines the timezone 'name', following the
+        chain of links if necessary. Return None if 'name' is unknown.
+        """
+        return self.name_of(self.canonical, name)
+
+    def region_countries(self, region: str) -> List[str]:
+        return self.lookup(self.region_country, region)
+
+    def country_regions(self, country: str) -> List[str]:
+        return self.lookup(self.country_region, country)
+
+    def country_timezones(self, country: str) -> List[str]:
+        return self.lookup(self.country_timezone, country)
+
+    def timezone_countries(self, timezone: str) -> List[str]:
+        return self.lookup(self.timezone_country, timezone)
+
+    def region_timezones(self, region: str) -> List[str]:
+        return self.lookup(self.region_timezone, region)
+
+    def timezone_regions(self, timezone: str) -> List[str]:
+        return self.lookup(self.timezone_region, timezone)
+
+    def poly_timezones(self) -> Dict[str, List[str]]:
+        """Return the timezones that belong to multiple countries."""
+        index = self.timezone_country
+        names = self.names
+        return {
+            names[z]: [names[c] for c in index.get(z)]
+            for z in range(len(names))
+            if index.offsets[z + 1] - index.offsets[z] > 1
+        }
+
+# -----------------------------------------------------------------------------
+
+
+if __name__ == '__main__':
+    main()
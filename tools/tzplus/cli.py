@@ -0,0 +1,66 @@
+# Console entry points of the tzplus package which are not the main() of a
+# tool. The tzplus-verify and tzplus-list commands are tzplus.verify_data.main()
+# and tzplus.list_zones.main() directly.
+#
+# Usage:
+# $ tzplus-lookup
+#   [--data_dir {dir}]
+#   [--cache_dir {dir}]
+#   name ...
+#
+# prints the region, country, and timezone information of each name, from the
+# catalog cached by tzplus.cache. The data directory defaults to
+# $TZPLUS_DATA_DIR, then to the data/ directory of the source tree, which is
+# found only by an editable install ('pip install -e .'). Other installs do not
+# contain the data files, and need --data_dir or $TZPLUS_DATA_DIR.
+
+from typing import Optional
+
+import argparse
+import os
+
+from .cache import load_cached_catalog
+from .catalog import print_lookup
+
+
+def default_data_dir() -> Optional[str]:
+    """Return $TZPLUS_DATA_DIR, or else the data/ directory of the source
+    tree if the package is run from it, otherwise None.
+    """
+    data_dir = os.environ.get('TZPLUS_DATA_DIR')
+    if data_dir:
+        return data_dir
+    tools_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    data_dir = os.path.join(os.path.dirname(tools_dir), 'data')
+    return data_dir if os.path.isdir(data_dir) else None
+
+
+def lookup() -> None:
+    parser = argparse.ArgumentParser(
+        description='Look up regions, countries and timezones.')
+    parser.add_argument(
+        '--data_dir',
+        help='Directory of data files (default: $TZPLUS_DATA_DIR)')
+    parser.add_argument(
+        '--cache_dir',
+        help='Directory of the catalog cache (default: $TZPLUS_CACHE_DIR)')
+    parser.add_argument('names', nargs='+', help='Names to look up')
+    args = parser.parse_args()
+
+    data_dir = args.data_dir or default_data_dir()
+    if data_dir is None:
+        parser.error(
+            "no data directory: the installed package does not contain the "
+            "data files, use --data_dir or $TZPLUS_DATA_DIR, or install the "
+            "source tree with 'pip install -e .'")
+    if not os.path.isdir(data_dir):
+        parser.error(f"data directory '{data_dir}' not found, use --data_dir")
+
+    catalog = load_cached_catalog(data_dir, args.cache_dir)
+    for name in args.names:
+        print(f"{name}:")
+        print_lookup(catalog, name)
+
+
+if __name__ == '__main__':
+    lookup()
@@ -0,0 +1,376 @@
+# Export the catalog joined into one row per (region, country, timezone) of
+# country_timezones.txt, as dictionary-encoded columns for analytics engines:
+#
+#   region, region_name, country, country_short_name, country_long_name,
+#   timezone, tag, target
+#
+# where 'tag' is the classification of the timezone (Zone, Similar, ...) and
+# 'target' is its canonical Zone. Each column is stored as a sorted dictionary
+# of its distinct strings and an array of integer codes into the dictionary,
+# so that a join or a group-by runs on the codes.
+#
+# The formats are Arrow IPC and Parquet, if pyarrow is installed, and a plain
+# binary format otherwise:
+#
+#   header: magic 'TZPC', version u16, num_columns u16, num_rows u32
+#   directory: num_columns * (name 32s, dictionary offset u32,
+#       dictionary size u32, codes offset u32, code size u8, 3 pad bytes)
+#   dictionary: (size + 1) * string offset u32, then the UTF-8 strings
+#   codes: num_rows * u16 or u32
+#
+# All integers are little-endian, and every section starts on a 4-byte
+# boundary. load_columnar() maps an Arrow IPC or binary file into memory, and
+# the codes are read directly from the mapped buffer.
+#
+# Usage:
+# $ columnar_export.py
+#   [--format {auto,arrow,parquet,binary}]
+#   [--snapshot {file}]
+#   data_dir output
+#
+# The 'auto' format (default) is 'arrow' if pyarrow is installed, otherwise
+# 'binary'.
+
+from typing import Any
+from typing import Callable
+from typing import Dict
+from typing import Iterable
+from typing import List
+from typing import NamedTuple
+from typing import Optional
+from typing import Tuple
+from typing import Union
+
+from array import array
+import argparse
+import importlib
+import mmap
+import struct
+import sys
+
+from .catalog import catalog_files
+from .catalog import load_catalog
+from .errors import error
+from .snapshot import load_rows
+
+# pyarrow is optional.
+try:
+    pa: Any = importlib.import_module('pyarrow')
+except ImportError:
+    pa = None
+
+COLUMNS = [
+    'region',
+    'region_name',
+    'country',
+    'country_short_name',
+    'country_long_name',
+    'timezone',
+    'tag',
+    'target',
+]
+
+BINARY_MAGIC = b'TZPC'
+BINARY_VERSION = 1
+HEADER_FORMAT = '<4sHHI'
+HEADER_SIZE = struct.calcsize(HEADER_FORMAT)
+DIRECTORY_FORMAT = '<32sIIIB3x'
+DIRECTORY_SIZE = struct.calcsize(DIRECTORY_FORMAT)
+
+ARROW_MAGIC = b'ARROW1'
+PARQUET_MAGIC = b'PAR1'
+
+Columns = Dict[str, List[str]]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description='Export the joined catalog as dictionary-encoded columns.')
+    parser.add_argument(
+        '--format',
+        help='Output format (default: auto)',
+        choices=['auto', 'arrow', 'parquet', 'binary'],
+        default='auto')
+    parser.add_argument(
+        '--snapshot',
+        help='Binary snapshot of the data files, used if up to date')
+    parser.add_argument('data_dir', help='Directory of data files')
+    parser.add_argument('output', help='Output file')
+    args = parser.parse_args()
+
+    fmt = args.format
+    if fmt == 'auto':
+        fmt = 'arrow' if pa is not None else 'binary'
+    if fmt != 'binary' and pa is None:
+        error(f"Format '{fmt}' requires pyarrow")
+
+    columns = catalog_columns(args.data_dir, args.snapshot)
+    if fmt == 'binary':
+        data = encode_binary(columns)
+        with open(args.output, 'wb') as f:
+            f.write(data)
+    else:
+        write_arrow(args.output, columns, parquet=(fmt == 'parquet'))
+    num_rows = len(columns[COLUMNS[0]])
+    print(f"{args.output}: {fmt}, {num_rows} rows")
+
+
+def catalog_columns(
+    data_dir: str,
+    snapshot_path: Optional[str] = None,
+) -> Columns:
+    """Return the joined catalog of 'data_dir' as {column -> values}, in the
+    order of country_timezones.txt.
+    """
+    catalog = load_catalog(data_dir, snapshot_path)
+    files = catalog_files(data_dir)
+    rows = load_rows(
+        {'country_timezones': files['country_timezones']},
+        snapshot_path)['country_timezones']
+
+    columns: Columns = {name: [] for name in COLUMNS}
+    for region, country, timezone in rows:
+        columns['region'].append(region)
+        columns['region_name'].append(catalog.region_name(region) or '')
+        columns['country'].append(country)
+        columns['country_short_name'].append(
+            catalog.country_short_name(country) or '')
+        columns['country_long_name'].append(
+            catalog.country_name(country) or '')
+        columns['timezone'].append(timezone)
+        columns['tag'].append(catalog.timezone_tag(timezone) or '')
+        columns['target'].append(catalog.canonical_zone(timezone) or '')
+    return columns
+
+
+def dictionary_encode(values: List[str]) -> Tuple[List[str], 'array[int]']:
+    """Return the sorted distinct 'values', and the code of each value in
+    it. The codes are unsigned 16-bit integers if they fit, else 32-bit.
+    """
+    dictionary = sorted(set(values))
+    ids = {s: i for i, s in enumerate(dictionary)}
+    typecode = 'H' if len(dictionary) <= 0x10000 else 'I'
+    return dictionary, array(typecode, [ids[v] for v in values])
+
+# -----------------------------------------------------------------------------
+
+
+def pad4(data: bytes) -> bytes:
+    return data + b'\0' * (-len(data) % 4)
+
+
+def encode_binary(columns: Columns) -> bytes:
+    """Serialize the columns into the binary format described above."""
+    num_rows = len(columns[COLUMNS[0]]) if columns else 0
+    directory: List[bytes] = []
+    sections: List[bytes] = []
+    offset = HEADER_SIZE + DIRECTORY_SIZE * len(columns)
+    for name, values in columns.items():
+        dictionary, codes = dictionary_encode(values)
+        encoded = [s.encode('utf-8') for s in dictionary]
+        offsets = [0]
+        for b in encoded:
+            offsets.append(offsets[-1] + len(b))
+        dictionary_data = pad4(
+            struct.pack(f'<{len(offsets)}I', *offsets) + b''.join(encoded))
+        if sys.byteorder != 'little':
+            codes.byteswap()
+        codes_data = pad4(codes.tobytes())
+
+        directory.append(struct.pack(
+            DIRECTORY_FORMAT, name.encode('utf-8'), offset, len(dictionary),
+            offset + len(dictionary_data), codes.itemsize))
+        sections.append(dictionary_data)
+        sections.append(codes_data)
+        offset += len(dictionary_data) + len(codes_data)
+
+    header = struct.pack(
+        HEADER_FORMAT, BINARY_MAGIC, BINARY_VERSION, len(columns), num_rows)
+    return header + b''.join(directory) + b''.join(sections)
+
+
+def write_arrow(path: str, columns: Columns, parquet: bool = False) -> None:
+    """Write the columns as an Arrow IPC file, or a Parquet file, with a
+    DictionaryArray per column.
+    """
+    arrays = []
+    for values in columns.values():
+        dictionary, codes = dictionary_encode(values)
+        index_type = pa.int16() if len(dictionary) <= 0x8000 else pa.int32()
+        arrays.append(pa.DictionaryArray.from_arrays(
+            pa.array(codes.tolist(), type=index_type),
+            pa.array(dictionary, type=pa.string())))
+    table = pa.Table.from_arrays(arrays, names=list(columns))
+    if parquet:
+        importlib.import_module('pyarrow.parquet').write_table(table, path)
+        return
+    with pa.OSFile(path, 'wb') as sink:
+        with pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+
+# -----------------------------------------------------------------------------
+
+
+class ColumnInfo(NamedTuple):
+    codes: memoryview  # integer code of each row
+    dictionary: Callable[[], List[str]]  # decodes the dictionary
+
+
+class ColumnarTable:
+    """A dictionary-encoded table loaded by load_columnar(). The codes of
+    each column are a view of the loaded buffer, and the dictionaries are
+    decoded on first use.
+    """
+
+    def __init__(self, num_rows: int, columns: Dict[str, ColumnInfo]):
+        self.num_rows = num_rows
+        self.columns = columns
+        self.dictionaries: Dict[str, List[str]] = {}
+        self.code_maps: Dict[str, Dict[str, int]] = {}
+
+    @property
+    def column_names(self) -> List[str]:
+        return list(self.columns)
+
+    def codes(self, name: str) -> memoryview:
+        """Return the integer code of each row in column 'name'."""
+        return self.columns[name].codes
+
+    def dictionary(self, name: str) -> List[str]:
+        """Return the sorted distinct strings of column 'name', indexed by
+        code.
+        """
+        dictionary = self.dictionaries.get(name)
+        if dictionary is None:
+            dictionary = self.columns[name].dictionary()
+            self.dictionaries[name] = dictionary
+        return dictionary
+
+    def column(self, name: str) -> List[str]:
+        """Return the decoded strings of column 'name'."""
+        dictionary = self.dictionary(name)
+        return [dictionary[code] for code in self.codes(name)]
+
+    def row(self, i: int) -> Dict[str, str]:
+        return {
+            name: self.dictionary(name)[self.codes(name)[i]]
+            for name in self.columns
+        }
+
+    def encode(self, name: str, values: Iterable[str]) -> 'array[int]':
+        """Return the code in column 'name' of each of 'values', or -1 if it
+        does not occur in the column.
+        """
+        code_map = self.code_maps.get(name)
+        if code_map is None:
+            code_map = {s: i for i, s in enumerate(self.dictionary(name))}
+            self.code_maps[name] = code_map
+        return array('i', [code_map.get(v, -1) for v in values])
+
+    def first_rows(self, name: str) -> 'array[int]':
+        """Return the first row of each code of column 'name', indexed by
+        code, or -1 if no row has the code.
+        """
+        rows = array('i', [-1] * len(self.dictionary(name)))
+        for i, code in enumerate(self.codes(name)):
+            if rows[code] < 0:
+                rows[code] = i
+        return rows
+
+    def join(self, name: str, values: Iterable[str]) -> 'array[int]':
+        """Return the first row whose column 'name' equals each of 'values',
+        or -1 if none. The values are encoded once, and then joined on their
+        integer codes.
+        """
+        rows = self.first_rows(name)
+        return array(
+            'i', [rows[code] if code >= 0 else -1
+                  for code in self.encode(name, values)])
+
+
+def load_columnar(path: str) -> ColumnarTable:
+    """Load a file written by this script. The binary and Arrow IPC formats
+    are mapped into memory. Raise ValueError if the format is unknown.
+    """
+    with open(path, 'rb') as f:
+        magic = f.read(len(ARROW_MAGIC))
+    if magic.startswith(BINARY_MAGIC):
+        with open(path, 'rb') as f:
+            buf = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        return decode_binary(buf)
+    if magic.startswith(ARROW_MAGIC) or magic.startswith(PARQUET_MAGIC):
+        if pa is None:
+            raise ValueError(f"Reading '{path}' requires pyarrow")
+        if magic.startswith(PARQUET_MAGIC):
+            parquet = importlib.import_module('pyarrow.parquet')
+            return arrow_table(parquet.read_table(path, memory_map=True))
+        source = pa.memory_map(path, 'r')
+        return arrow_table(pa.ipc.open_file(source).read_all())
+    raise ValueError(f"Unknown columnar format of '{path}'")
+
+
+def decode_binary(buf: Union[bytes, mmap.mmap]) -> ColumnarTable:
+    """Return the table of the binary format in 'buf', without copying the
+    codes.
+    """
+    if sys.byteorder != 'little':
+        raise ValueError('The binary columnar format requires little-endian')
+    magic, version, num_columns, num_rows = struct.unpack_from(
+        HEADER_FORMAT, buf)
+    if magic != BINARY_MAGIC or version != BINARY_VERSION:
+        raise ValueError('Invalid columnar magic or version')
+
+    view = memoryview(buf)
+    columns: Dict[str, ColumnInfo] = {}
+    for i in range(num_columns):
+        name, dict_offset, dict_size, codes_offset, code_size = \
+            struct.unpack_from(
+                DIRECTORY_FORMAT, buf, HEADER_SIZE + i * DIRECTORY_SIZE)
+        data = view[codes_offset:codes_offset + code_size * num_rows]
+        codes = data.cast('H') if code_size == 2 else data.cast('I')
+        columns[name.rstrip(b'\0').decode('utf-8')] = ColumnInfo(
+            codes, binary_dictionary(view, dict_offset, dict_size))
+    return ColumnarTable(num_rows, columns)
+
+
+def binary_dictionary(
+    view: memoryview,
+    offset: int,
+    size: int,
+) -> Callable[[], List[str]]:
+    """Return a function which decodes the dictionary at 'offset'."""
+    def decode() -> List[str]:
+        offsets = view[offset:offset + 4 * (size + 1)].cast('I')
+        blob = view[offset + 4 * (size + 1):]
+        return [
+            str(blob[offsets[i]:offsets[i + 1]], 'utf-8')
+            for i in range(size)
+        ]
+    return decode
+
+
+def arrow_table(table: Any) -> ColumnarTable:
+    """Return the ColumnarTable of a pyarrow.Table of DictionaryArrays,
+    viewing the index buffers of the Arrow arrays.
+    """
+    columns: Dict[str, ColumnInfo] = {}
+    for name in table.column_names:
+        chunks = table.column(name)
+        if chunks.num_chunks == 1:
+            column = chunks.chunk(0)
+        else:
+            column = chunks.combine_chunks()
+        indices = column.indices
+        size = indices.type.bit_width // 8
+        start = indices.offset * size
+        data = memoryview(indices.buffers()[1])[
+            start:start + size * len(indices)]
+        codes = data.cast('h') if size == 2 else data.cast('i')
+        columns[name] = ColumnInfo(codes, column.dictionary.to_pylist)
+    return ColumnarTable(table.num_rows, columns)
+
+# -----------------------------------------------------------------------------
+
+
+if __name__ == '__main__':
+    main()
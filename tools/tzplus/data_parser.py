@@ -0,0 +1,135 @@
+# Streaming parser of the whitespace-separated data/*.txt formats, shared by
+# verify_data.py, snapshot.py, list_zones.py and verify_releases.py. Each file
+# is read in large blocks instead of one readline() per line, and the comments
+# and trailing whitespace are stripped from the whole block at once, so that
+# memory is bounded by the block size instead of the file size.
+#
+# The parser checks only the syntax. The readers of verify_data.py check the
+# tags, and build their dicts directly from the lines of each block of
+# iter_file_blocks(), because a NamedTuple per line, yielded through nested
+# generators, costs more than the parsing itself. Only the lines of
+# country_timezones.txt and iso3166.tab, which are read by several tools, are
+# parsed into NamedTuples here.
+#
+# Usage:
+# $ data_parser.py {file}...
+#
+# prints the number of non-comment lines of each file, and the time taken.
+
+from typing import Iterator
+from typing import List
+from typing import NamedTuple
+from typing import TextIO
+
+import argparse
+import time
+
+# Number of characters read from the file at a time.
+BLOCK_SIZE = 1 << 20
+
+
+class NameRow(NamedTuple):
+    """Line of iso3166*.txt or iso3166.tab."""
+    code: str
+    name: str
+
+
+class RegionCountryTimezoneRow(NamedTuple):
+    """Line of country_timezones.txt."""
+    region: str
+    country: str
+    timezone: str
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description='Count the lines of data files.')
+    parser.add_argument('files', nargs='+', help='Data files')
+    args = parser.parse_args()
+
+    for filename in args.files:
+        start = time.perf_counter()
+        with open(filename, 'r', encoding='utf-8') as f:
+            count = sum(1 for _ in iter_lines(f))
+        elapsed = time.perf_counter() - start
+        print(f"{filename}: {count} lines, {elapsed * 1000:.3f} ms")
+
+# -----------------------------------------------------------------------------
+
+
+def iter_lines(input: TextIO) -> Iterator[str]:
+    """Yield the non-comment lines of 'input', with the same rules as
+    verify_data.read_line():
+
+    * Comments begin with a '#' character and are removed.
+    * Trailing whitespaces are stripped.
+    * Blank lines are skipped.
+    * Leading whitespaces are kept.
+    """
+    for lines in iter_blocks(input):
+        yield from lines
+
+
+def iter_blocks(input: TextIO) -> Iterator[List[str]]:
+    """Yield the non-comment lines of 'input' as lists, one per block of
+    BLOCK_SIZE characters, with the rules of iter_lines().
+    """
+    carry = ''
+    while True:
+        block = input.read(BLOCK_SIZE)
+        if not block:
+            break
+        lines = (carry + block).split('\n')
+        carry = lines.pop()  # incomplete last line
+        yield strip_lines(lines)
+    yield strip_lines([carry])
+
+
+def strip_lines(lines: List[str]) -> List[str]:
+    """Remove the comments, trailing whitespaces and blank lines of a block of
+    'lines'.
+    """
+    stripped = [
+        line.partition('#')[0].rstrip() if '#' in line else line.rstrip()
+        for line in lines
+    ]
+    return [line for line in stripped if line]
+
+
+def iter_file_lines(filename: str) -> Iterator[str]:
+    with open(filename, 'r', encoding='utf-8') as f:
+        yield from iter_lines(f)
+
+
+def iter_file_blocks(filename: str) -> Iterator[List[str]]:
+    with open(filename, 'r', encoding='utf-8') as f:
+        yield from iter_blocks(f)
+
+# -----------------------------------------------------------------------------
+
+
+def parse_country_lines(lines: Iterator[str]) -> Iterator[NameRow]:
+    """Parse lines of the form:
+        code country_name
+    where the code is always 2 characters.
+    """
+    for line in lines:
+        yield NameRow(line[0:2], line[2:].strip())
+
+
+def parse_region_country_timezones(
+    filename: str,
+) -> Iterator[RegionCountryTimezoneRow]:
+    """Parse lines of the form:
+        region country_code timezone
+    """
+    for lines in iter_file_blocks(filename):
+        for line in lines:
+            tokens = line.split()
+            yield RegionCountryTimezoneRow(tokens[0], tokens[1], tokens[2])
+
+# -----------------------------------------------------------------------------
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,51 @@
+# Reporting of the errors found by the tools, shared by every module so that a
+# tool which only reads its data files does not import verify_data.py.
+#
+# error() prints the message and exits. Inside collect(), which runs the
+# checks of 'verify_data.py --keep_going', it records the failure instead, so
+# that the check continues and reports all of its failures.
+
+from typing import Any
+from typing import Callable
+from typing import Iterable
+from typing import List
+from typing import Optional
+from typing import Tuple
+
+import sys
+
+# The (message, items) passed to error() while a check runs inside collect(),
+# instead of exiting. None outside of collect().
+_collected: Optional[List[Tuple[str, List[str]]]] = None
+
+
+def collect(
+    checker: Callable[..., None],
+    *args: Any,
+) -> List[Tuple[str, List[str]]]:
+    """Call checker(*args), and return the (message, sorted items) of every
+    error() that it reports, instead of exiting on the first one. An
+    exception raised by the checker is returned as an error too.
+    """
+    global _collected
+    _collected = []
+    try:
+        checker(*args)
+    except Exception as e:
+        _collected.append((f"{type(e).__name__}: {e}", []))
+    finally:
+        collected, _collected = _collected, None
+    return collected
+
+
+def error(msg: str, items: Iterable[str] = []) -> None:
+    """Print the message and the sorted items, and exit. Inside collect(),
+    the failure is recorded and the check continues.
+    """
+    if _collected is not None:
+        _collected.append((msg, sorted(items)))
+        return
+    print(msg)
+    for item in sorted(items):
+        print(f'  {item}')
+    sys.exit(1)
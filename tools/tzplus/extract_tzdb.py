@@ -0,0 +1,494 @@
+# Extract the Zone, Rule and Link entries from the raw TZDB files in a single
+# pass over each file, and write the zones.txt and links.txt files. The raw
+# files are parsed in parallel, one file per worker process. This replaces the
+# older extract_zones.sh and extract_links.sh scripts, and produces
+# byte-identical output (sorted using native ASCII bytes, i.e. LC_ALL=C).
+#
+# Usage:
+# $ extract_tzdb.py
+#   [--zones {file}]
+#   [--links {file}]
+#   [--json {file}]
+#   [--jobs {n}]
+#   tzdb_dir
+
+from typing import Any
+from typing import Dict
+from typing import Iterable
+from typing import List
+from typing import NamedTuple
+from typing import Optional
+from typing import Tuple
+from typing import Union
+
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date
+import argparse
+import calendar
+import json
+import os
+
+from .errors import error
+
+
+# Raw TZDB files which contribute Zone and Link entries to zones.txt and
+# links.txt, in the order used by the original extraction scripts.
+MAIN_FILES = [
+    'africa',
+    'antarctica',
+    'asia',
+    'australasia',
+    'backward',
+    'etcetera',
+    'europe',
+    'northamerica',
+    'southamerica',
+]
+
+# Pre-1970 Zone entries which override some Links in the main files. They are
+# parsed into the structured records, but excluded from zones.txt and
+# links.txt.
+BACKZONE_FILE = 'backzone'
+
+ALL_FILES = MAIN_FILES + [BACKZONE_FILE]
+
+ZONES_HEADER = """\
+# These are the 'Zone' entries extracted from TZDB raw files
+# (https://github.com/eggert/tz), sorted by the Zone name.
+#
+# DO NOT EDIT: This file was autogenerated.
+
+"""
+
+LINKS_HEADER = """\
+# These are the 'Link' entries extracted from TZDB raw files
+# (https://github.com/eggert/tz), sorted by link name (i.e. the second
+# argument of the 'Link' tag).
+#
+# DO NOT EDIT: This file was autogenerated.
+
+"""
+
+
+class ZoneEra(NamedTuple):
+    """A single line of a Zone entry:
+        STDOFF RULES FORMAT [UNTIL]
+    The 'until' is empty for the last era of the Zone.
+    """
+    stdoff: str
+    rules: str  # '-', a fixed SAVE offset, or the name of a Rule
+    format: str
+    until: Tuple[str, ...]  # [year [month [day [time]]]]
+
+
+class ZoneRecord(NamedTuple):
+    """A 'Zone' line, followed by its continuation lines."""
+    name: str
+    eras: List[ZoneEra]
+    filename: str
+
+
+class RuleRecord(NamedTuple):
+    """A 'Rule' line:
+        Rule NAME FROM TO - IN ON AT SAVE LETTER/S
+    """
+    name: str
+    from_year: str
+    to_year: str
+    in_month: str
+    on_day: str
+    at_time: str
+    save: str
+    letter: str
+    filename: str
+
+
+class LinkRecord(NamedTuple):
+    """A 'Link' line:
+        Link TARGET LINK-NAME
+    """
+    target: str
+    name: str
+    filename: str
+
+
+Record = Union[ZoneRecord, RuleRecord, LinkRecord]
+
+
+class TzdbFile(NamedTuple):
+    """The records extracted from a single raw TZDB file."""
+    filename: str
+    zones: List[ZoneRecord]
+    rules: List[RuleRecord]
+    links: List[LinkRecord]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description='Extract Zone, Rule and Link entries from TZDB files.')
+    parser.add_argument('--zones', help='Output zones.txt file')
+    parser.add_argument('--links', help='Output links.txt file')
+    parser.add_argument(
+        '--json',
+        help='Output file of structured Zone, Rule and Link records')
+    parser.add_argument(
+        '--jobs',
+        help='Number of worker processes (default: number of CPUs)',
+        type=int,
+        default=os.cpu_count() or 1)
+    parser.add_argument('tzdb', help='Directory of raw TZDB files')
+    args = parser.parse_args()
+    if not args.zones and not args.links and not args.json:
+        error("Must provide at least one of --zones, --links, or --json")
+
+    tzdb_files = extract_tzdb(args.tzdb, ALL_FILES, args.jobs)
+    main_files = [f for f in tzdb_files if f.filename in MAIN_FILES]
+
+    if args.zones:
+        with open(args.zones, 'w', encoding='utf-8') as f:
+            write_zones(f, main_files)
+    if args.links:
+        with open(args.links, 'w', encoding='utf-8') as f:
+            write_links(f, main_files)
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(to_json(tzdb_files), f, indent=1)
+            f.write('\n')
+
+# -----------------------------------------------------------------------------
+
+
+def extract_tzdb(
+    tzdb_dir: str,
+    filenames: Iterable[str] = ALL_FILES,
+    jobs: int = 1,
+) -> List[TzdbFile]:
+    """Parse the given raw TZDB files under 'tzdb_dir', using 'jobs' worker
+    processes. The results are returned in the same order as 'filenames'.
+    """
+    paths = [os.path.join(tzdb_dir, name) for name in filenames]
+    if jobs <= 1 or len(paths) <= 1:
+        return [parse_file(path) for path in paths]
+    with ProcessPoolExecutor(max_workers=min(jobs, len(paths))) as executor:
+        return list(executor.map(parse_file, paths))
+
+
+def parse_file(path: str) -> TzdbFile:
+    """Parse a single raw TZDB file into a TzdbFile."""
+    filename = os.path.basename(path)
+    zones: List[ZoneRecord] = []
+    rules: List[RuleRecord] = []
+    links: List[LinkRecord] = []
+    with open(path, 'r', encoding='utf-8') as f:
+        for record in parse_lines(f, filename):
+            if isinstance(record, ZoneRecord):
+                zones.append(record)
+            elif isinstance(record, RuleRecord):
+                rules.append(record)
+            else:
+                links.append(record)
+    return TzdbFile(filename, zones, rules, links)
+
+
+def parse_lines(lines: Iterable[str], filename: str) -> Iterable[Record]:
+    """Yield the Zone, Rule and Link records from the lines of a raw TZDB
+    file. A ZoneRecord is yielded after its last continuation line is read.
+    """
+    zone: Optional[ZoneRecord] = None
+    for lineno, line in enumerate(lines, start=1):
+        i = line.find('#')
+        if i >= 0:
+            line = line[:i]
+        tokens = line.split()
+        if not tokens:
+            continue
+
+        # Continuation lines start with whitespace, and are valid only if
+        # the previous era of the current Zone has an UNTIL field.
+        if line[0].isspace():
+            if zone is None or not zone.eras[-1].until:
+                error(f"{filename}:{lineno}: Unexpected continuation line")
+            assert zone is not None
+            zone.eras.append(parse_era(tokens, filename, lineno))
+            continue
+
+        if zone is not None:
+            yield zone
+            zone = None
+
+        tag = tokens[0]
+        if tag == 'Zone':
+            if len(tokens) < 5:
+                error(f"{filename}:{lineno}: Invalid Zone line")
+            era = parse_era(tokens[2:], filename, lineno)
+            zone = ZoneRecord(tokens[1], [era], filename)
+            if not era.until:
+                yield zone
+                zone = None
+        elif tag == 'Rule':
+            if len(tokens) != 10:
+                error(f"{filename}:{lineno}: Invalid Rule line")
+            yield RuleRecord(
+                name=tokens[1],
+                from_year=tokens[2],
+                to_year=tokens[3],
+                in_month=tokens[5],
+                on_day=tokens[6],
+                at_time=tokens[7],
+                save=tokens[8],
+                letter=tokens[9],
+                filename=filename,
+            )
+        elif tag == 'Link':
+            if len(tokens) != 3:
+                error(f"{filename}:{lineno}: Invalid Link line")
+            yield LinkRecord(tokens[1], tokens[2], filename)
+        else:
+            error(f"{filename}:{lineno}: Unknown tag '{tag}'")
+
+    if zone is not None:
+        yield zone
+
+
+def parse_era(tokens: List[str], filename: str, lineno: int) -> ZoneEra:
+    """Parse the 'STDOFF RULES FORMAT [UNTIL]' tokens of a Zone line."""
+    if len(tokens) < 3 or len(tokens) > 7:
+        error(f"{filename}:{lineno}: Invalid Zone era")
+    return ZoneEra(tokens[0], tokens[1], tokens[2], tuple(tokens[3:]))
+
+# -----------------------------------------------------------------------------
+
+
+class Tzdb(NamedTuple):
+    """The records of several raw TZDB files, indexed by name."""
+    zones: Dict[str, ZoneRecord]
+    rules: Dict[str, List[RuleRecord]]  # in file order
+    links: Dict[str, str]  # link name -> target
+
+
+def load_tzdb(
+    tzdb_dir: str,
+    filenames: Iterable[str] = MAIN_FILES,
+    jobs: int = 1,
+) -> Tzdb:
+    """Parse and index the given raw TZDB files. If a name is both a Zone and
+    a Link, the one in the later file wins, so that 'backzone' placed last
+    replaces the Links of 'backward' with its pre-1970 Zones.
+    """
+    zones: Dict[str, ZoneRecord] = {}
+    rules: Dict[str, List[RuleRecord]] = {}
+    links: Dict[str, str] = {}
+    for f in extract_tzdb(tzdb_dir, filenames, jobs):
+        for zone in f.zones:
+            zones[zone.name] = zone
+            links.pop(zone.name, None)
+        for rule in f.rules:
+            rules.setdefault(rule.name, []).append(rule)
+        for link in f.links:
+            links[link.name] = link.target
+            zones.pop(link.name, None)
+    return Tzdb(zones, rules, links)
+
+
+def read_version(tzdb_dir: str) -> str:
+    """Return the TZDB version (e.g. '2023c') of version.txt of 'tzdb_dir'."""
+    with open(os.path.join(tzdb_dir, 'version.txt'), encoding='utf-8') as f:
+        return f.read().strip()
+
+
+# Largest year, used for the 'max' of a Rule.
+MAX_YEAR = 9999
+
+MONTHS = [
+    'Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun',
+    'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec',
+]
+
+WEEKDAYS = ['Mon', 'Tue', 'Wed', 'Thu', 'Fri', 'Sat', 'Sun']
+
+
+def parse_seconds(field: str) -> int:
+    """Parse an offset or time of day such as '-3:30', '2:00s', '25' or '-'
+    into seconds. The suffix of a time of day is ignored (see time_suffix()).
+    """
+    field = field.rstrip('wsugz')
+    if field in ['-', '']:
+        return 0
+    sign = 1
+    if field[0] == '-':
+        sign = -1
+        field = field[1:]
+    seconds = 0
+    for part, unit in zip(field.split(':'), [3600, 60, 1]):
+        seconds += int(part.split('.')[0] or 0) * unit
+    return sign * seconds
+
+
+def time_suffix(field: str) -> str:
+    """Return 'w' (wall), 's' (standard) or 'u' (UTC) for a time of day."""
+    if field and field[-1] in 'ugz':
+        return 'u'
+    if field and field[-1] == 's':
+        return 's'
+    return 'w'
+
+
+def parse_month(field: str) -> int:
+    """Parse a month name, or its unambiguous prefix, into 1-12."""
+    for i, month in enumerate(MONTHS):
+        if month.lower().startswith(field.lower()):
+            return i + 1
+    error(f"Invalid month '{field}'")
+    return 0
+
+
+def parse_day(year: int, month: int, field: str) -> int:
+    """Parse the ON field ('5', 'lastSun', 'Sun>=8', 'Sun<=25') into a day of
+    'month'. The result may be < 1 or beyond the end of the month, when the
+    rule crosses into the previous or next month.
+    """
+    if field.isdigit():
+        return int(field)
+    if field.startswith('last'):
+        weekday = parse_weekday(field[4:])
+        last = calendar.monthrange(year, month)[1]
+        return last - (date(year, month, last).weekday() - weekday) % 7
+    for op in ['>=', '<=']:
+        if op in field:
+            name, day_field = field.split(op)
+            weekday = parse_weekday(name)
+            day = int(day_field)
+            first = date(year, month, 1).weekday()
+            current = (first + day - 1) % 7  # weekday of 'day'
+            if op == '>=':
+                return day + (weekday - current) % 7
+            return day - (current - weekday) % 7
+    error(f"Invalid day '{field}'")
+    return 0
+
+
+def parse_weekday(field: str) -> int:
+    """Parse a weekday name, or its unambiguous prefix, into 0 (Mon) - 6."""
+    for i, weekday in enumerate(WEEKDAYS):
+        if weekday.lower().startswith(field.lower()):
+            return i
+    error(f"Invalid weekday '{field}'")
+    return 0
+
+
+def rule_years(rule: RuleRecord) -> Tuple[int, int]:
+    """Return the (from, to) years of 'rule', with 'max' as MAX_YEAR."""
+    from_year = int(rule.from_year)
+    if 'only'.startswith(rule.to_year):
+        return from_year, from_year
+    if rule.to_year.startswith('ma'):
+        return from_year, MAX_YEAR
+    return from_year, int(rule.to_year)
+
+
+def until_fields(until: Tuple[str, ...]) -> Tuple[int, int, int, str]:
+    """Return the (year, month, day, time) of the UNTIL of a ZoneEra, with
+    the defaults of tzdb for the missing fields. The 'day' may be outside
+    the month, as for parse_day().
+    """
+    year = int(until[0])
+    month = parse_month(until[1]) if len(until) > 1 else 1
+    day = parse_day(year, month, until[2]) if len(until) > 2 else 1
+    time = until[3] if len(until) > 3 else '0'
+    return year, month, day, time
+
+# -----------------------------------------------------------------------------
+
+
+class ZoneTabRecord(NamedTuple):
+    """A line of zone.tab or zone1970.tab:
+        codes coordinates TZ [comments]
+    The codes are a single country code in zone.tab, and a comma-separated
+    list of country codes in zone1970.tab.
+    """
+    codes: List[str]
+    coordinates: str  # ISO 6709, e.g. '+4230+00131'
+    timezone: str
+    comment: str
+
+
+def parse_coordinates(coordinates: str) -> Tuple[float, float]:
+    """Return the (latitude, longitude) in degrees of the ISO 6709
+    coordinates of zone.tab, of the form +-DDMM+-DDDMM or +-DDMMSS+-DDDMMSS.
+    """
+    i = max(coordinates.rfind('+'), coordinates.rfind('-'))
+    return (
+        parse_dms(coordinates[:i], 2),
+        parse_dms(coordinates[i:], 3),
+    )
+
+
+def parse_dms(field: str, degree_digits: int) -> float:
+    sign = -1 if field[0] == '-' else 1
+    digits = field[1:]
+    degrees = int(digits[:degree_digits])
+    minutes = int(digits[degree_digits:degree_digits + 2])
+    seconds = int(digits[degree_digits + 2:] or '0')
+    return sign * (degrees + minutes / 60 + seconds / 3600)
+
+
+def read_zone_tab(filename: str) -> List[ZoneTabRecord]:
+    """Read the tab-separated zone.tab or zone1970.tab file."""
+    with open(filename, 'r', encoding='utf-8') as f:
+        return parse_zone_tab(f)
+
+
+def parse_zone_tab(lines: Iterable[str]) -> List[ZoneTabRecord]:
+    records: List[ZoneTabRecord] = []
+    for line in lines:
+        if line.startswith('#') or not line.strip():
+            continue
+        fields = line.rstrip('\n').split('\t')
+        records.append(ZoneTabRecord(
+            codes=fields[0].split(','),
+            coordinates=fields[1],
+            timezone=fields[2],
+            comment=fields[3] if len(fields) > 3 else '',
+        ))
+    return records
+
+# -----------------------------------------------------------------------------
+
+
+def write_zones(output: Any, tzdb_files: Iterable[TzdbFile]) -> None:
+    """Write the zones.txt file, sorted by zone name."""
+    names = [z.name for f in tzdb_files for z in f.zones]
+    output.write(ZONES_HEADER)
+    for name in sorted(names):
+        output.write(f"Zone {name}\n")
+
+
+def write_links(output: Any, tzdb_files: Iterable[TzdbFile]) -> None:
+    """Write the links.txt file, sorted by link name, then by target."""
+    links = [(k.name, k.target) for f in tzdb_files for k in f.links]
+    output.write(LINKS_HEADER)
+    for name, target in sorted(links):
+        output.write(f"Link {target} {name}\n")
+
+
+def to_json(tzdb_files: Iterable[TzdbFile]) -> Dict[str, List[Any]]:
+    """Convert the records into JSON-compatible dicts."""
+    zones: List[Any] = []
+    rules: List[Any] = []
+    links: List[Any] = []
+    for f in tzdb_files:
+        for z in f.zones:
+            zones.append({
+                'name': z.name,
+                'filename': z.filename,
+                'eras': [e._asdict() for e in z.eras],
+            })
+        rules.extend([r._asdict() for r in f.rules])
+        links.extend([k._asdict() for k in f.links])
+    return {'zones': zones, 'rules': rules, 'links': links}
+
+# -----------------------------------------------------------------------------
+
+
+if __name__ == '__main__':
+    main()
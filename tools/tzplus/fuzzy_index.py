@@ -0,0 +1,351 @@
+# A fuzzy-search index over the timezone IDs of country_timezones.txt, the
+# parts of the timezone IDs after the region (e.g. 'Buenos_Aires'), and the
+# ISO long and short country names, for misspelled free-text queries such as
+# 'Kolkatta' or 'ivory cost'. Names and queries are normalized like
+# search_index.py.
+#
+# The index is an inverted index from the trigrams of the names to the names
+# which contain them. The edit distance is computed only for the candidate
+# names which share enough trigrams with the query: each edit changes at most
+# 3 trigrams, so a name within 'k' edits of the query shares at least
+# max(trigrams of name, trigrams of query) - 3k of them. This filter has no
+# false negatives, so the results are the same as comparing every name.
+#
+# Usage:
+# $ fuzzy_index.py
+#   [--limit {n}]
+#   [--max_distance {n}]
+#   [--input {file}]
+#   [--benchmark {n}]
+#   data_dir
+#   [query ...]
+#
+# prints the ranked matches of each query, and of each line of the --input
+# file. If --benchmark is given, 'n' misspelled names are searched using the
+# index and by comparing every name, and the rates are printed.
+
+from typing import Dict
+from typing import Iterable
+from typing import List
+from typing import NamedTuple
+from typing import Optional
+
+import argparse
+import random
+import time
+
+from .search_index import KIND_COUNTRY
+from .search_index import KIND_NAMES
+from .search_index import KIND_TIMEZONE
+from .search_index import SearchEntry
+from .search_index import normalize
+from .snapshot import data_files
+from .snapshot import load_rows
+
+NGRAM = 3
+
+
+class FuzzyMatch(NamedTuple):
+    entry: SearchEntry
+    name: str  # normalized name which matched
+    distance: int  # edit distance between the query and the name
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description='Fuzzy search of timezones and countries.')
+    parser.add_argument(
+        '--limit', help='Maximum number of matches (default: 5)', type=int,
+        default=5)
+    parser.add_argument(
+        '--max_distance',
+        help='Maximum edit distance (default: a quarter of the query length)',
+        type=int)
+    parser.add_argument('--input', help='File of queries, one per line')
+    parser.add_argument(
+        '--benchmark', help='Number of misspelled names to search', type=int)
+    parser.add_argument('data_dir', help='Directory of data files')
+    parser.add_argument('queries', nargs='*', help='Queries')
+    args = parser.parse_args()
+
+    index = build_fuzzy_index(args.data_dir)
+    queries = list(args.queries)
+    if args.input:
+        with open(args.input, encoding='utf-8') as f:
+            queries.extend(line.strip() for line in f if line.strip())
+
+    results = index.search_batch(queries, args.limit, args.max_distance)
+    for query, matches in zip(queries, results):
+        print(f"{query}:")
+        for match in matches:
+            print(
+                f"  {KIND_NAMES[match.entry.kind]} {match.entry.value} "
+                f"('{match.name}', distance={match.distance})")
+
+    if args.benchmark:
+        run_benchmark(index, args.benchmark)
+
+
+def run_benchmark(index: 'FuzzyIndex', size: int) -> None:
+    rnd = random.Random(size)
+    queries = [misspell(rnd, rnd.choice(index.names)) for _ in range(size)]
+
+    start = time.perf_counter()
+    results = [index.search(query) for query in queries]
+    elapsed = time.perf_counter() - start
+    print(f"trigram index: {size / elapsed:.0f} queries/s")
+
+    start = time.perf_counter()
+    expected = [index.linear_search(query) for query in queries]
+    elapsed = time.perf_counter() - start
+    print(f"linear scan: {size / elapsed:.0f} queries/s")
+
+    assert results == expected
+
+
+def misspell(rnd: random.Random, name: str) -> str:
+    """Return 'name' with one random deletion, insertion, or substitution."""
+    i = rnd.randrange(len(name))
+    c = rnd.choice('abcdefghijklmnopqrstuvwxyz')
+    op = rnd.randrange(3)
+    if op == 0:
+        return name[:i] + name[i + 1:]
+    if op == 1:
+        return name[:i] + c + name[i:]
+    return name[:i] + c + name[i + 1:]
+
+
+def build_fuzzy_index(data_dir: str) -> 'FuzzyIndex':
+    """Build the index from the data files in 'data_dir'."""
+    files = data_files(data_dir)
+    tables = load_rows({
+        name: files[name]
+        for name in ['iso_long', 'iso_short', 'country_timezones']
+    })
+    index = FuzzyIndex()
+    for table in ['iso_long', 'iso_short']:
+        for code, name in tables[table]:
+            index.add(name, SearchEntry(KIND_COUNTRY, code))
+    for _, _, timezone in tables['country_timezones']:
+        entry = SearchEntry(KIND_TIMEZONE, timezone)
+        index.add(timezone, entry)
+        for part in timezone.split('/')[1:]:
+            index.add(part, entry)
+    return index
+
+# -----------------------------------------------------------------------------
+
+
+def ngrams(key: str) -> Dict[str, int]:
+    """Return the count of each trigram of the normalized 'key', padded so
+    that the start and the end of the key are trigrams too. A key of length
+    'n' has n + 1 trigrams.
+    """
+    padded = f"  {key} "
+    grams: Dict[str, int] = {}
+    for i in range(len(padded) - NGRAM + 1):
+        gram = padded[i:i + NGRAM]
+        grams[gram] = grams.get(gram, 0) + 1
+    return grams
+
+
+def edit_distance(a: str, b: str, max_distance: int) -> int:
+    """Return the Levenshtein distance between 'a' and 'b', or
+    max_distance + 1 if it is greater than 'max_distance'. Only the cells
+    within 'max_distance' of the diagonal are computed, because the others
+    are greater than 'max_distance'.
+    """
+    if len(a) > len(b):
+        a, b = b, a
+    if len(b) - len(a) > max_distance:
+        return max_distance + 1
+    k = max_distance
+    over = k + 1
+    previous = [j if j <= k else over for j in range(len(b) + 1)]
+    for i in range(1, len(a) + 1):
+        current = [over] * (len(b) + 1)
+        if i <= k:
+            current[0] = i
+        ca = a[i - 1]
+        lowest = current[0]
+        for j in range(max(1, i - k), min(len(b), i + k) + 1):
+            d = previous[j - 1] + (ca != b[j - 1])
+            if previous[j] + 1 < d:
+                d = previous[j] + 1
+            if current[j - 1] + 1 < d:
+                d = current[j - 1] + 1
+            if d > over:
+                d = over
+            current[j] = d
+            if d < lowest:
+                lowest = d
+        if lowest > k:
+            return over
+        previous = current
+    return previous[-1]
+
+
+def default_max_distance(key: str) -> int:
+    return max(1, len(key) // 4)
+
+
+class FuzzyIndex:
+    """An inverted index from trigrams to the normalized names containing
+    them, each name mapping to the SearchEntry of the names it was added from.
+    """
+
+    def __init__(self) -> None:
+        self.names: List[str] = []
+        self.name_ids: Dict[str, int] = {}
+        self.name_entries: List[List[SearchEntry]] = []
+        self.name_grams: List[Dict[str, int]] = []
+
+        # trigram -> [name ID]
+        self.postings: Dict[str, List[int]] = {}
+
+        # length -> [name ID], for short queries which can match names
+        # without sharing any trigram.
+        self.lengths: Dict[int, List[int]] = {}
+
+    def add(self, name: str, entry: SearchEntry) -> None:
+        """Add 'name' as a key of 'entry'."""
+        key = normalize(name)
+        name_id = self.name_ids.get(key)
+        if name_id is None:
+            name_id = len(self.names)
+            self.names.append(key)
+            self.name_ids[key] = name_id
+            self.name_entries.append([])
+            grams = ngrams(key)
+            self.name_grams.append(grams)
+            for gram in grams:
+                self.postings.setdefault(gram, []).append(name_id)
+            self.lengths.setdefault(len(key), []).append(name_id)
+        if entry not in self.name_entries[name_id]:
+            self.name_entries[name_id].append(entry)
+
+    def candidates(self, key: str, max_distance: int) -> Iterable[int]:
+        """Return the IDs of the names which may be within 'max_distance'
+        edits of 'key', by the count of their shared trigrams.
+        """
+        k = max_distance
+        num_grams = len(key) + 1
+        if num_grams - NGRAM * k <= 0:
+            # A name may match without sharing a trigram.
+            return [
+                name_id
+                for n in range(len(key) - k, len(key) + k + 1)
+                for name_id in self.lengths.get(n, [])
+            ]
+
+        # A name which shares at least num_grams - 3k trigrams contains at
+        # least one of any 3k + 1 trigrams of the query, so only the postings
+        # of the rarest ones are scanned.
+        grams = ngrams(key)
+        rarest = sorted(grams, key=lambda g: len(self.postings.get(g, [])))
+        found: Dict[int, None] = {}
+        needed = NGRAM * k + 1
+        for gram in rarest:
+            for name_id in self.postings.get(gram, []):
+                found[name_id] = None
+            needed -= grams[gram]
+            if needed <= 0:
+                break
+
+        candidates = []
+        for name_id in found:
+            name_length = len(self.names[name_id])
+            if abs(name_length - len(key)) > k:
+                continue
+            name_grams = self.name_grams[name_id]
+            shared = 0
+            for gram, n in grams.items():
+                m = name_grams.get(gram)
+                if m:
+                    shared += min(n, m)
+            if shared >= max(num_grams, name_length + 1) - NGRAM * k:
+                candidates.append(name_id)
+        return candidates
+
+    def search(
+        self,
+        query: str,
+        limit: int = 5,
+        max_distance: Optional[int] = None,
+    ) -> List[FuzzyMatch]:
+        """Return the 'limit' nearest entries within 'max_distance' edits of
+        'query', sorted by (distance, kind, value).
+        """
+        key = normalize(query)
+        if max_distance is None:
+            max_distance = default_max_distance(key)
+        return self.rank(
+            key,
+            self.candidates(key, max_distance),
+            limit,
+            max_distance)
+
+    def linear_search(
+        self,
+        query: str,
+        limit: int = 5,
+        max_distance: Optional[int] = None,
+    ) -> List[FuzzyMatch]:
+        """Return the same as search(), by comparing every name. Used to
+        verify the index.
+        """
+        key = normalize(query)
+        if max_distance is None:
+            max_distance = default_max_distance(key)
+        return self.rank(key, range(len(self.names)), limit, max_distance)
+
+    def rank(
+        self,
+        key: str,
+        name_ids: Iterable[int],
+        limit: int,
+        max_distance: int,
+    ) -> List[FuzzyMatch]:
+        """Return the best match of each entry of the 'name_ids' within
+        'max_distance' of 'key', sorted by (distance, kind, value).
+        """
+        best: Dict[SearchEntry, FuzzyMatch] = {}
+        for name_id in name_ids:
+            name = self.names[name_id]
+            distance = edit_distance(key, name, max_distance)
+            if distance > max_distance:
+                continue
+            for entry in self.name_entries[name_id]:
+                match = best.get(entry)
+                if match is None or (distance, name) < (
+                        match.distance, match.name):
+                    best[entry] = FuzzyMatch(entry, name, distance)
+        matches = sorted(
+            best.values(), key=lambda m: (m.distance, m.entry, m.name))
+        return matches[:limit]
+
+    def search_batch(
+        self,
+        queries: Iterable[str],
+        limit: int = 5,
+        max_distance: Optional[int] = None,
+    ) -> List[List[FuzzyMatch]]:
+        """Return the search() of each query. Queries which are equal after
+        normalization are searched once.
+        """
+        memo: Dict[str, List[FuzzyMatch]] = {}
+        results = []
+        for query in queries:
+            key = normalize(query)
+            matches = memo.get(key)
+            if matches is None:
+                matches = self.search(key, limit, max_distance)
+                memo[key] = matches
+            results.append(matches)
+        return results
+
+# -----------------------------------------------------------------------------
+
+
+if __name__ == '__main__':
+    main()
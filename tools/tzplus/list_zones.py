@@ -0,0 +1,197 @@
+# List the timezones organized by region, then country, then timezone.
+#
+# Usage:
+# $ list_zones.py
+#   [--regions {file}]
+#   [--countries {file}]
+#   [--snapshot {file}]
+#   [--menu {file}]
+#   [--sort {name,longitude,offset}]
+#   [--orders {file}]
+#   [--profile {file}]
+#   country_timezones.txt
+#
+# If --sort is given, the regions, countries, and timezones are listed in the
+# precomputed order of sort_orders.py, read from the --orders file (default:
+# sort_orders.txt next to country_timezones.txt), instead of sorted by code.
+# The order also applies to --menu.
+#
+# If --menu is given, the binary menu format of menu_format.py is written to
+# the file, instead of printing the text listing.
+#
+# If --profile is given, the wall time and memory of each stage is printed on
+# stderr, and written as JSON to the file.
+
+from typing import Dict
+from typing import Iterable
+from typing import List
+import argparse
+import os
+
+from .data_parser import parse_region_country_timezones
+from .errors import error
+from .menu_format import write_menu
+from .profiler import Profiler
+from .snapshot import Row
+from .snapshot import load_rows
+from .sort_orders import ORDERS
+from .sort_orders import apply_sort_order
+from .sort_orders import read_sort_orders
+
+CountryTimezones = Dict[str, List[str]]
+RegionCountryTimezones = Dict[str, CountryTimezones]
+Regions = Dict[str, str]
+Countries = Dict[str, str]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description='List Time Zones.')
+    parser.add_argument(
+        '--regions', help='Region code to name', required=False)
+    parser.add_argument(
+        '--countries', help='Country code to name', required=False)
+    parser.add_argument(
+        '--snapshot',
+        help='Binary snapshot of the data files, used if up to date',
+        required=False)
+    parser.add_argument(
+        '--menu',
+        help='Write the binary menu to this file',
+        required=False)
+    parser.add_argument(
+        '--sort',
+        help='Precomputed order of the listing (default: by code)',
+        choices=ORDERS,
+        required=False)
+    parser.add_argument(
+        '--orders',
+        help='Sort orders file (default: sort_orders.txt in the same '
+        'directory as the timezones file)',
+        required=False)
+    parser.add_argument(
+        '--profile',
+        help='Write the time and memory of each stage to this JSON file',
+        required=False)
+    parser.add_argument('timezones', help='Timezone file')
+    args = parser.parse_args()
+    if not args.timezones:
+        error("Must provide timezones file")
+
+    files = {'country_timezones': args.timezones}
+    if args.regions:
+        files['regions'] = args.regions
+    if args.countries:
+        files['iso_short'] = args.countries
+    profiler = Profiler(enabled=bool(args.profile))
+    tables = profiler.call('load_rows', load_rows, files, args.snapshot)
+
+    regions: Regions = {}
+    if args.regions:
+        regions = profiler.call(
+            'build_regions', build_names, tables['regions'])
+
+    countries: Countries = {}
+    if args.countries:
+        countries = profiler.call(
+            'build_countries', build_names, tables['iso_short'])
+
+    region_country_timezones = profiler.call(
+        'build_region_country_timezones', build_region_country_timezones,
+        tables['country_timezones'])
+    if args.sort:
+        orders_file = args.orders or os.path.join(
+            os.path.dirname(args.timezones), 'sort_orders.txt')
+        orders = profiler.call(
+            'read_sort_orders', read_sort_orders, orders_file)
+        region_country_timezones = profiler.call(
+            'apply_sort_order', apply_sort_order,
+            region_country_timezones, orders, args.sort)
+
+    ordered = bool(args.sort)
+    if args.menu:
+        menu = profiler.call(
+            'write_menu', write_menu,
+            regions, countries, region_country_timezones, ordered)
+        with open(args.menu, 'wb') as f:
+            f.write(menu)
+    else:
+        profiler.call(
+            'print_nested_timezones', print_nested_timezones,
+            regions, countries, region_country_timezones, ordered)
+
+    if args.profile:
+        profiler.stop()
+        profiler.print_summary()
+        profiler.write_json(args.profile)
+
+
+def print_nested_timezones(
+    regions: Regions,
+    countries: Countries,
+    zones: RegionCountryTimezones,
+    ordered: bool = False,
+) -> None:
+    """Print the tree sorted by code, or in the order of 'zones' if
+    'ordered'.
+    """
+    if not ordered:
+        zones = sort_by_code(zones)
+    for region, country_timezones in zones.items():
+        if regions:
+            region = f"{regions.get(region)} ({region})"
+        print(f"{region}")
+        for country, timezones in country_timezones.items():
+            if countries:
+                country = f"{countries.get(country)} ({country})"
+            print(f"    {country}")
+            for timezone in timezones:
+                print(f"        {timezone}")
+
+
+def sort_by_code(zones: RegionCountryTimezones) -> RegionCountryTimezones:
+    """Return a copy of 'zones' sorted by region, country, and timezone."""
+    return {
+        region: {
+            country: sorted(timezones)
+            for country, timezones in sorted(country_timezones.items())
+        }
+        for region, country_timezones in sorted(zones.items())
+    }
+
+
+def build_names(rows: Iterable[Row]) -> Dict[str, str]:
+    """Map the (code, name) rows of regions or countries."""
+    return {row[0]: row[1] for row in rows}
+
+
+def read_region_country_timezones(filename: str) -> RegionCountryTimezones:
+    """Read file with lines of form {region country timezone}"""
+    return build_region_country_timezones(
+        parse_region_country_timezones(filename))
+
+
+def build_region_country_timezones(
+    rows: Iterable[Row],
+) -> RegionCountryTimezones:
+    """Nest the (region, country, timezone) rows."""
+    region_country_timezones: RegionCountryTimezones = {}
+    for region, country, timezone in rows:
+        # Add to region->country_timezones
+        country_timezones = region_country_timezones.get(region)
+        if not country_timezones:
+            country_timezones = {}
+            region_country_timezones[region] = country_timezones
+
+        # Add to country->timezones
+        timezones = country_timezones.get(country)
+        if not timezones:
+            timezones = []
+            country_timezones[country] = timezones
+        timezones.append(timezone)
+
+    return region_country_timezones
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,199 @@
+# Binary hierarchical menu of regions, countries, and timezones, written by
+# 'list_zones.py --menu'. Each level is a table of fixed-width records, so that
+# a client can seek directly to "the k-th country of region r", or to the next
+# timezone, by reading a few bytes from external flash, without loading or
+# sorting the whole tree. All integers are little-endian.
+#
+#   header (16 bytes):
+#       magic 'TZPM', version u16, num_regions u16, regions u32, strings u32
+#   region record (12 bytes), num_regions records at 'regions':
+#       code[2], num_countries u16, name u32, countries u32
+#   country record (12 bytes), num_countries records at 'countries':
+#       code[2], num_timezones u16, name u32, timezones u32
+#   timezone record (4 bytes), num_timezones records at 'timezones':
+#       name u32
+#   strings: deduplicated, each is len u8 followed by ASCII bytes
+#
+# The 'name' fields are offsets of strings. An empty region or country name
+# means that no names were given to list_zones.py. The records are sorted in
+# the same order as the text output of list_zones.py: by code, or in the
+# precomputed order of 'list_zones.py --sort'.
+
+from typing import Dict
+from typing import List
+from typing import NamedTuple
+from typing import Union
+
+import mmap
+import struct
+
+MENU_MAGIC = b'TZPM'
+MENU_VERSION = 1
+
+HEADER_FORMAT = '<4sHHII'
+REGION_FORMAT = '<2sHII'
+COUNTRY_FORMAT = '<2sHII'
+TIMEZONE_FORMAT = '<I'
+HEADER_SIZE = struct.calcsize(HEADER_FORMAT)
+REGION_SIZE = struct.calcsize(REGION_FORMAT)
+COUNTRY_SIZE = struct.calcsize(COUNTRY_FORMAT)
+TIMEZONE_SIZE = struct.calcsize(TIMEZONE_FORMAT)
+
+# Same as list_zones.RegionCountryTimezones.
+MenuTree = Dict[str, Dict[str, List[str]]]
+
+
+def write_menu(
+    regions: Dict[str, str],
+    countries: Dict[str, str],
+    zones: MenuTree,
+    ordered: bool = False,
+) -> bytes:
+    """Serialize the {region -> {country -> [timezones]}} tree. The 'regions'
+    and 'countries' map codes to display names, and may be empty. The records
+    are sorted by code, or are in the order of 'zones' if 'ordered'.
+    """
+    if ordered:
+        sorted_regions = list(zones.items())
+        sorted_countries = [
+            list(country_timezones.items())
+            for _, country_timezones in sorted_regions
+        ]
+    else:
+        sorted_regions = sorted(zones.items())
+        sorted_countries = [
+            [
+                (country, sorted(timezones))
+                for country, timezones in sorted(country_timezones.items())
+            ]
+            for _, country_timezones in sorted_regions
+        ]
+    num_countries = sum(len(c) for c in sorted_countries)
+    num_timezones = sum(
+        len(timezones) for c in sorted_countries for _, timezones in c)
+
+    # Layout: header, regions, countries, timezones, strings.
+    countries_offset = HEADER_SIZE + REGION_SIZE * len(sorted_regions)
+    timezones_offset = countries_offset + COUNTRY_SIZE * num_countries
+    strings_offset = timezones_offset + TIMEZONE_SIZE * num_timezones
+
+    strings: List[bytes] = []
+    string_offsets: Dict[str, int] = {}
+    size = strings_offset
+
+    def add_string(s: str) -> int:
+        nonlocal size
+        offset = string_offsets.get(s)
+        if offset is None:
+            encoded = s.encode('ascii')
+            if len(encoded) > 255:
+                raise ValueError(f"String too long: '{s}'")
+            offset = size
+            string_offsets[s] = offset
+            strings.append(bytes([len(encoded)]) + encoded)
+            size += 1 + len(encoded)
+        return offset
+
+    region_data: List[bytes] = []
+    country_data: List[bytes] = []
+    timezone_data: List[bytes] = []
+    country_index = 0
+    timezone_index = 0
+    for (region, _), country_timezones in zip(
+        sorted_regions, sorted_countries
+    ):
+        region_data.append(struct.pack(
+            REGION_FORMAT,
+            region.encode('ascii'),
+            len(country_timezones),
+            add_string(regions.get(region, '')),
+            countries_offset + COUNTRY_SIZE * country_index))
+        country_index += len(country_timezones)
+        for country, timezones in country_timezones:
+            country_data.append(struct.pack(
+                COUNTRY_FORMAT,
+                country.encode('ascii'),
+                len(timezones),
+                add_string(countries.get(country, '')),
+                timezones_offset + TIMEZONE_SIZE * timezone_index))
+            timezone_index += len(timezones)
+            for timezone in timezones:
+                timezone_data.append(
+                    struct.pack(TIMEZONE_FORMAT, add_string(timezone)))
+
+    header = struct.pack(
+        HEADER_FORMAT, MENU_MAGIC, MENU_VERSION, len(sorted_regions),
+        HEADER_SIZE, strings_offset)
+    return b''.join(
+        [header] + region_data + country_data + timezone_data + strings)
+
+# -----------------------------------------------------------------------------
+
+
+class MenuItem(NamedTuple):
+    """A region or country: its code, display name (possibly empty), the
+    number of children, and the offset of the first child record.
+    """
+    code: str
+    name: str
+    num_children: int
+    children: int
+
+
+class MenuReader:
+    """Random access to a binary menu. Every method reads only the records
+    it needs, so 'buf' may be an mmap of a large file.
+    """
+
+    def __init__(self, buf: Union[bytes, mmap.mmap]):
+        self.buf = buf
+        magic, version, self.num_regions, self.regions, _ = \
+            struct.unpack_from(HEADER_FORMAT, buf)
+        if magic != MENU_MAGIC or version != MENU_VERSION:
+            raise ValueError('Invalid menu magic or version')
+
+    def string(self, offset: int) -> str:
+        size = self.buf[offset]
+        return self.buf[offset + 1:offset + 1 + size].decode('ascii')
+
+    def region(self, r: int) -> MenuItem:
+        """Return the r-th region."""
+        if not 0 <= r < self.num_regions:
+            raise IndexError(r)
+        code, num_countries, name, countries = struct.unpack_from(
+            REGION_FORMAT, self.buf, self.regions + REGION_SIZE * r)
+        return MenuItem(
+            code.decode('ascii'), self.string(name), num_countries, countries)
+
+    def country(self, region: MenuItem, k: int) -> MenuItem:
+        """Return the k-th country of 'region'."""
+        if not 0 <= k < region.num_children:
+            raise IndexError(k)
+        code, num_timezones, name, timezones = struct.unpack_from(
+            COUNTRY_FORMAT, self.buf, region.children + COUNTRY_SIZE * k)
+        return MenuItem(
+            code.decode('ascii'), self.string(name), num_timezones,
+            timezones)
+
+    def timezone(self, country: MenuItem, j: int) -> str:
+        """Return the j-th timezone of 'country'."""
+        if not 0 <= j < country.num_children:
+            raise IndexError(j)
+        (name,) = struct.unpack_from(
+            TIMEZONE_FORMAT, self.buf, country.children + TIMEZONE_SIZE * j)
+        return self.string(name)
+
+
+def print_menu(reader: MenuReader) -> None:
+    """Print the menu in the same format as list_zones.py."""
+    for r in range(reader.num_regions):
+        region = reader.region(r)
+        print(f"{region.name} ({region.code})" if region.name
+              else region.code)
+        for k in range(region.num_children):
+            country = reader.country(region, k)
+            print("    " + (
+                f"{country.name} ({country.code})" if country.name
+                else country.code))
+            for j in range(country.num_children):
+                print(f"        {reader.timezone(country, j)}")
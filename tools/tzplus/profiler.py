@@ -0,0 +1,101 @@
+# Per-stage wall time and memory instrumentation, used by the '--profile'
+# option of verify_data.py and list_zones.py. Each stage records its wall
+# time, the peak memory allocated while it ran, and the memory retained by
+# its result (e.g. a parsed table) after it returned, using tracemalloc. The
+# stages are printed as a table on stderr, and written as JSON for CI.
+#
+# Note that tracemalloc slows down allocations, so the profiled wall times
+# are larger than those of an unprofiled run. They are comparable only with
+# other profiled runs.
+
+from typing import Any
+from typing import Callable
+from typing import Dict
+from typing import List
+from typing import NamedTuple
+from typing import Optional
+from typing import TextIO
+from typing import TypeVar
+
+import json
+import sys
+import time
+import tracemalloc
+
+T = TypeVar('T')
+
+
+class Stage(NamedTuple):
+    name: str
+    seconds: float
+    peak_bytes: int  # peak allocated during the stage
+    retained_bytes: int  # still allocated after the stage returned
+
+
+class Profiler:
+    """Record the stages run through call(). If 'enabled' is False, call()
+    only calls the function, so that the Profiler can be passed around
+    unconditionally.
+    """
+
+    def __init__(self, enabled: bool = True) -> None:
+        self.enabled = enabled
+        self.stages: List[Stage] = []
+        self.start_time = time.perf_counter()
+        if enabled and not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+    def call(self, name: str, func: Callable[..., T], *args: Any) -> T:
+        """Return func(*args), recording it as stage 'name'."""
+        if not self.enabled:
+            return func(*args)
+
+        before, _ = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        start = time.perf_counter()
+        result = func(*args)
+        seconds = time.perf_counter() - start
+        after, peak = tracemalloc.get_traced_memory()
+
+        self.stages.append(Stage(
+            name=name,
+            seconds=seconds,
+            peak_bytes=peak - before,
+            retained_bytes=after - before,
+        ))
+        return result
+
+    def stop(self) -> None:
+        if self.enabled and tracemalloc.is_tracing():
+            tracemalloc.stop()
+
+    def to_json(self) -> Dict[str, Any]:
+        return {
+            'total_seconds': time.perf_counter() - self.start_time,
+            'stages': [stage._asdict() for stage in self.stages],
+        }
+
+    def print_summary(self, output: Optional[TextIO] = None) -> None:
+        """Print the stages as a table, on stderr by default, so that the
+        normal output of the tool is not changed.
+        """
+        if output is None:
+            output = sys.stderr
+        width = max([len(stage.name) for stage in self.stages] + [5])
+        print(
+            f"{'Stage':<{width}} {'ms':>10} {'peak KiB':>10} "
+            f"{'kept KiB':>10}",
+            file=output)
+        for stage in self.stages:
+            print(
+                f"{stage.name:<{width}} {stage.seconds * 1000:>10.3f} "
+                f"{stage.peak_bytes / 1024:>10.1f} "
+                f"{stage.retained_bytes / 1024:>10.1f}",
+                file=output)
+        total = time.perf_counter() - self.start_time
+        print(f"{'Total':<{width}} {total * 1000:>10.3f}", file=output)
+
+    def write_json(self, filename: str) -> None:
+        with open(filename, 'w', encoding='utf-8') as f:
+            json.dump(self.to_json(), f, indent=2)
+            f.write('\n')
@@ -0,0 +1,278 @@
+# Build a prefix-search index (a trie) over the timezone IDs, the city parts of
+# the timezone IDs, the ISO short country names, and the region names. Every
+# word of a name is a starting point, so 'aires' finds 'Buenos Aires'. Keys are
+# normalized to lowercase, with '_' and '/' treated as spaces.
+#
+# The index can be queried in memory, or serialized into a compact binary form
+# which a device can walk one character at a time, from the root node:
+#
+#   header: magic 'TZPX', version u16, num_entries u16, root offset u32
+#   entries: num_entries * offset u32, then each entry as
+#       kind u8 (0=region, 1=country, 2=timezone), len u8, ASCII bytes
+#   nodes: num_children u8, num_values u16,
+#       num_children * (char u8, node offset u32) sorted by char,
+#       num_values * entry index u16
+#
+# All integers are little-endian. The 'values' of a node are the entries whose
+# key ends at that node; the matches of a prefix are the values of its node and
+# of all of its descendants.
+#
+# Usage:
+# $ search_index.py
+#   [--output {file}]
+#   [--query {prefix}]
+#   data_dir
+
+from typing import Dict
+from typing import List
+from typing import NamedTuple
+from typing import Optional
+
+import argparse
+import struct
+
+from .snapshot import data_files
+from .snapshot import load_rows
+
+INDEX_MAGIC = b'TZPX'
+INDEX_VERSION = 1
+HEADER_FORMAT = '<4sHHI'
+
+KIND_REGION = 0
+KIND_COUNTRY = 1
+KIND_TIMEZONE = 2
+KIND_NAMES = ['region', 'country', 'timezone']
+
+
+class SearchEntry(NamedTuple):
+    """A search result: the region code, country code, or timezone ID."""
+    kind: int
+    value: str
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description='Build a prefix-search index of timezones and countries.')
+    parser.add_argument('--output', help='Serialized index file')
+    parser.add_argument('--query', help='Prefix to search')
+    parser.add_argument('data_dir', help='Directory of data files')
+    args = parser.parse_args()
+
+    index = build_index(args.data_dir)
+    if args.output:
+        data = index.serialize()
+        with open(args.output, 'wb') as f:
+            f.write(data)
+        print(f"{args.output}: {len(data)} bytes")
+    if args.query is not None:
+        for entry in index.search(args.query):
+            print(f"{KIND_NAMES[entry.kind]} {entry.value}")
+
+
+def build_index(data_dir: str) -> 'PrefixIndex':
+    """Build the index from the data files in 'data_dir'."""
+    files = data_files(data_dir)
+    tables = load_rows({
+        name: files[name]
+        for name in ['regions', 'iso_short', 'country_timezones']
+    })
+    index = PrefixIndex()
+    for code, name in tables['regions']:
+        index.add(name, SearchEntry(KIND_REGION, code))
+    for code, name in tables['iso_short']:
+        index.add(name, SearchEntry(KIND_COUNTRY, code))
+    for _, _, timezone in tables['country_timezones']:
+        entry = SearchEntry(KIND_TIMEZONE, timezone)
+        index.add(timezone, entry)
+        for part in timezone.split('/')[1:]:
+            index.add(part, entry)
+    return index
+
+
+def normalize(s: str) -> str:
+    """Normalize a name or a query into a search key."""
+    return ' '.join(s.lower().replace('_', ' ').replace('/', ' ').split())
+
+# -----------------------------------------------------------------------------
+
+
+class TrieNode:
+    __slots__ = ['children', 'values']
+
+    def __init__(self) -> None:
+        self.children: Dict[str, TrieNode] = {}
+        self.values: List[int] = []
+
+
+class PrefixIndex:
+    """An in-memory trie, mapping the prefixes of keys to SearchEntry."""
+
+    def __init__(self) -> None:
+        self.root = TrieNode()
+        self.entries: List[SearchEntry] = []
+        self.entry_ids: Dict[SearchEntry, int] = {}
+
+        # Matches of each node, including its descendants, computed lazily.
+        self.matches: Dict[int, List[SearchEntry]] = {}
+
+    def add(self, name: str, entry: SearchEntry) -> None:
+        """Add the words of 'name' as keys of 'entry'."""
+        entry_id = self.entry_ids.get(entry)
+        if entry_id is None:
+            entry_id = len(self.entries)
+            self.entries.append(entry)
+            self.entry_ids[entry] = entry_id
+        self.matches.clear()
+
+        words = normalize(name).split(' ')
+        for i in range(len(words)):
+            node = self.root
+            for c in ' '.join(words[i:]):
+                child = node.children.get(c)
+                if child is None:
+                    child = TrieNode()
+                    node.children[c] = child
+                node = child
+            if entry_id not in node.values:
+                node.values.append(entry_id)
+
+    def find(self, prefix: str) -> Optional[TrieNode]:
+        node = self.root
+        for c in normalize(prefix):
+            child = node.children.get(c)
+            if child is None:
+                return None
+            node = child
+        return node
+
+    def search(self, prefix: str) -> List[SearchEntry]:
+        """Return the entries which have a key starting with 'prefix', sorted
+        by (kind, value).
+        """
+        node = self.find(prefix)
+        if node is None:
+            return []
+        matches = self.matches.get(id(node))
+        if matches is None:
+            ids: Dict[int, None] = {}
+            collect(node, ids)
+            matches = sorted(self.entries[i] for i in ids)
+            self.matches[id(node)] = matches
+        return matches
+
+    def serialize(self) -> bytes:
+        """Serialize into the binary format described above."""
+        # Entry table.
+        entry_data: List[bytes] = []
+        for entry in self.entries:
+            value = entry.value.encode('ascii')
+            entry_data.append(struct.pack('<BB', entry.kind, len(value)))
+            entry_data.append(value)
+        header_size = struct.calcsize(HEADER_FORMAT)
+        offset = header_size + 4 * len(self.entries)
+        offsets: List[int] = []
+        for i in range(0, len(entry_data), 2):
+            offsets.append(offset)
+            offset += len(entry_data[i]) + len(entry_data[i + 1])
+        root_offset = offset
+
+        # Assign the offset of each node in pre-order, then emit the nodes.
+        nodes: List[TrieNode] = []
+        node_offsets: Dict[int, int] = {}
+        stack = [self.root]
+        while stack:
+            node = stack.pop()
+            nodes.append(node)
+            node_offsets[id(node)] = offset
+            offset += 3 + 5 * len(node.children) + 2 * len(node.values)
+            for c in sorted(node.children, reverse=True):
+                stack.append(node.children[c])
+
+        node_data: List[bytes] = []
+        for node in nodes:
+            node_data.append(struct.pack(
+                '<BH', len(node.children), len(node.values)))
+            for c in sorted(node.children):
+                node_data.append(struct.pack(
+                    '<BI', ord(c), node_offsets[id(node.children[c])]))
+            node_data.append(struct.pack(
+                f'<{len(node.values)}H', *node.values))
+
+        header = struct.pack(
+            HEADER_FORMAT, INDEX_MAGIC, INDEX_VERSION, len(self.entries),
+            root_offset)
+        return (
+            header
+            + struct.pack(f'<{len(offsets)}I', *offsets)
+            + b''.join(entry_data)
+            + b''.join(node_data)
+        )
+
+
+def collect(node: TrieNode, ids: Dict[int, None]) -> None:
+    """Collect the entry IDs of 'node' and its descendants into 'ids'."""
+    stack = [node]
+    while stack:
+        n = stack.pop()
+        for i in n.values:
+            ids[i] = None
+        stack.extend(n.children.values())
+
+# -----------------------------------------------------------------------------
+
+
+def read_entry(data: bytes, index: int) -> SearchEntry:
+    """Read entry 'index' of a serialized index."""
+    header_size = struct.calcsize(HEADER_FORMAT)
+    (offset,) = struct.unpack_from('<I', data, header_size + 4 * index)
+    kind, size = struct.unpack_from('<BB', data, offset)
+    value = data[offset + 2:offset + 2 + size].decode('ascii')
+    return SearchEntry(kind, value)
+
+
+def walk(data: bytes, offset: int, c: str) -> Optional[int]:
+    """Return the offset of the child of the node at 'offset' for the
+    character 'c', or None. This is the only operation needed per keystroke.
+    """
+    num_children, _ = struct.unpack_from('<BH', data, offset)
+    for i in range(num_children):
+        char, child = struct.unpack_from('<BI', data, offset + 3 + 5 * i)
+        if char == ord(c):
+            return int(child)
+    return None
+
+
+def search_serialized(data: bytes, prefix: str) -> List[SearchEntry]:
+    """Search a serialized index, with the same results as
+    PrefixIndex.search().
+    """
+    magic, version, _, root = struct.unpack_from(HEADER_FORMAT, data)
+    if magic != INDEX_MAGIC or version != INDEX_VERSION:
+        raise ValueError('Invalid index magic or version')
+
+    offset: Optional[int] = root
+    for c in normalize(prefix):
+        assert offset is not None
+        offset = walk(data, offset, c)
+        if offset is None:
+            return []
+
+    ids: Dict[int, None] = {}
+    stack: List[int] = [offset] if offset is not None else []
+    while stack:
+        node = stack.pop()
+        num_children, num_values = struct.unpack_from('<BH', data, node)
+        for i in range(num_children):
+            _, child = struct.unpack_from('<BI', data, node + 3 + 5 * i)
+            stack.append(child)
+        values_offset = node + 3 + 5 * num_children
+        for i in struct.unpack_from(f'<{num_values}H', data, values_offset):
+            ids[i] = None
+    return sorted(read_entry(data, i) for i in ids)
+
+
+# -----------------------------------------------------------------------------
+
+
+if __name__ == '__main__':
+    main()
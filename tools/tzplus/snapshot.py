@@ -0,0 +1,282 @@
+# Compile the data/*.txt files into a single versioned binary snapshot, which
+# can be loaded using mmap() without copying and without parsing any text. The
+# snapshot contains a deduplicated string table, followed by one table of
+# fixed-width integer string IDs per data file. Each table records the SHA-256
+# of its source file, so that a stale snapshot is detected and the text files
+# are read instead.
+#
+# Usage:
+# $ snapshot.py
+#   --output {file}
+#   data_dir
+#
+# Layout (all integers are little-endian uint32):
+#
+#   header: magic 'TZPS', version, num_tables
+#   directory: num_tables * (name[32], offset, num_rows, num_cols, sha256[32])
+#   strings: num_strings, offsets[num_strings + 1], utf-8 bytes
+#   tables: num_rows * num_cols string IDs, for each table
+
+from typing import Dict
+from typing import Iterable
+from typing import Iterator
+from typing import List
+from typing import NamedTuple
+from typing import Optional
+from typing import Tuple
+from typing import Union
+
+import argparse
+import hashlib
+import mmap
+import os
+import struct
+import sys
+
+from .data_parser import parse_region_country_timezones
+from .errors import error
+from .verify_data import read_countries
+from .verify_data import read_links
+from .verify_data import read_regions
+from .verify_data import read_zones
+
+SNAPSHOT_MAGIC = b'TZPS'
+SNAPSHOT_VERSION = 1
+
+HEADER_FORMAT = '<4sII'
+HEADER_SIZE = struct.calcsize(HEADER_FORMAT)
+DIRECTORY_FORMAT = '<32sIII32s'
+DIRECTORY_SIZE = struct.calcsize(DIRECTORY_FORMAT)
+
+# Name of each table, and the default name of its source file in data/.
+DATA_FILES: Dict[str, str] = {
+    'zones': 'zones.txt',
+    'links': 'links.txt',
+    'classified_zones': 'classified_zones.txt',
+    'classified_links': 'classified_links.txt',
+    'iso_long': 'iso3166_long.txt',
+    'iso_short': 'iso3166_short.txt',
+    'regions': 'regions.txt',
+    'country_timezones': 'country_timezones.txt',
+}
+
+# Each table is a list of rows of strings:
+# * zones, classified_zones: (zone, tag)
+# * links, classified_links: (link, target, tag)
+# * iso_long, iso_short: (code, name)
+# * regions: (code, name)
+# * country_timezones: (region, country, timezone)
+Row = Tuple[str, ...]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description='Compile the data files into a binary snapshot.')
+    parser.add_argument('--output', help='Snapshot file', required=True)
+    parser.add_argument('data_dir', help='Directory of data files')
+    args = parser.parse_args()
+
+    files = data_files(args.data_dir)
+    tables = {name: read_rows(name, path) for name, path in files.items()}
+    hashes = {name: hash_file(path) for name, path in files.items()}
+    data = compile_snapshot(tables, hashes)
+    with open(args.output, 'wb') as f:
+        f.write(data)
+    print(f"{args.output}: {len(data)} bytes")
+
+
+def data_files(data_dir: str) -> Dict[str, str]:
+    """Return the {table -> path} of the data files in 'data_dir'."""
+    return {
+        name: os.path.join(data_dir, filename)
+        for name, filename in DATA_FILES.items()
+    }
+
+
+def hash_file(path: str) -> bytes:
+    with open(path, 'rb') as f:
+        return hashlib.sha256(f.read()).digest()
+
+# -----------------------------------------------------------------------------
+
+
+def read_rows(name: str, path: str) -> List[Row]:
+    """Read the rows of table 'name' from its text file."""
+    if name in ['zones', 'classified_zones']:
+        return [(zone, e.tag) for zone, e in read_zones(path).items()]
+    if name in ['links', 'classified_links']:
+        return [
+            (link, e.target or '', e.tag)
+            for link, e in read_links(path).items()
+        ]
+    if name in ['iso_long', 'iso_short']:
+        return list(read_countries(path).items())
+    if name == 'regions':
+        return list(read_regions(path).items())
+    if name == 'country_timezones':
+        return list(parse_region_country_timezones(path))
+    error(f"Unknown table '{name}'")
+    return []
+
+
+def compile_snapshot(
+    tables: Dict[str, List[Row]],
+    hashes: Dict[str, bytes],
+) -> bytes:
+    """Serialize the tables into the binary snapshot format."""
+    # Deduplicate the strings across all tables.
+    string_ids: Dict[str, int] = {}
+    for rows in tables.values():
+        for row in rows:
+            for s in row:
+                if s not in string_ids:
+                    string_ids[s] = len(string_ids)
+    encoded = [s.encode('utf-8') for s in string_ids]
+    offsets = [0]
+    for b in encoded:
+        offsets.append(offsets[-1] + len(b))
+    strings = (
+        struct.pack(f'<I{len(offsets)}I', len(encoded), *offsets)
+        + b''.join(encoded)
+    )
+    strings += b'\0' * (-len(strings) % 4)
+
+    # Append each table after the string table.
+    directory: List[bytes] = []
+    sections: List[bytes] = [strings]
+    offset = HEADER_SIZE + DIRECTORY_SIZE * (len(tables) + 1)
+    directory.append(struct.pack(
+        DIRECTORY_FORMAT, b'strings', offset, len(encoded), 0, b''))
+    offset += len(strings)
+    for name, rows in tables.items():
+        num_cols = len(rows[0]) if rows else 0
+        ids = [string_ids[s] for row in rows for s in row]
+        section = struct.pack(f'<{len(ids)}I', *ids)
+        directory.append(struct.pack(
+            DIRECTORY_FORMAT, name.encode('utf-8'), offset, len(rows),
+            num_cols, hashes[name]))
+        sections.append(section)
+        offset += len(section)
+
+    header = struct.pack(
+        HEADER_FORMAT, SNAPSHOT_MAGIC, SNAPSHOT_VERSION, len(directory))
+    return header + b''.join(directory) + b''.join(sections)
+
+# -----------------------------------------------------------------------------
+
+
+class TableInfo(NamedTuple):
+    offset: int
+    num_rows: int
+    num_cols: int
+    sha256: bytes
+
+
+class Snapshot:
+    """A read-only view of a binary snapshot. Strings are decoded lazily, and
+    the integer tables are read directly from the underlying buffer, which
+    is normally an mmap of the snapshot file.
+    """
+
+    def __init__(self, buf: Union[bytes, mmap.mmap]):
+        self.buf = buf
+        view = memoryview(buf)
+        magic, version, num_tables = struct.unpack_from(HEADER_FORMAT, buf)
+        if magic != SNAPSHOT_MAGIC or version != SNAPSHOT_VERSION:
+            raise ValueError('Invalid snapshot magic or version')
+
+        self.tables: Dict[str, TableInfo] = {}
+        for i in range(num_tables):
+            name, offset, num_rows, num_cols, sha256 = struct.unpack_from(
+                DIRECTORY_FORMAT, buf, HEADER_SIZE + i * DIRECTORY_SIZE)
+            self.tables[name.rstrip(b'\0').decode('utf-8')] = TableInfo(
+                offset, num_rows, num_cols, sha256)
+
+        # The native uint32 casts below require a little-endian host.
+        strings = self.tables['strings']
+        self.num_strings = strings.num_rows
+        start = strings.offset + 4
+        self.offsets = view[start:start + 4 * (self.num_strings + 1)] \
+            .cast('I')
+        self.blob = view[start + 4 * (self.num_strings + 1):]
+        self.cache: List[Optional[str]] = [None] * self.num_strings
+
+    def string(self, i: int) -> str:
+        """Return the string with ID 'i'."""
+        s = self.cache[i]
+        if s is None:
+            s = str(self.blob[self.offsets[i]:self.offsets[i + 1]], 'utf-8')
+            self.cache[i] = s
+        return s
+
+    def ids(self, name: str) -> 'memoryview':
+        """Return the flat uint32 array of string IDs of table 'name', in
+        row-major order.
+        """
+        info = self.tables[name]
+        size = 4 * info.num_rows * info.num_cols
+        return memoryview(self.buf)[info.offset:info.offset + size].cast('I')
+
+    def rows(self, name: str) -> Iterator[Row]:
+        """Yield the rows of table 'name' as tuples of strings."""
+        info = self.tables[name]
+        if info.num_rows == 0:
+            # An empty table is written with no columns.
+            return
+        ids = self.ids(name)
+        string = self.string
+        cols = info.num_cols
+        for i in range(0, info.num_rows * cols, cols):
+            yield tuple(string(ids[j]) for j in range(i, i + cols))
+
+    def is_fresh(self, files: Dict[str, str]) -> bool:
+        """Return True if every {table -> path} in 'files' matches the
+        content hash recorded in the snapshot.
+        """
+        for name, path in files.items():
+            info = self.tables.get(name)
+            if info is None or info.sha256 != hash_file(path):
+                return False
+        return True
+
+
+def open_snapshot(path: str) -> Optional[Snapshot]:
+    """Map the snapshot file into memory. Return None if it is missing,
+    invalid, or unusable on this host.
+    """
+    if sys.byteorder != 'little':
+        return None
+    try:
+        with open(path, 'rb') as f:
+            buf = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError):
+        return None
+    try:
+        return Snapshot(buf)
+    except (ValueError, struct.error, KeyError):
+        pass
+    # Closed after the except clause, which keeps the memoryviews of the
+    # failed Snapshot alive through the traceback.
+    buf.close()
+    return None
+
+
+def load_rows(
+    files: Dict[str, str],
+    snapshot_path: Optional[str] = None,
+) -> Dict[str, Iterable[Row]]:
+    """Return the rows of each {table -> path} in 'files'. The rows are
+    taken from the snapshot if it is up to date, otherwise they are read
+    from the text files.
+    """
+    if snapshot_path:
+        snapshot = open_snapshot(snapshot_path)
+        if snapshot is not None and snapshot.is_fresh(files):
+            return {name: snapshot.rows(name) for name in files}
+    return {name: read_rows(name, path) for name, path in files.items()}
+
+# -----------------------------------------------------------------------------
+
+
+if __name__ == '__main__':
+    main()
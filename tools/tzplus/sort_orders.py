@@ -0,0 +1,337 @@
+# Compute the sort orders of the menu of country_timezones.txt, as permutation
+# index arrays, so that a device can list the regions, the countries of a
+# region, and the timezones of a country in a different order without sorting
+# at runtime. There are 3 orders:
+#
+#   * name: alphabetical, by the region and country names if given (otherwise
+#     by their codes), and by timezone ID,
+#   * longitude: west to east, by the coordinates of tzdb/zone.tab and
+#     tzdb/zone1970.tab,
+#   * offset: by the standard UTC offset in the Zone lines of the raw TZDB
+#     files, in effect during the given year (default: the year of the TZDB
+#     version).
+#
+# A Link without coordinates has the coordinates of its Zone. A timezone
+# without any coordinates (e.g. Etc/GMT+5) is placed at the longitude of its
+# standard offset, 15 degrees per hour. A region or a country is placed by the
+# median longitude or offset of its timezones. Ties are broken by name.
+#
+# Each permutation lists the indexes of the items of one level of the menu,
+# in the order of their first appearance in country_timezones.txt, which is
+# the order of list_zones.build_region_country_timezones(). The file also
+# contains a checksum of that tree, so that a stale file is detected instead
+# of silently listing the wrong items.
+#
+# Usage:
+# $ sort_orders.py
+#   [--year {year}]
+#   [--regions {file}]
+#   [--countries {file}]
+#   [--output {file}]
+#   tzdb_dir country_timezones.txt
+
+from typing import Dict
+from typing import Iterable
+from typing import List
+from typing import NamedTuple
+from typing import Optional
+from typing import Sequence
+from typing import TextIO
+from typing import Tuple
+
+import argparse
+import os
+import sys
+import zlib
+
+from .data_parser import iter_file_lines
+from .errors import error
+from .verify_data import link_resolver
+from .verify_data import read_countries
+from .verify_data import read_regions
+
+# The TZDB parsers (extract_tzdb, zone_offsets) are imported by the functions
+# which compute the orders, so that list_zones.py, which only reads them, does
+# not import them.
+
+SORT_ORDERS_HEADER = """\
+# Sort orders of the regions, countries, and timezones of
+# country_timezones.txt, computed from TZDB {version} for the year {year}.
+#
+# DO NOT EDIT: This file was autogenerated by tools/sort_orders.py.
+#
+# The 'checksum' line is the CRC32 of the tree of country_timezones.txt. Each
+# other line is a permutation of the indexes of the regions (region and
+# country are '-'), of the countries of a region (country is '-'), or of the
+# timezones of a country, in their order in country_timezones.txt.
+#
+# order region country index...
+
+"""
+
+# Sort orders, in the order of the file.
+ORDERS = ['name', 'longitude', 'offset']
+
+# Same as list_zones.RegionCountryTimezones.
+ZoneTree = Dict[str, Dict[str, List[str]]]
+
+# (order, region, country) -> permutation. The region and country are '-'
+# for the permutation of the regions, and the country is '-' for the
+# permutation of the countries of a region.
+Permutations = Dict[Tuple[str, str, str], List[int]]
+
+# Sort key of a timezone, region, or country: (longitude or offset, name).
+SortKey = Tuple[float, str]
+
+NO_CODE = '-'
+
+# Degrees of longitude per second of UTC offset.
+DEGREES_PER_SECOND = 15 / 3600
+
+
+class SortOrders(NamedTuple):
+    checksum: int  # tree_checksum() of the tree of the permutations
+    permutations: Permutations
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description='Compute the sort orders of the menu of timezones.')
+    parser.add_argument(
+        '--year',
+        help='Year of the UTC offsets (default: year of TZDB version)',
+        type=int)
+    parser.add_argument('--regions', help='Region code to name')
+    parser.add_argument('--countries', help='Country code to name')
+    parser.add_argument('--output', help='Output file (default: stdout)')
+    parser.add_argument('tzdb', help='Directory of raw TZDB files')
+    parser.add_argument('timezones', help='country_timezones.txt file')
+    args = parser.parse_args()
+
+    from .extract_tzdb import read_version
+
+    version = read_version(args.tzdb)
+    year = args.year if args.year else int(version[:4])
+    orders = build_sort_orders(
+        args.tzdb, args.timezones, args.regions, args.countries, year)
+    header = SORT_ORDERS_HEADER.format(version=version, year=year)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            write_sort_orders(f, header, orders)
+    else:
+        write_sort_orders(sys.stdout, header, orders)
+
+
+def build_sort_orders(
+    tzdb_dir: str,
+    timezones_file: str,
+    regions_file: Optional[str],
+    countries_file: Optional[str],
+    year: int,
+) -> SortOrders:
+    """Compute the sort orders of country_timezones.txt, with the offsets of
+    'year' in the raw TZDB files of 'tzdb_dir'. The names of the regions and
+    countries are optional.
+    """
+    from .extract_tzdb import load_tzdb
+    from .list_zones import read_region_country_timezones
+    from .zone_offsets import compute_offsets
+
+    tzdb = load_tzdb(tzdb_dir)
+    zones = read_region_country_timezones(timezones_file)
+    timezones = sorted({
+        timezone
+        for country_timezones in zones.values()
+        for timezone_list in country_timezones.values()
+        for timezone in timezone_list
+    })
+    offsets = {
+        timezone: offset.std_offset
+        for timezone, offset in compute_offsets(
+            tzdb, timezones, year).items()
+    }
+    longitudes = compute_longitudes(
+        read_coordinates(tzdb_dir), tzdb.links, offsets)
+    regions = read_regions(regions_file) if regions_file else {}
+    countries = read_countries(countries_file) if countries_file else {}
+    return compute_sort_orders(
+        zones, regions, countries, longitudes, offsets)
+
+
+def read_coordinates(tzdb_dir: str) -> Dict[str, Tuple[float, float]]:
+    """Return the {timezone -> (latitude, longitude)} of zone.tab and
+    zone1970.tab.
+    """
+    from .extract_tzdb import parse_coordinates
+    from .extract_tzdb import read_zone_tab
+
+    coordinates: Dict[str, Tuple[float, float]] = {}
+    for tab in ['zone1970.tab', 'zone.tab']:
+        for record in read_zone_tab(os.path.join(tzdb_dir, tab)):
+            coordinates[record.timezone] = parse_coordinates(
+                record.coordinates)
+    return coordinates
+
+
+def compute_longitudes(
+    coordinates: Dict[str, Tuple[float, float]],
+    links: Dict[str, str],
+    offsets: Dict[str, int],
+) -> Dict[str, float]:
+    """Return the longitude of each timezone of 'offsets': its own, or the one
+    of its Zone, or else the longitude of its standard offset.
+    """
+    resolver = link_resolver(links)
+    longitudes: Dict[str, float] = {}
+    for timezone, offset in offsets.items():
+        coordinate = coordinates.get(timezone)
+        if coordinate is None:
+            coordinate = coordinates.get(resolver.resolve(timezone) or '')
+        if coordinate is None:
+            longitudes[timezone] = offset * DEGREES_PER_SECOND
+        else:
+            longitudes[timezone] = coordinate[1]
+    return longitudes
+
+# -----------------------------------------------------------------------------
+
+
+def compute_sort_orders(
+    zones: ZoneTree,
+    regions: Dict[str, str],
+    countries: Dict[str, str],
+    longitudes: Dict[str, float],
+    offsets: Dict[str, int],
+) -> SortOrders:
+    """Return the permutations of each order of the {region -> {country ->
+    [timezones]}} tree. The 'regions' and 'countries' map codes to names,
+    and may be empty.
+    """
+    permutations: Permutations = {}
+    for order in ORDERS:
+        values: Dict[str, float] = {}
+        if order == 'longitude':
+            values = longitudes
+        elif order == 'offset':
+            values = {
+                timezone: float(offset)
+                for timezone, offset in offsets.items()
+            }
+
+        def timezone_key(timezone: str) -> SortKey:
+            return (values.get(timezone, 0.0), timezone)
+
+        def group_key(name: str, timezones: Iterable[str]) -> SortKey:
+            if not values:
+                return (0.0, name)
+            return (median([values[t] for t in timezones]), name)
+
+        permutations[(order, NO_CODE, NO_CODE)] = permutation([
+            group_key(
+                regions.get(region, region),
+                [
+                    t
+                    for timezones in country_timezones.values()
+                    for t in timezones
+                ])
+            for region, country_timezones in zones.items()
+        ])
+        for region, country_timezones in zones.items():
+            permutations[(order, region, NO_CODE)] = permutation([
+                group_key(countries.get(country, country), timezones)
+                for country, timezones in country_timezones.items()
+            ])
+            for country, timezones in country_timezones.items():
+                permutations[(order, region, country)] = permutation(
+                    [timezone_key(t) for t in timezones])
+    return SortOrders(tree_checksum(zones), permutations)
+
+
+def median(values: List[float]) -> float:
+    """Return the lower median of 'values', which is one of the values."""
+    return sorted(values)[(len(values) - 1) // 2]
+
+
+def permutation(keys: Sequence[SortKey]) -> List[int]:
+    """Return the indexes of 'keys' in sorted order."""
+    return sorted(range(len(keys)), key=keys.__getitem__)
+
+
+def tree_checksum(zones: ZoneTree) -> int:
+    """Return the CRC32 of the regions, countries, and timezones of 'zones',
+    in order.
+    """
+    checksum = 0
+    for region, country_timezones in zones.items():
+        for country, timezones in country_timezones.items():
+            for timezone in timezones:
+                line = f"{region} {country} {timezone}\n"
+                checksum = zlib.crc32(line.encode('utf-8'), checksum)
+    return checksum
+
+# -----------------------------------------------------------------------------
+
+
+def write_sort_orders(
+    output: TextIO,
+    header: str,
+    orders: SortOrders,
+) -> None:
+    output.write(header)
+    output.write(f"checksum {orders.checksum:08x}\n")
+    for (order, region, country), indexes in orders.permutations.items():
+        output.write(
+            f"{order} {region} {country} "
+            f"{' '.join(str(i) for i in indexes)}\n")
+
+
+def read_sort_orders(filename: str) -> SortOrders:
+    """Read the file written by write_sort_orders()."""
+    checksum: Optional[int] = None
+    permutations: Permutations = {}
+    for line in iter_file_lines(filename):
+        fields = line.split()
+        if fields[0] == 'checksum':
+            checksum = int(fields[1], 16)
+            continue
+        order, region, country = fields[:3]
+        permutations[(order, region, country)] = [int(i) for i in fields[3:]]
+    if checksum is None:
+        error(f"Missing checksum in '{filename}'")
+    assert checksum is not None
+    return SortOrders(checksum, permutations)
+
+
+def apply_sort_order(
+    zones: ZoneTree,
+    orders: SortOrders,
+    order: str,
+) -> ZoneTree:
+    """Return a copy of 'zones' whose regions, countries, and timezones are
+    in the given order. 'zones' must be in the order of
+    country_timezones.txt.
+    """
+    if orders.checksum != tree_checksum(zones):
+        error("Sort orders are out of date with the timezones")
+
+    def permute(items: List[str], region: str, country: str) -> List[str]:
+        indexes = orders.permutations.get((order, region, country))
+        if indexes is None or sorted(indexes) != list(range(len(items))):
+            error(f"Invalid sort order '{order}' of '{region} {country}'")
+        assert indexes is not None
+        return [items[i] for i in indexes]
+
+    ordered: ZoneTree = {}
+    for region in permute(list(zones), NO_CODE, NO_CODE):
+        country_timezones = zones[region]
+        ordered[region] = {
+            country: permute(country_timezones[country], region, country)
+            for country in permute(list(country_timezones), region, NO_CODE)
+        }
+    return ordered
+
+# -----------------------------------------------------------------------------
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,339 @@
+# A spatial index of the timezones of country_timezones.txt, located by the
+# coordinates of tzdb/zone.tab and tzdb/zone1970.tab, which answers the
+# nearest timezones of a (latitude, longitude), or the timezones within a
+# radius, without scanning every coordinate.
+#
+# The coordinates are converted into 3D unit vectors, and stored in a k-d
+# tree, so that the distances are correct across the antimeridian and near the
+# poles. The straight-line (chord) distance between two unit vectors increases
+# with the great-circle distance, so the nearest point in 3D is the nearest on
+# the sphere. The tree is stored implicitly: the node of a range of points is
+# the median of the range, and its children are the two halves.
+#
+# Each point carries the countries and regions of its timezone in
+# country_timezones.txt. Timezones without their own coordinates (e.g.
+# US/Pacific, Etc/UTC) are not indexed, because they would duplicate the
+# point of their Zone.
+#
+# Usage:
+# $ spatial_index.py
+#   [--k {n}]
+#   [--radius {km}]
+#   [--benchmark {n}]
+#   tzdb_dir country_timezones.txt
+#   [--] [lat,lon ...]
+#
+# prints the 'k' nearest timezones (default: 1) of each point, or the
+# timezones within the radius. If --benchmark is given, 'n' random points are
+# located using the index and using a linear scan, and the rates are printed.
+#
+# A point with a negative latitude looks like an option to argparse, so the
+# points must follow a '--' separator, e.g.
+# $ spatial_index.py ../tzdb country_timezones.txt -- -33.9,151.2
+
+from typing import Dict
+from typing import Iterable
+from typing import List
+from typing import NamedTuple
+from typing import Optional
+from typing import Sequence
+from typing import Tuple
+
+import argparse
+import heapq
+import math
+import os
+import random
+import time
+
+from .data_parser import parse_region_country_timezones
+from .errors import error
+from .extract_tzdb import parse_coordinates
+from .extract_tzdb import read_zone_tab
+
+# Mean radius of the Earth.
+EARTH_RADIUS_KM = 6371.0088
+
+Vector = Tuple[float, float, float]
+
+
+class ZonePoint(NamedTuple):
+    timezone: str
+    latitude: float  # degrees
+    longitude: float  # degrees
+    countries: Tuple[str, ...]  # country codes in country_timezones.txt
+    regions: Tuple[str, ...]  # region codes in country_timezones.txt
+
+
+class Match(NamedTuple):
+    point: ZonePoint
+    distance_km: float  # great-circle distance
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description='Find the nearest timezones of coordinates.')
+    parser.add_argument(
+        '--k', help='Number of nearest timezones (default: 1)', type=int,
+        default=1)
+    parser.add_argument(
+        '--radius', help='Find the timezones within the radius (km)',
+        type=float)
+    parser.add_argument(
+        '--benchmark', help='Number of random points to locate', type=int)
+    parser.add_argument('tzdb', help='Directory of raw TZDB files')
+    parser.add_argument('timezones', help='country_timezones.txt file')
+    parser.add_argument(
+        'points', nargs='*',
+        help="lat,lon in degrees, after '--' if a latitude is negative")
+    args = parser.parse_args()
+
+    index = SpatialIndex(read_zone_points(args.tzdb, args.timezones))
+    for arg in args.points:
+        latitude, longitude = parse_point(arg)
+        if args.radius is not None:
+            matches = index.within(latitude, longitude, args.radius)
+        else:
+            matches = index.nearest(latitude, longitude, args.k)
+        print(f"{arg}:")
+        for match in matches:
+            point = match.point
+            print(
+                f"  {point.timezone} {','.join(point.countries)} "
+                f"{','.join(point.regions)} {match.distance_km:.1f} km")
+
+    if args.benchmark:
+        run_benchmark(index, args.benchmark)
+
+
+def parse_point(arg: str) -> Tuple[float, float]:
+    try:
+        latitude, longitude = (float(s) for s in arg.split(','))
+    except ValueError:
+        error(f"Invalid point '{arg}', expected lat,lon")
+    return latitude, longitude
+
+
+def run_benchmark(index: 'SpatialIndex', size: int) -> None:
+    rnd = random.Random(size)
+    points = [
+        (math.degrees(math.asin(rnd.uniform(-1, 1))), rnd.uniform(-180, 180))
+        for _ in range(size)
+    ]
+
+    start = time.perf_counter()
+    matches = index.nearest_batch(points)
+    elapsed = time.perf_counter() - start
+    print(f"k-d tree: {size / elapsed:.0f} points/s")
+
+    start = time.perf_counter()
+    expected = [linear_nearest(index.points, lat, lon) for lat, lon in points]
+    elapsed = time.perf_counter() - start
+    print(f"linear scan: {size / elapsed:.0f} points/s")
+
+    assert all(
+        math.isclose(m[0].distance_km, e.distance_km, abs_tol=1e-6)
+        for m, e in zip(matches, expected)
+    )
+
+# -----------------------------------------------------------------------------
+
+
+def read_zone_points(tzdb_dir: str, filename: str) -> List[ZonePoint]:
+    """Return the point of each timezone of country_timezones.txt which has
+    coordinates in zone.tab or zone1970.tab.
+    """
+    coordinates: Dict[str, str] = {}
+    for tab in ['zone1970.tab', 'zone.tab']:
+        for record in read_zone_tab(os.path.join(tzdb_dir, tab)):
+            coordinates[record.timezone] = record.coordinates
+
+    countries: Dict[str, Dict[str, None]] = {}
+    regions: Dict[str, Dict[str, None]] = {}
+    for row in parse_region_country_timezones(filename):
+        countries.setdefault(row.timezone, {})[row.country] = None
+        regions.setdefault(row.timezone, {})[row.region] = None
+
+    points = []
+    for timezone in countries:
+        coordinate = coordinates.get(timezone)
+        if coordinate is None:
+            continue
+        latitude, longitude = parse_coordinates(coordinate)
+        points.append(ZonePoint(
+            timezone, latitude, longitude,
+            tuple(countries[timezone]), tuple(regions[timezone])))
+    return points
+
+
+def to_vector(latitude: float, longitude: float) -> Vector:
+    lat = math.radians(latitude)
+    lon = math.radians(longitude)
+    return (
+        math.cos(lat) * math.cos(lon),
+        math.cos(lat) * math.sin(lon),
+        math.sin(lat),
+    )
+
+
+def chord_to_km(chord: float) -> float:
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, chord / 2))
+
+
+def km_to_chord(km: float) -> float:
+    return 2 * math.sin(min(math.pi, km / EARTH_RADIUS_KM) / 2)
+
+
+def linear_nearest(
+    points: Sequence[ZonePoint],
+    latitude: float,
+    longitude: float,
+) -> Match:
+    """Return the nearest of 'points' by comparing all of them, using the
+    haversine formula. Used to verify the SpatialIndex.
+    """
+    lat = math.radians(latitude)
+    best: Optional[Match] = None
+    for point in points:
+        plat = math.radians(point.latitude)
+        dlat = plat - lat
+        dlon = math.radians(point.longitude - longitude)
+        h = (
+            math.sin(dlat / 2) ** 2
+            + math.cos(lat) * math.cos(plat) * math.sin(dlon / 2) ** 2
+        )
+        distance = 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(h)))
+        if best is None or distance < best.distance_km:
+            best = Match(point, distance)
+    assert best is not None
+    return best
+
+# -----------------------------------------------------------------------------
+
+
+class SpatialIndex:
+    """A k-d tree over the unit vectors of 'points'. The node of the range
+    [lo, hi) of the reordered points is at (lo + hi) // 2, and splits the
+    range along the axis of largest spread.
+    """
+    __slots__ = ['points', 'vectors', 'axes']
+
+    def __init__(self, points: Iterable[ZonePoint]):
+        items = [(to_vector(p.latitude, p.longitude), p) for p in points]
+        self.axes = [0] * len(items)
+
+        stack = [(0, len(items))]
+        while stack:
+            lo, hi = stack.pop()
+            if hi - lo <= 1:
+                continue
+            spreads = [
+                max(v[a] for v, _ in items[lo:hi])
+                - min(v[a] for v, _ in items[lo:hi])
+                for a in range(3)
+            ]
+            axis = spreads.index(max(spreads))
+            items[lo:hi] = sorted(items[lo:hi], key=lambda i: i[0][axis])
+            mid = (lo + hi) // 2
+            self.axes[mid] = axis
+            stack.append((lo, mid))
+            stack.append((mid + 1, hi))
+
+        self.vectors: List[Vector] = [v for v, _ in items]
+        self.points: List[ZonePoint] = [p for _, p in items]
+
+    def search(
+        self,
+        query: Vector,
+        k: Optional[int],
+        max_chord: float,
+    ) -> List[Tuple[float, int]]:
+        """Return the (squared chord, index) of the 'k' nearest points within
+        'max_chord' of 'query', or of all of them if 'k' is None, nearest
+        first.
+        """
+        vectors = self.vectors
+        axes = self.axes
+        qx, qy, qz = query
+        bound = max_chord * max_chord
+
+        # Max-heap of the best (negated squared chord, index) so far.
+        heap: List[Tuple[float, int]] = []
+        stack = [(0, len(vectors), 0.0)]
+        while stack:
+            lo, hi, plane = stack.pop()
+            if lo >= hi or plane > bound:
+                continue
+            mid = (lo + hi) // 2
+            x, y, z = vectors[mid]
+            d2 = (qx - x) ** 2 + (qy - y) ** 2 + (qz - z) ** 2
+            if d2 <= bound:
+                if k is None or len(heap) < k:
+                    heapq.heappush(heap, (-d2, mid))
+                else:
+                    heapq.heappushpop(heap, (-d2, mid))
+                if k is not None and len(heap) == k:
+                    bound = -heap[0][0]
+
+            diff = query[axes[mid]] - vectors[mid][axes[mid]]
+            if diff < 0:
+                stack.append((mid + 1, hi, diff * diff))
+                stack.append((lo, mid, 0.0))
+            else:
+                stack.append((lo, mid, diff * diff))
+                stack.append((mid + 1, hi, 0.0))
+        return sorted((-d2, i) for d2, i in heap)
+
+    def matches(self, found: List[Tuple[float, int]]) -> List[Match]:
+        return [
+            Match(self.points[i], chord_to_km(math.sqrt(d2)))
+            for d2, i in found
+        ]
+
+    def nearest(
+        self,
+        latitude: float,
+        longitude: float,
+        k: int = 1,
+    ) -> List[Match]:
+        """Return the 'k' nearest timezones of the point, nearest first."""
+        return self.matches(
+            self.search(to_vector(latitude, longitude), k, 2.0))
+
+    def within(
+        self,
+        latitude: float,
+        longitude: float,
+        radius_km: float,
+    ) -> List[Match]:
+        """Return the timezones within 'radius_km' of the point, nearest
+        first.
+        """
+        return self.matches(self.search(
+            to_vector(latitude, longitude), None, km_to_chord(radius_km)))
+
+    def nearest_batch(
+        self,
+        points: Iterable[Tuple[float, float]],
+        k: int = 1,
+    ) -> List[List[Match]]:
+        """Return the nearest() of each (latitude, longitude)."""
+        return [self.nearest(lat, lon, k) for lat, lon in points]
+
+    def within_batch(
+        self,
+        points: Iterable[Tuple[float, float]],
+        radius_km: float,
+    ) -> List[List[Match]]:
+        """Return the within() of each (latitude, longitude)."""
+        chord = km_to_chord(radius_km)
+        return [
+            self.matches(self.search(to_vector(lat, lon), None, chord))
+            for lat, lon in points
+        ]
+
+# -----------------------------------------------------------------------------
+
+
+if __name__ == '__main__':
+    main()
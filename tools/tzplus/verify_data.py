@@ -0,0 +1,960 @@
+# Validate various data files under data/
+#
+# Usage:
+# $ verify_data.py
+#   --zones {file}
+#   --links {file}
+#   --classified_zones {file}
+#   --classified_links {file}
+#   --iso_orig {file}
+#   --iso_long {file}
+#   --iso_short {file}
+#   --regions {file}
+#   [--region_country_timezones country_timezones.txt]
+#   [--country_timezones geonames.txt]
+#   [--cache {file}]
+#   [--profile {file}]
+#   [--keep_going]
+#   [--jobs {n}]
+#   [--report {file}]
+#
+# If --profile is given, the wall time and memory of each read_*() and
+# check_*() stage is printed on stderr, and written as JSON to the file.
+#
+# Normally the first failed check exits. If --keep_going is given, every check
+# is run, each reports all of its failures, and the script exits once at the
+# end with a report of all of them. If --jobs is greater than 1, the checks
+# run concurrently in that many worker processes, while the remaining files
+# are read (implies --keep_going). If --report is given, the failures are also
+# written as JSON to the file.
+
+
+from typing import Any
+from typing import Callable
+from typing import Dict
+from typing import List
+from typing import Optional
+from typing import Set
+from typing import TextIO
+from typing import Tuple
+from typing import TypeVar
+from typing import NamedTuple
+
+# from pprint import pp
+import argparse
+import hashlib
+import json
+import pickle
+import sys
+from .data_parser import iter_file_blocks
+from .errors import collect
+from .errors import error
+from .profiler import Profiler
+
+
+# Both Zones and Links are stored in a Dict[str, Entry], where the Entry
+# tracks the meta property of the zone or link.
+#
+# * Zones (target == None)
+#   * Zone name
+#   * ZoneObsolete name
+# * Links
+#   * Alias target link
+#   * Similar target link
+#   * Obsolete target link
+class Entry(NamedTuple):
+    target: Optional[str]  # Set to None for zones
+    tag: str  # 'Zone', 'ZoneObsolete', 'Alias', 'Similar', 'Obsolete'
+
+
+# ISO country to [timezones].
+CountryTimezones = Dict[str, List[str]]
+
+# Region to [timezones].
+RegionTimezones = Dict[str, List[str]]
+
+# Valid tags of zones.txt and links.txt.
+ZONE_TAGS = {'Zone', 'ZoneObsolete'}
+LINK_TAGS = {'Link', 'Alias', 'Alternate', 'Similar', 'Obsolete'}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description='Generate Country Code to Time Zone.')
+    parser.add_argument('--zones', help='File of zones', required=True)
+    parser.add_argument('--links', help='File of links', required=True)
+    parser.add_argument(
+        '--classified_zones',
+        help='File of classified zones',
+        required=True)
+    parser.add_argument(
+        '--classified_links',
+        help='File of classified links',
+        required=True)
+    parser.add_argument(
+        '--iso_orig',
+        help='Original ISO countries',
+        required=True)
+    parser.add_argument(
+        '--iso_long',
+        help='Long country names',
+        required=True)
+    parser.add_argument(
+        '--iso_short',
+        help='Short country names',
+        required=True)
+    parser.add_argument(
+        '--regions',
+        help='Region names',
+        required=True)
+    parser.add_argument(
+        '--region_country_timezones',
+        help='Region-Country-Timezone file')
+    parser.add_argument(
+        '--country_timezones',
+        help='Country-Timezone file')
+    parser.add_argument(
+        '--cache',
+        help='Cache of parsed files and passed checks, for incremental runs')
+    parser.add_argument(
+        '--profile',
+        help='Write the time and memory of each stage to this JSON file')
+    parser.add_argument(
+        '--keep_going',
+        help='Run every check and report all failures, instead of exiting on '
+        'the first one',
+        action='store_true')
+    parser.add_argument(
+        '--jobs',
+        help='Number of worker processes for the checks (default: 1)',
+        type=int,
+        default=1)
+    parser.add_argument(
+        '--report',
+        help='Write the failures of --keep_going to this JSON file')
+    args = parser.parse_args()
+    if not args.region_country_timezones and not args.country_timezones:
+        error(
+            "Must provide one of "
+            "--region_country_timezones or --country_timezones")
+
+    # Configure logging
+    # logging.basicConfig(level=logging.INFO)
+
+    profiler = Profiler(enabled=bool(args.profile))
+    runner: Optional[CheckRunner] = None
+    if args.keep_going or args.jobs > 1 or args.report:
+        runner = CheckRunner(args.jobs)
+    cache = VerifyCache(args.cache, profiler, runner)
+    failures: List[CheckFailure] = []
+    try:
+        verify(args, cache)
+        failures = cache.finish()
+    finally:
+        cache.save()
+        if runner:
+            runner.close()
+    if args.profile:
+        profiler.stop()
+        profiler.print_summary()
+        profiler.write_json(args.profile)
+
+    if runner:
+        print_failures(failures)
+        if args.report:
+            write_report(args.report, failures)
+        if failures:
+            sys.exit(1)
+
+
+def verify(args: argparse.Namespace, cache: 'VerifyCache') -> None:
+    """Read and check the files given by 'args', skipping the checks which
+    already passed for the same file contents according to the 'cache'.
+    """
+    # Read and check zones.
+    zones = cache.read(read_zones, args.zones)
+    classified_zones = cache.read(read_zones, args.classified_zones)
+    cache.check(
+        [args.zones, args.classified_zones],
+        check_zones, args.zones, zones, classified_zones)
+
+    # Read and check links.
+    links = cache.read(read_links, args.links)
+    cache.check([args.links], check_cycle, args.links, links)
+    classified_links = cache.read(read_links, args.classified_links)
+    cache.check(
+        [args.classified_links],
+        check_cycle, args.classified_links, classified_links)
+    cache.check(
+        [args.links, args.classified_links],
+        check_links, args.links, links, classified_links)
+    cache.check(
+        [args.classified_links, args.links, args.zones],
+        check_link_targets, classified_links, links, zones)
+
+    # Read and check ISO countries.
+    iso_orig = cache.read(read_countries, args.iso_orig)
+    iso_long = cache.read(read_countries, args.iso_long)
+    iso_short = cache.read(read_countries, args.iso_short)
+    cache.check(
+        [args.iso_orig, args.iso_long, args.iso_short],
+        check_iso_names,
+        args.iso_orig, args.iso_long, args.iso_short,
+        iso_orig, iso_long, iso_short)
+
+    # Read regions
+    regions = cache.read(read_regions, args.regions)
+
+    # Print summary of input files.
+    max_long_country = max([len(v) for v in iso_long.values()])
+    max_short_country = max([len(v) for v in iso_short.values()])
+    max_region = max([len(v) for v in regions.values()])
+    print(f"{args.zones}: {len(zones)}")
+    print(f"{args.links}: {len(links)}")
+    print(f"{args.classified_zones}: {len(classified_zones)}")
+    print(f"{args.classified_links}: {len(classified_links)}")
+    print(f"{args.iso_long}: {len(iso_long)}, maxlen: {max_long_country}")
+    print(f"{args.iso_short}: {len(iso_short)}, maxlen: {max_short_country}")
+    print(f"{args.regions}: {len(regions)}, maxlen: {max_region}")
+
+    if args.region_country_timezones:
+        # Read and check region_country_timezones.txt.
+        country_timezones, region_timezones = cache.read(
+            read_region_country_timezones, args.region_country_timezones)
+        cache.check(
+            [args.region_country_timezones, args.iso_short],
+            check_countries,
+            args.region_country_timezones, country_timezones, iso_short)
+        cache.check(
+            [args.region_country_timezones, args.regions],
+            check_regions,
+            args.region_country_timezones, region_timezones, regions)
+        cache.check(
+            [
+                args.region_country_timezones, args.classified_zones,
+                args.classified_links,
+            ],
+            check_timezones,
+            args.region_country_timezones, country_timezones, classified_zones,
+            classified_links)
+
+        num_countries = len(country_timezones)
+        num_timezones = sum([
+            len(entry)
+            for entry in country_timezones.values()
+        ])
+
+        # Print region_country_timezones summary.
+        num_regions = len(region_timezones)
+        print(
+            f"{args.region_country_timezones}: "
+            f"regions={num_regions}, "
+            f"countries={num_countries}, "
+            f"timezones={num_timezones}"
+        )
+
+        # Print timezones with multiple countries.
+        poly_timezones = cache.profiler.call(
+            'get_poly_timezones', get_poly_timezones, country_timezones)
+        if poly_timezones:
+            print("Timezones with multiple countries:")
+            for timezone, countries in poly_timezones.items():
+                print(f"  {timezone}: {countries}")
+    else:
+        # Read and verify the country-timezone file
+        country_timezones = cache.read(
+            read_country_timezones, args.country_timezones)
+        cache.check(
+            [args.country_timezones, args.iso_short],
+            check_countries,
+            args.country_timezones, country_timezones, iso_short)
+        cache.check(
+            [
+                args.country_timezones, args.classified_zones,
+                args.classified_links,
+            ],
+            check_timezones,
+            args.country_timezones, country_timezones, classified_zones,
+            classified_links)
+
+        num_countries = len(country_timezones)
+        num_timezones = sum([
+            len(entry)
+            for entry in country_timezones.values()
+        ])
+
+        # Print summary
+        print(
+            f"{args.country_timezones}: "
+            f"countries={num_countries}, "
+            f"timezones={num_timezones}"
+        )
+
+# -----------------------------------------------------------------------------
+
+
+T = TypeVar('T')
+
+
+class VerifyCache:
+    """Persistent cache of the parsed input files, and of the checks which
+    passed, keyed by the SHA-256 of their input files and of the code which
+    reads and checks them (this script, data_parser.py, profiler.py). A
+    check is re-run only if one of its input files changed since it last
+    passed. Failed checks are never cached. If 'filename' is None, nothing
+    is cached.
+
+    The readers and checkers which actually run are recorded as stages of the
+    'profiler'. Cache hits are not recorded.
+
+    If a 'runner' is given, the checks are passed to it instead of being called
+    directly, and finish() returns their failures. A check is cached only if
+    it had no failures.
+    """
+
+    VERSION = 1
+
+    def __init__(
+        self,
+        filename: Optional[str],
+        profiler: Optional[Profiler] = None,
+        runner: Optional['CheckRunner'] = None,
+    ) -> None:
+        self.filename = filename
+        self.profiler = profiler if profiler else Profiler(enabled=False)
+        self.runner = runner
+        self.hashes: Dict[str, str] = {}  # filename -> sha256
+
+        # {(reader, sha256) -> table} and {(check, sha256, ...)} loaded from
+        # the cache file.
+        self.old_tables: Dict[Tuple[str, str], Any] = {}
+        self.old_passed: Set[Tuple[str, ...]] = set()
+
+        # Entries used in this run, which are saved back to the cache file.
+        self.tables: Dict[Tuple[str, str], Any] = {}
+        self.passed: Set[Tuple[str, ...]] = set()
+
+        if not filename:
+            return
+        self.script_hash = self.source_hash()
+        try:
+            with open(filename, 'rb') as f:
+                data = pickle.load(f)
+            if data['version'] == (self.VERSION, self.script_hash):
+                self.old_tables = data['tables']
+                self.old_passed = data['passed']
+        except Exception:
+            # Missing, corrupt, or incompatible cache file.
+            pass
+
+    def source_hash(self) -> str:
+        """Return the SHA-256 of the modules which build the cached tables
+        and run the cached checks, so that a change of the code invalidates
+        the cache.
+        """
+        modules = [
+            sys.modules[__name__],
+            sys.modules[iter_file_blocks.__module__],
+            sys.modules[Profiler.__module__],
+        ]
+        digest = hashlib.sha256()
+        for module in modules:
+            digest.update(self.hash(module.__file__ or '').encode('ascii'))
+        return digest.hexdigest()
+
+    def hash(self, filename: str) -> str:
+        """Return the SHA-256 of the content of 'filename'."""
+        digest = self.hashes.get(filename)
+        if digest is None:
+            with open(filename, 'rb') as f:
+                digest = hashlib.sha256(f.read()).hexdigest()
+            self.hashes[filename] = digest
+        return digest
+
+    def read(self, reader: Callable[[str], T], filename: str) -> T:
+        """Return reader(filename), or its cached result."""
+        name = f"{reader.__name__}({filename})"
+        if not self.filename:
+            return self.profiler.call(name, reader, filename)
+        key = (reader.__name__, self.hash(filename))
+        if key in self.old_tables:
+            table: T = self.old_tables[key]
+        else:
+            table = self.profiler.call(name, reader, filename)
+        self.tables[key] = table
+        return table
+
+    def check(
+        self,
+        filenames: List[str],
+        checker: Callable[..., None],
+        *args: Any,
+    ) -> None:
+        """Call checker(*args), unless it already passed with the same
+        content of its input 'filenames'.
+        """
+        name = f"{checker.__name__}({filenames[0]})"
+        key: Optional[Tuple[str, ...]] = None
+        if self.filename:
+            key = (checker.__name__,) + tuple(self.hash(f) for f in filenames)
+            if key in self.old_passed:
+                self.passed.add(key)
+                return
+        if self.runner:
+            self.runner.submit(self.profiler, name, key, checker, *args)
+            return
+        self.profiler.call(name, checker, *args)
+        if key:
+            self.passed.add(key)
+
+    def finish(self) -> List['CheckFailure']:
+        """Wait for the checks passed to the 'runner', and return their
+        failures. Return [] if there is no runner.
+        """
+        if not self.runner:
+            return []
+        results = self.profiler.call('wait_checks', self.runner.wait)
+        failures: List[CheckFailure] = []
+        for key, check_failures in results:
+            if check_failures:
+                failures.extend(check_failures)
+            elif key:
+                self.passed.add(key)
+        return failures
+
+    def save(self) -> None:
+        """Write the tables and checks used in this run to the cache file."""
+        if not self.filename:
+            return
+        data = {
+            'version': (self.VERSION, self.script_hash),
+            'tables': self.tables,
+            'passed': self.passed,
+        }
+        with open(self.filename, 'wb') as f:
+            pickle.dump(data, f, protocol=pickle.HIGHEST_PROTOCOL)
+
+# -----------------------------------------------------------------------------
+
+
+class CheckFailure(NamedTuple):
+    check: str  # e.g. 'check_zones(zones.txt)'
+    message: str
+    items: List[str]
+
+
+def collect_errors(
+    name: str,
+    checker: Callable[..., None],
+    *args: Any,
+) -> List[CheckFailure]:
+    """Call checker(*args), and return every failure reported through
+    error() by the check named 'name', instead of exiting on the first one.
+    An exception raised by the checker is returned as a failure too.
+    """
+    return [
+        CheckFailure(name, msg, items)
+        for msg, items in collect(checker, *args)
+    ]
+
+
+CheckResult = Tuple[Optional[Tuple[str, ...]], List[CheckFailure]]
+
+
+class CheckRunner:
+    """Run checks through collect_errors(), in 'jobs' worker processes, or in
+    this process if 'jobs' is 1. The checks are independent once their input
+    files are parsed, so they can run while the next files are read.
+    """
+
+    def __init__(self, jobs: int = 1) -> None:
+        self.executor: Any = None
+        if jobs > 1:
+            # Imported here, because it doubles the import time of this
+            # module, which is imported by most of the other tools.
+            from concurrent.futures import ProcessPoolExecutor
+            self.executor = ProcessPoolExecutor(max_workers=jobs)
+        # (cache key, function returning the failures) of each check, in the
+        # order of submit().
+        self.results: List[Tuple[
+            Optional[Tuple[str, ...]], Callable[[], List[CheckFailure]]
+        ]] = []
+
+    def submit(
+        self,
+        profiler: Profiler,
+        name: str,
+        key: Optional[Tuple[str, ...]],
+        checker: Callable[..., None],
+        *args: Any,
+    ) -> None:
+        """Run checker(*args) named 'name'. The 'key' is returned with its
+        failures by wait(). Only the checks run in this process are recorded
+        by the 'profiler'.
+        """
+        if self.executor:
+            future = self.executor.submit(collect_errors, name, checker, *args)
+            self.results.append((key, future.result))
+        else:
+            failures = profiler.call(
+                name, collect_errors, name, checker, *args)
+            self.results.append((key, lambda: failures))
+
+    def wait(self) -> List[CheckResult]:
+        """Return the (key, failures) of every check submitted so far, in the
+        order of submission.
+        """
+        results = [(key, result()) for key, result in self.results]
+        self.results = []
+        return results
+
+    def close(self) -> None:
+        if self.executor:
+            self.executor.shutdown(cancel_futures=True)
+            self.executor = None
+
+
+def print_failures(failures: List[CheckFailure]) -> None:
+    """Print the failures grouped by check."""
+    if not failures:
+        print("All checks passed")
+        return
+    checks: Dict[str, List[CheckFailure]] = {}
+    for failure in failures:
+        checks.setdefault(failure.check, []).append(failure)
+    print(f"FAILED: {len(failures)} errors in {len(checks)} checks")
+    for check, check_failures in checks.items():
+        print(f"{check}:")
+        for failure in check_failures:
+            print(f"  {failure.message}")
+            for item in failure.items:
+                print(f"    {item}")
+
+
+def write_report(filename: str, failures: List[CheckFailure]) -> None:
+    with open(filename, 'w', encoding='utf-8') as f:
+        json.dump(
+            {'failures': [failure._asdict() for failure in failures]},
+            f, indent=2)
+        f.write('\n')
+
+# -----------------------------------------------------------------------------
+
+
+def read_zones(filename: str) -> Dict[str, Entry]:
+    """Read Zone records of the form:
+        Zone|ZoneObsolete zone_name
+    and return:
+        {zone_name -> {target, tag}}
+    where
+        tag: Zone|ZoneObsolete
+    """
+    zones: Dict[str, Entry] = {}
+    # The entries of the zones are immutable, and shared by tag.
+    entries = {tag: Entry(None, tag) for tag in ZONE_TAGS}
+    for lines in iter_file_blocks(filename):
+        for line in lines:
+            tokens = line.split()
+            entry = entries.get(tokens[0])
+            if entry is None:
+                error(f"Invalid Zone tag '{tokens[0]}'")
+            assert entry is not None
+            zones[tokens[1]] = entry
+    return zones
+
+
+def read_links(filename: str) -> Dict[str, Entry]:
+    """Read Link records of the form:
+        (Link|Alias|Similar|Obsolete) source target
+    and return:
+        {target -> {source, tag}}
+    where
+        tag: Link|Alias|Similar|Obsolete
+    """
+    links: Dict[str, Entry] = {}
+    for lines in iter_file_blocks(filename):
+        for line in lines:
+            tokens = line.split()
+            tag = tokens[0]
+            if tag not in LINK_TAGS:
+                error(f"Invalid Link tag '{tag}'")
+            links[tokens[2]] = Entry(tokens[1], tag)
+    return links
+
+
+def read_countries(filename: str) -> Dict[str, str]:
+    """{code -> country name}"""
+    countries: Dict[str, str] = {}
+    for lines in iter_file_blocks(filename):
+        for line in lines:
+            countries[line[0:2]] = line[2:].strip()
+    return countries
+
+
+def read_regions(filename: str) -> Dict[str, str]:
+    """{regionCode -> regionName}"""
+    regions: Dict[str, str] = {}
+    for lines in iter_file_blocks(filename):
+        for line in lines:
+            code = line.split(None, 1)[0]
+            regions[code] = line[len(code):].strip()
+    return regions
+
+
+def read_region_country_timezones(
+    filename: str
+) -> Tuple[CountryTimezones, RegionTimezones]:
+    """Read {region country_code timezone} triplets"""
+    country_timezones: CountryTimezones = {}
+    region_timezones: RegionTimezones = {}
+    for lines in iter_file_blocks(filename):
+        for line in lines:
+            region, country, timezone = line.split()[:3]
+            # Add to country->timezones
+            timezones = country_timezones.get(country)
+            if timezones is None:
+                country_timezones[country] = [timezone]
+            else:
+                timezones.append(timezone)
+
+            # Add to region->timezones
+            timezones = region_timezones.get(region)
+            if timezones is None:
+                region_timezones[region] = [timezone]
+            else:
+                timezones.append(timezone)
+
+    return country_timezones, region_timezones
+
+
+def read_country_timezones(filename: str) -> CountryTimezones:
+    """Read {country_code timezone}"""
+    country_timezones: CountryTimezones = {}
+    for lines in iter_file_blocks(filename):
+        for line in lines:
+            country, timezone = line.split()[:2]
+            # Add to country->timezones
+            timezones = country_timezones.get(country)
+            if timezones is None:
+                country_timezones[country] = [timezone]
+            else:
+                timezones.append(timezone)
+
+    return country_timezones
+
+
+def read_line(input: TextIO) -> Optional[str]:
+    """Return the next non-comment line. Return None if EOF reached. This
+    reads one line at a time; data_parser.iter_lines() is faster for whole
+    files.
+
+    * Comment lines begin with a '#' character and are skipped.
+    * Blank lines are skipped.
+    * Trailing whitespaces are stripped.
+    * Leading whitespaces are kepted.
+    """
+    while True:
+        line = input.readline()
+
+        # EOF returns ''. An empty line returns '\n'.
+        if line == '':
+            return None
+
+        # remove trailing comments
+        i = line.find('#')
+        if i >= 0:
+            line = line[:i]
+
+        # strip any trailing whitespaces
+        line = line.rstrip()
+
+        # skip any blank lines after stripping
+        if not line:
+            continue
+
+        return line
+
+# -----------------------------------------------------------------------------
+
+
+def check_zones(
+    filename: str,
+    zones: Dict[str, Entry],
+    classified_zones: Dict[str, Entry],
+) -> None:
+    """Check that classified_zones and zones have identical entries."""
+    if zones.keys() != classified_zones.keys():
+        extra = classified_zones.keys() - zones.keys()
+        if extra:
+            error(f"Extra zones in {filename}", extra)
+
+        missing = zones.keys() - classified_zones.keys()
+        if missing:
+            error(f"Missing zones in {filename}", missing)
+
+
+def check_links(
+    filename: str,
+    links: Dict[str, Entry],
+    classified_links: Dict[str, Entry],
+) -> None:
+    """Check that classified_links and links have identical entries."""
+    if links.keys() != classified_links.keys():
+        extra = classified_links.keys() - links.keys()
+        if extra:
+            error(f"Extra links in {filename}", extra)
+
+        missing = links.keys() - classified_links.keys()
+        if missing:
+            error(f"Missing links in {filename}", missing)
+
+
+def check_link_targets(
+    classified_links: Dict[str, Entry],
+    links: Dict[str, Entry],
+    zones: Dict[str, Entry]
+) -> None:
+    """Check that every Link target in classified_links is an existing Link or
+    Zone. This checks for typos.
+    """
+    for link, entry in classified_links.items():
+        if entry.target not in links and entry.target not in zones:
+            error(f"Invalid Link target '{entry.target}'")
+
+
+def check_iso_names(
+    filename_orig: str,
+    filename_long: str,
+    filename_short: str,
+    iso_orig: Dict[str, str],
+    iso_long: Dict[str, str],
+    iso_short: Dict[str, str],
+) -> None:
+    # Collect expected ISO codes
+    expected = set(iso_orig.keys())
+    expected.add('00')
+
+    # Verify iso3166_long.txt matches expection.
+    observed = set(iso_long)
+    if expected != observed:
+        missing = expected - observed
+        if missing:
+            error(f"Missing countries in {filename_long}", missing)
+        extra = observed - expected
+        if extra:
+            error(f"Extra countries in {filename_long}", extra)
+
+    # Verify iso3166_short.txt matches expection.
+    observed = set(iso_short)
+    if expected != observed:
+        missing = expected - observed
+        if missing:
+            error(f"Missing countries in {filename_short}", missing)
+        extra = observed - expected
+        if extra:
+            error(f"Extra countries in {filename_short}", extra)
+
+    # Check the maximum length of the ISO country short names.
+    MAX_ISO_SHORT_LEN = 13
+    max_len = max([len(x) for x in iso_short.values()])
+    if max_len > MAX_ISO_SHORT_LEN:
+        error(f"ISO short names len ({max_len}) > {MAX_ISO_SHORT_LEN}")
+
+
+def check_countries(
+    filename: str,
+    country_timezones: CountryTimezones,
+    countries: Dict[str, str],
+) -> None:
+    # Expected ISO countries, with the exception of (BV and HM) which
+    # don't have timezone because there are uninhabited.
+    expected = set(countries.keys())
+    expected.remove('BV')
+    expected.remove('HM')
+    expected.discard('00')  # fake country '00' is not required
+
+    # Observed ISO countries in the country_timezones map.
+    observed = set(country_timezones.keys())
+    observed.discard('00')  # fake country '00' is not required
+
+    if expected != observed:
+        # Check that each ISO countries has at least one timezone.
+        missing = expected - observed
+        if missing:
+            error(f"Missing countries in {filename}", missing)
+
+        # Check that every timezone country exists in the ISO country file.
+        extra = observed - expected
+        if extra:
+            error(f"Extra countries in {filename}", extra)
+
+
+def check_regions(
+    filename: str,
+    region_timezones: RegionTimezones,
+    regions: Dict[str, str],
+) -> None:
+    """Check that every region in country_timezones.txt is defined in
+    regions.txt.
+    """
+    expected = set(regions.keys())
+    observed = set(region_timezones.keys())
+    if expected != observed:
+        extra = observed - expected
+        if extra:
+            error(f"Extra regions in {filename}", extra)
+
+        missing = expected - observed
+        if missing:
+            error(f"Missing regions in {filename}", missing)
+
+
+def check_timezones(
+    filename: str,
+    country_timezones: CountryTimezones,
+    classified_zones: Dict[str, Entry],
+    classified_links: Dict[str, Entry],
+) -> None:
+    # Collect only 'Zone', 'Similar', and 'Alternate' timezones. They are the
+    # only timezones which should appear. 'Alias' and 'Obsolete' should not
+    # appear to avoid duplicates or old timezones.
+    expected: Set[str] = set()
+    expected.update([
+        name for name, entry in classified_zones.items()
+        if entry.tag == 'Zone'
+    ])
+    expected.update([
+        name for name, entry in classified_links.items()
+        if entry.tag in ['Similar', 'Alternate']
+    ])
+
+    # Collect the timezones which appear in country_timezones.txt.
+    observed: Set[str] = set()
+    for z in country_timezones.values():
+        observed.update(z)
+
+    # Check that they are equal.
+    if observed != expected:
+        extra = observed - expected
+        if extra:
+            error(f"Extra timezones in {filename}", extra)
+
+        missing = expected - observed
+        if missing:
+            error(f"Missing timezones from {filename}", missing)
+
+
+def get_poly_timezones(
+    country_timezones: CountryTimezones,
+) -> Dict[str, List[str]]:
+    """Return the timezones that belong to multiple countries."""
+    timezone_countries: Dict[str, List[str]] = {}  # timezone -> [countries]
+    for country, timezones in country_timezones.items():
+        for z in timezones:
+            countries = timezone_countries.get(z)
+            if not countries:
+                countries = []
+                timezone_countries[z] = countries
+            countries.append(country)
+    poly_timezones = {
+        k: v
+        for k, v in timezone_countries.items()
+        if len(v) > 1
+    }
+    return poly_timezones
+
+# -----------------------------------------------------------------------------
+
+
+def check_cycle(filename: str, links: Dict[str, Entry]) -> None:
+    resolver = LinkResolver(links)
+    for name, entry in links.items():
+        if resolver.has_cycle(name):
+            error(f"{filename}: Link cycle for '{name}' -> '{entry.target}'")
+
+
+def has_cycle(name: str, links: Dict[str, Entry]) -> bool:
+    """Determine if following the links from 'name' leads into a cycle."""
+    return LinkResolver(links).has_cycle(name)
+
+
+class LinkResolver:
+    """Resolve chains of links to their final Zone. Each link is visited only
+    once, no matter how many chains pass through it, because the final Zone
+    of every link on a chain is memoized when the end of the chain (or a
+    cycle) is reached. Resolving all links is therefore O(links), instead of
+    O(links * chain length).
+
+    In the links map, a name which is missing, or whose Entry.target is None,
+    is a Zone which terminates the chain.
+    """
+
+    def __init__(self, links: Dict[str, Entry]):
+        self.links = links
+
+        # link -> final zone, or None if the chain leads into a cycle
+        self.memo: Dict[str, Optional[str]] = {}
+
+        # Each cycle, listed in the order of the links.
+        self.cycles: List[List[str]] = []
+
+    def resolve(self, name: str) -> Optional[str]:
+        """Return the final Zone of 'name', or None if the chain starting at
+        'name' leads into a cycle. A Zone resolves to itself.
+        """
+        path: List[str] = []
+        on_path: Dict[str, int] = {}  # name -> index in path
+        node = name
+        while True:
+            if node in self.memo:
+                result = self.memo[node]
+                break
+            entry = self.links.get(node)
+            if entry is None or entry.target is None:
+                result = node
+                break
+            index = on_path.get(node)
+            if index is not None:
+                self.cycles.append(path[index:])
+                result = None
+                break
+            on_path[node] = len(path)
+            path.append(node)
+            node = entry.target
+
+        for p in path:
+            self.memo[p] = result
+        return result
+
+    def has_cycle(self, name: str) -> bool:
+        """Determine if the chain starting at 'name' leads into a cycle."""
+        return self.resolve(name) is None
+
+    def resolve_all(self) -> Dict[str, str]:
+        """Return the flattened {link -> final zone} map of every link which
+        does not lead into a cycle. The cycles are available in 'cycles'
+        afterwards.
+        """
+        targets: Dict[str, str] = {}
+        for name, entry in self.links.items():
+            if entry.target is None:
+                continue
+            target = self.resolve(name)
+            if target is not None:
+                targets[name] = target
+        return targets
+
+
+def link_resolver(links: Dict[str, str]) -> LinkResolver:
+    """Return the LinkResolver of the {link -> target} of the raw TZDB
+    files, e.g. Tzdb.links.
+    """
+    return LinkResolver({
+        name: Entry(target, 'Link') for name, target in links.items()
+    })
+
+# -----------------------------------------------------------------------------
+
+
+if __name__ == '__main__':
+    main()
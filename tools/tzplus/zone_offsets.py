@@ -0,0 +1,272 @@
+# Compute the UTC offsets of every timezone in country_timezones.txt from the
+# Zone and Rule lines of the raw TZDB files, and write them as a lookup table,
+# so that devices and servers can sort and label timezones by UTC offset
+# without a full timezone engine. For each timezone, the table contains:
+#
+#   * the standard offset,
+#   * the DST offset (equal to the standard offset if DST is not used),
+#   * whether DST is observed,
+#
+# in effect during the given year (default: the year of the TZDB version).
+# Zones with negative DST (e.g. Europe/Dublin, Africa/Casablanca) are
+# normalized so that the standard offset is the smaller one, which is the
+# convention of most other sources, including GeoNames. A Link resolves to
+# the offsets of its Zone.
+#
+# Usage:
+# $ zone_offsets.py
+#   [--year {year}]
+#   [--output {file}]
+#   [--geonames timeZones.txt]
+#   tzdb_dir country_timezones.txt
+#
+# If --geonames is given, the offsets are checked against the GeoNames file,
+# whose columns are the offsets on Jan 1 and Jul 1, and the standard offset.
+# The standard offsets must be equal, and the offsets on Jan 1 and Jul 1 must
+# be either the standard or the DST offset. (GeoNames cannot detect a DST
+# period which does not contain Jan 1 or Jul 1, like the Ramadan of
+# Morocco.) The differences are printed, and the exit status is 1 if there
+# are any.
+
+from typing import Dict
+from typing import List
+from typing import NamedTuple
+from typing import Optional
+from typing import TextIO
+from typing import Tuple
+
+import argparse
+import re
+import sys
+
+from .data_parser import iter_file_lines
+from .data_parser import parse_region_country_timezones
+from .errors import error
+from .extract_tzdb import RuleRecord
+from .extract_tzdb import Tzdb
+from .extract_tzdb import ZoneEra
+from .extract_tzdb import ZoneRecord
+from .extract_tzdb import load_tzdb
+from .extract_tzdb import parse_month
+from .extract_tzdb import parse_seconds
+from .extract_tzdb import read_version
+from .extract_tzdb import rule_years
+from .extract_tzdb import until_fields
+from .verify_data import link_resolver
+
+OFFSETS_HEADER = """\
+# UTC offsets of the timezones in country_timezones.txt, computed from the
+# Zone and Rule lines of TZDB {version} for the year {year}.
+#
+# DO NOT EDIT: This file was autogenerated by tools/zone_offsets.py.
+#
+# timezone std_offset dst_offset uses_dst
+
+"""
+
+
+class ZoneOffset(NamedTuple):
+    std_offset: int  # seconds
+    dst_offset: int  # seconds
+    uses_dst: bool
+
+
+class GeonamesOffset(NamedTuple):
+    january: int  # seconds, on Jan 1
+    july: int  # seconds, on Jul 1
+    raw: int  # seconds, standard offset
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description='Compute the UTC offsets of timezones from TZDB.')
+    parser.add_argument(
+        '--year',
+        help='Year of the offsets (default: year of TZDB version)',
+        type=int)
+    parser.add_argument('--output', help='Output file (default: stdout)')
+    parser.add_argument('--geonames', help='GeoNames timeZones.txt file')
+    parser.add_argument('tzdb', help='Directory of raw TZDB files')
+    parser.add_argument('timezones', help='country_timezones.txt file')
+    args = parser.parse_args()
+
+    version = read_version(args.tzdb)
+    year = args.year if args.year else int(version[:4])
+    tzdb = load_tzdb(args.tzdb)
+    timezones = sorted(set(
+        row.timezone for row in parse_region_country_timezones(args.timezones)
+    ))
+    offsets = compute_offsets(tzdb, timezones, year)
+
+    header = OFFSETS_HEADER.format(version=version, year=year)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            write_offsets(f, header, offsets)
+    else:
+        write_offsets(sys.stdout, header, offsets)
+
+    if args.geonames:
+        differences = check_geonames(offsets, read_geonames(args.geonames))
+        for timezone, expected, observed in differences:
+            print(
+                f"{timezone}: "
+                f"geonames=(std {format_offset(expected.raw)}, "
+                f"Jan {format_offset(expected.january)}, "
+                f"Jul {format_offset(expected.july)}), "
+                f"tzdb=(std {format_offset(observed.std_offset)}, "
+                f"dst {format_offset(observed.dst_offset)})",
+                file=sys.stderr)
+        if differences:
+            sys.exit(1)
+
+# -----------------------------------------------------------------------------
+
+
+def compute_offsets(
+    tzdb: Tzdb,
+    timezones: List[str],
+    year: int,
+) -> Dict[str, ZoneOffset]:
+    """Return the {timezone -> ZoneOffset} of each timezone in 'year'."""
+    resolver = link_resolver(tzdb.links)
+    offsets: Dict[str, ZoneOffset] = {}
+    for timezone in timezones:
+        zone_name = resolver.resolve(timezone)
+        zone = tzdb.zones.get(zone_name or '')
+        if zone is None:
+            error(f"Unknown timezone '{timezone}'")
+        assert zone is not None
+        offsets[timezone] = zone_offset(tzdb, zone, year)
+    return offsets
+
+
+def zone_offset(tzdb: Tzdb, zone: ZoneRecord, year: int) -> ZoneOffset:
+    """Return the offsets of 'zone' during 'year'."""
+    era = era_at_year(zone, year)
+    stdoff = parse_seconds(era.stdoff)
+    saves = era_saves(tzdb, era, year)
+    low = min(saves)
+    high = max(saves)
+
+    # A constant SAVE is permanent DST (or negative DST), not seasonal.
+    if low == high:
+        return ZoneOffset(stdoff + low, stdoff + low, False)
+
+    # Normalize negative DST, so that std_offset <= dst_offset.
+    return ZoneOffset(stdoff + min(low, 0), stdoff + max(high, 0), True)
+
+
+def era_at_year(zone: ZoneRecord, year: int) -> ZoneEra:
+    """Return the era of 'zone' in effect on Jan 1 of 'year'."""
+    for era in zone.eras:
+        if not era.until:
+            return era
+        until_year, month, day, time = until_fields(era.until)
+        if (until_year, month, day, parse_seconds(time)) > (year, 1, 1, 0):
+            return era
+    return zone.eras[-1]
+
+
+def era_saves(tzdb: Tzdb, era: ZoneEra, year: int) -> List[int]:
+    """Return the SAVE values of 'era' during 'year': the SAVE in effect at
+    the start of the year, and the SAVE of each Rule which fires in it.
+    """
+    if era.rules == '-':
+        return [0]
+    rules = tzdb.rules.get(era.rules)
+    if rules is None:
+        # A fixed amount of saved time.
+        return [parse_seconds(era.rules)]
+
+    saves: List[int] = []
+    latest: Optional[Tuple[int, int, RuleRecord]] = None
+    for rule in rules:
+        from_year, to_year = rule_years(rule)
+        if from_year <= year <= to_year:
+            saves.append(parse_seconds(rule.save))
+        elif to_year < year:
+            key = (to_year, parse_month(rule.in_month), rule)
+            if latest is None or key[:2] > latest[:2]:
+                latest = key
+    if latest is not None:
+        saves.append(parse_seconds(latest[2].save))
+    return saves if saves else [0]
+
+# -----------------------------------------------------------------------------
+
+
+def format_offset(seconds: int) -> str:
+    """Format an offset as [+-]hh:mm, or [+-]hh:mm:ss if needed."""
+    sign = '-' if seconds < 0 else '+'
+    minutes, secs = divmod(abs(seconds), 60)
+    hours, minutes = divmod(minutes, 60)
+    if secs:
+        return f"{sign}{hours:02}:{minutes:02}:{secs:02}"
+    return f"{sign}{hours:02}:{minutes:02}"
+
+
+def write_offsets(
+    output: TextIO,
+    header: str,
+    offsets: Dict[str, ZoneOffset],
+) -> None:
+    output.write(header)
+    for timezone, offset in sorted(offsets.items()):
+        output.write(
+            f"{timezone} {format_offset(offset.std_offset)} "
+            f"{format_offset(offset.dst_offset)} {int(offset.uses_dst)}\n")
+
+
+def read_offsets(filename: str) -> Dict[str, ZoneOffset]:
+    """Read the table written by write_offsets()."""
+    offsets: Dict[str, ZoneOffset] = {}
+    for line in iter_file_lines(filename):
+        timezone, std, dst, uses_dst = line.split()
+        offsets[timezone] = ZoneOffset(
+            parse_seconds(std.lstrip('+')),
+            parse_seconds(dst.lstrip('+')),
+            uses_dst == '1')
+    return offsets
+
+# -----------------------------------------------------------------------------
+
+
+def read_geonames(filename: str) -> Dict[str, GeonamesOffset]:
+    """Read the GeoNames timeZones.txt file, whose lines are:
+        CountryCode TimeZoneId GMT-Jan-1 DST-Jul-1 rawOffset
+    with the offsets in hours.
+    """
+    offsets: Dict[str, GeonamesOffset] = {}
+    for line in iter_file_lines(filename):
+        tokens = re.split(r'\t+', line)
+        january, july, raw = (round(float(t) * 3600) for t in tokens[2:5])
+        offsets[tokens[1]] = GeonamesOffset(january, july, raw)
+    return offsets
+
+
+def check_geonames(
+    offsets: Dict[str, ZoneOffset],
+    geonames: Dict[str, GeonamesOffset],
+) -> List[Tuple[str, GeonamesOffset, ZoneOffset]]:
+    """Return the (timezone, geonames, tzdb) offsets which disagree. The
+    timezones missing from GeoNames are skipped.
+    """
+    differences = []
+    for timezone, offset in sorted(offsets.items()):
+        expected = geonames.get(timezone)
+        if expected is None:
+            continue
+        observed = {offset.std_offset, offset.dst_offset}
+        if (
+            expected.raw != offset.std_offset
+            or expected.january not in observed
+            or expected.july not in observed
+        ):
+            differences.append((timezone, expected, offset))
+    return differences
+
+# -----------------------------------------------------------------------------
+
+
+if __name__ == '__main__':
+    main()
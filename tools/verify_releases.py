@@ -0,0 +1,307 @@
+#!/usr/bin/env python3
+#
+# Verify the classified data files against multiple TZDB releases, reading the
+# raw TZDB files directly from the git objects of a local clone of
+# https://github.com/eggert/tz, or from tzdata*.tar.gz archives, without
+# checking out or unpacking the releases. Each release is extracted and
+# verified in a separate worker process, and a combined report is printed.
+#
+# Usage:
+# $ verify_releases.py
+#   [--git {tz_repo}]
+#   [--data_dir {dir}]
+#   [--jobs {n}]
+#   release ...
+#
+# where each 'release' is a tag in the tz_repo if --git is given, otherwise
+# it is the path of a tzdata{version}.tar.gz file.
+#
+# Examples:
+# $ verify_releases.py --git ../tz --data_dir data 2023a 2023b 2023c
+# $ verify_releases.py --data_dir data ~/Downloads/tzdata2023*.tar.gz
+
+from typing import Callable
+from typing import Dict
+from typing import List
+from typing import NamedTuple
+from typing import Optional
+from typing import Tuple
+
+from concurrent.futures import ProcessPoolExecutor
+import argparse
+import io
+import os
+import re
+import subprocess
+import sys
+import tarfile
+
+from tzplus.data_parser import iter_lines
+from tzplus.data_parser import parse_country_lines
+from tzplus.errors import collect
+from tzplus.extract_tzdb import ALL_FILES
+from tzplus.extract_tzdb import MAIN_FILES
+from tzplus.extract_tzdb import LinkRecord
+from tzplus.extract_tzdb import ZoneRecord
+from tzplus.extract_tzdb import parse_lines
+from tzplus.verify_data import Entry
+from tzplus.verify_data import check_cycle
+from tzplus.verify_data import check_iso_names
+from tzplus.verify_data import check_link_targets
+from tzplus.verify_data import check_links
+from tzplus.verify_data import check_zones
+from tzplus.verify_data import read_countries
+from tzplus.verify_data import read_links
+from tzplus.verify_data import read_zones
+
+# Files read from each release, in addition to the raw Zone/Rule/Link files.
+ISO_FILE = 'iso3166.tab'
+
+
+class ReleaseSource(NamedTuple):
+    """Location of a TZDB release: either a tag in a git repo, or a tarball."""
+    name: str
+    repo: Optional[str] = None
+    tarball: Optional[str] = None
+
+
+class DataFiles(NamedTuple):
+    """The parsed data/ files which are verified against each release."""
+    classified_zones: Dict[str, Entry]
+    classified_links: Dict[str, Entry]
+    iso_long: Dict[str, str]
+    iso_short: Dict[str, str]
+
+
+# The (zones, links, iso_orig) of a release.
+ParsedRelease = Tuple[Dict[str, Entry], Dict[str, Entry], Dict[str, str]]
+
+
+class ReleaseReport(NamedTuple):
+    """Result of verifying a single release. Each failure is the name of the
+    check and its error output.
+    """
+    name: str
+    num_zones: int
+    num_links: int
+    failures: List[Tuple[str, str]]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description='Verify data files against multiple TZDB releases.')
+    parser.add_argument(
+        '--git',
+        help='Local git repo of the TZDB; releases are tags')
+    parser.add_argument(
+        '--data_dir',
+        help='Directory of classified data files',
+        default='.')
+    parser.add_argument(
+        '--jobs',
+        help='Number of worker processes (default: number of CPUs)',
+        type=int,
+        default=os.cpu_count() or 1)
+    parser.add_argument('releases', nargs='+', help='Tags or tarballs')
+    args = parser.parse_args()
+
+    if args.git:
+        sources = [ReleaseSource(tag, repo=args.git) for tag in args.releases]
+    else:
+        sources = [
+            ReleaseSource(release_name(path), tarball=path)
+            for path in args.releases
+        ]
+    data = read_data_files(args.data_dir)
+    reports = verify_releases(sources, data, args.jobs)
+
+    print_reports(reports)
+    if any(report.failures for report in reports):
+        sys.exit(1)
+
+
+def release_name(tarball: str) -> str:
+    """Return '2023c' for 'tzdata2023c.tar.gz'."""
+    m = re.search(r'tzdata(\w+)\.tar\.gz$', tarball)
+    return m.group(1) if m else os.path.basename(tarball)
+
+
+def read_data_files(data_dir: str) -> DataFiles:
+    return DataFiles(
+        classified_zones=read_zones(
+            os.path.join(data_dir, 'classified_zones.txt')),
+        classified_links=read_links(
+            os.path.join(data_dir, 'classified_links.txt')),
+        iso_long=read_countries(os.path.join(data_dir, 'iso3166_long.txt')),
+        iso_short=read_countries(os.path.join(data_dir, 'iso3166_short.txt')),
+    )
+
+
+def verify_releases(
+    sources: List[ReleaseSource],
+    data: DataFiles,
+    jobs: int = 1,
+) -> List[ReleaseReport]:
+    """Verify each release in 'sources', using 'jobs' worker processes. The
+    reports are returned in the same order as 'sources'.
+    """
+    if jobs <= 1 or len(sources) <= 1:
+        return [verify_release(source, data) for source in sources]
+    with ProcessPoolExecutor(max_workers=min(jobs, len(sources))) as executor:
+        return list(executor.map(
+            verify_release, sources, [data] * len(sources)))
+
+
+def print_reports(reports: List[ReleaseReport]) -> None:
+    for report in reports:
+        status = 'FAILED' if report.failures else 'OK'
+        print(
+            f"{report.name}: {status} "
+            f"(zones={report.num_zones}, links={report.num_links})")
+        for check, output in report.failures:
+            print(f"  {check}:")
+            for line in output.splitlines():
+                print(f"    {line}")
+    num_failed = sum(1 for report in reports if report.failures)
+    print(f"Releases: {len(reports)}, failed: {num_failed}")
+
+# -----------------------------------------------------------------------------
+
+
+def read_release(source: ReleaseSource) -> Dict[str, str]:
+    """Return the {filename -> content} of the raw TZDB files of a release.
+    Files which do not exist in the release (e.g. 'backzone' in old
+    releases) are omitted.
+    """
+    names = ALL_FILES + [ISO_FILE]
+    if source.repo:
+        return read_git_files(source.repo, source.name, names)
+    assert source.tarball is not None
+    return read_tarball_files(source.tarball, names)
+
+
+def read_git_files(repo: str, tag: str, names: List[str]) -> Dict[str, str]:
+    """Read the files at 'tag' from the git object database of 'repo', using a
+    single 'git cat-file --batch' process.
+    """
+    request = ''.join(f'{tag}:{name}\n' for name in names)
+    output = subprocess.run(
+        ['git', '-C', repo, 'cat-file', '--batch'],
+        input=request.encode('utf-8'),
+        stdout=subprocess.PIPE,
+        check=True,
+    ).stdout
+
+    files: Dict[str, str] = {}
+    pos = 0
+    for name in names:
+        end = output.index(b'\n', pos)
+        header = output[pos:end].split()
+        pos = end + 1
+        if header[-1] == b'missing':
+            continue
+        size = int(header[2])
+        files[name] = output[pos:pos + size].decode('utf-8')
+        pos += size + 1
+    return files
+
+
+def read_tarball_files(tarball: str, names: List[str]) -> Dict[str, str]:
+    """Read the files from a tzdata*.tar.gz archive, without unpacking it."""
+    files: Dict[str, str] = {}
+    with tarfile.open(tarball, 'r:gz') as tar:
+        for member in tar.getmembers():
+            name = os.path.basename(member.name)
+            if name not in names or not member.isfile():
+                continue
+            f = tar.extractfile(member)
+            assert f is not None
+            files[name] = f.read().decode('utf-8')
+    return files
+
+
+def parse_release(files: Dict[str, str]) -> ParsedRelease:
+    """Extract the (zones, links, iso_orig) of a release, with the same
+    semantics as zones.txt, links.txt and read_countries().
+    """
+    zones: Dict[str, Entry] = {}
+    links: Dict[str, Entry] = {}
+    for filename in MAIN_FILES:
+        content = files.get(filename)
+        if content is None:
+            continue
+        for record in parse_lines(content.splitlines(), filename):
+            if isinstance(record, ZoneRecord):
+                zones[record.name] = Entry(None, 'Zone')
+            elif isinstance(record, LinkRecord):
+                links[record.name] = Entry(record.target, 'Link')
+
+    iso_orig = dict(parse_country_lines(
+        iter_lines(io.StringIO(files.get(ISO_FILE, '')))))
+    return zones, links, iso_orig
+
+
+def verify_release(source: ReleaseSource, data: DataFiles) -> ReleaseReport:
+    """Run the checks of verify_data.py against a single release. Every check
+    is run, even if an earlier one fails.
+    """
+    try:
+        files = read_release(source)
+    except (OSError, subprocess.CalledProcessError, tarfile.TarError) as e:
+        return ReleaseReport(source.name, 0, 0, [('read', str(e))])
+    if not files:
+        return ReleaseReport(source.name, 0, 0, [('read', 'No TZDB files')])
+
+    # A malformed file of the release fails this release only, instead of
+    # exiting the worker process and aborting the whole report.
+    parsed: List[ParsedRelease] = []
+    errors = collect(lambda: parsed.append(parse_release(files)))
+    if errors:
+        return ReleaseReport(
+            source.name, 0, 0, [('parse_release', format_errors(errors))])
+    zones, links, iso_orig = parsed[0]
+
+    name = source.name
+    checks: List[Tuple[str, Callable[[], None]]] = [
+        ('check_cycle', lambda: check_cycle(name, links)),
+        ('check_zones', lambda: check_zones(
+            name, zones, data.classified_zones)),
+        ('check_links', lambda: check_links(
+            name, links, data.classified_links)),
+        ('check_link_targets', lambda: check_link_targets(
+            data.classified_links, links, zones)),
+        ('check_iso_names', lambda: check_iso_names(
+            ISO_FILE, 'iso3166_long.txt', 'iso3166_short.txt',
+            iso_orig, data.iso_long, data.iso_short)),
+    ]
+    failures: List[Tuple[str, str]] = []
+    for check, func in checks:
+        output = run_check(func)
+        if output is not None:
+            failures.append((check, output))
+    return ReleaseReport(name, len(zones), len(links), failures)
+
+
+def run_check(func: Callable[[], None]) -> Optional[str]:
+    """Run a check function of verify_data.py. Return None if it passed,
+    otherwise every failure that it reported through error(), formatted as
+    error() prints them.
+    """
+    errors = collect(func)
+    return format_errors(errors) if errors else None
+
+
+def format_errors(errors: List[Tuple[str, List[str]]]) -> str:
+    """Return the (message, items) of errors.collect() as error() prints
+    them.
+    """
+    return ''.join(
+        f"{msg}\n" + ''.join(f"  {item}\n" for item in items)
+        for msg, items in errors
+    )
+
+# -----------------------------------------------------------------------------
+
+
+if __name__ == '__main__':
+    main()
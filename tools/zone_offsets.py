@@ -0,0 +1,12 @@
+#!/usr/bin/env python3
+#
+# Compute the UTC offsets of every timezone in country_timezones.txt from the
+# raw TZDB files.
+#
+# Runs main() of tzplus/zone_offsets.py, which documents its usage.
+# The code is in the tzplus package so that it is installed under that name.
+
+from tzplus.zone_offsets import main
+
+if __name__ == '__main__':
+    main()